@@ -9,13 +9,18 @@
 # SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
 #-----------------------------------------------------------------------------
 """
-Python-based CArchive (PKG) reader implementation. Used only in the archive_viewer utility.
+Python-based CArchive (PKG) reader implementation. Used in the archive_viewer utility, and for inspection of built
+executables.
 """
 
+import collections
+import concurrent.futures
+import contextlib
 import os
 import struct
+import zlib
 
-from PyInstaller.loader.pyimod01_archive import ZlibArchiveReader, ArchiveReadError
+from PyInstaller.loader.pyimod01_archive import CODEC_ZLIB, ZlibArchiveReader, ArchiveReadError, decompress
 
 
 class NotAnArchiveError(TypeError):
@@ -33,6 +38,8 @@ class NotAnArchiveError(TypeError):
 PKG_ITEM_DATA = 'x'  # data
 PKG_ITEM_RUNTIME_OPTION = 'o'  # runtime option
 PKG_ITEM_SPLASH = 'l'  # splash resources
+PKG_ITEM_SYMLINK = 'n'  # symbolic link
+PKG_ITEM_TOC_INDEX = 'h'  # hash index of the TOC
 
 
 class CArchiveReader:
@@ -66,7 +73,7 @@ class CArchiveReader:
     #     uint32_t offset;
     #     uint32_t length;
     #     uint32_t uncompressed_length;
-    #     unsigned char compression_flag;
+    #     unsigned char codec; /* CODEC_STORED = 0, CODEC_ZLIB = 1 */
     #     char typecode;
     #     char name[1]; /* Variable-length name, padded to multiple of 16 */
     # } TOC_ENTRY;
@@ -74,6 +81,12 @@ class CArchiveReader:
     _TOC_ENTRY_FORMAT = '!IIIIBc'
     _TOC_ENTRY_LENGTH = struct.calcsize(_TOC_ENTRY_FORMAT)
 
+    # Size of chunks in which the data of compressed entries is decompressed by `extract_all`.
+    _EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+    # Amount of (compressed) data processed in a single task by `iter_entries` and `extract_all`.
+    _BATCH_SIZE = 1024 * 1024
+
     def __init__(self, filename):
         self._filename = filename
         self._start_offset = 0
@@ -105,6 +118,8 @@ def __init__(self, filename):
                 raise ArchiveReadError("Python shared library name not set in the archive!")
 
             # Read whole toc
+            self._toc_offset = toc_offset
+            self._toc_length = toc_length
             fp.seek(self._start_offset + toc_offset)
             toc_data = fp.read(toc_length)
 
@@ -144,7 +159,7 @@ def _parse_toc(cls, data):
         cur_pos = 0
         while cur_pos < len(data):
             # Read and parse the fixed-size TOC entry header
-            entry_length, entry_offset, data_length, uncompressed_length, compression_flag, typecode = \
+            entry_length, entry_offset, data_length, uncompressed_length, codec, typecode = \
                 struct.unpack(cls._TOC_ENTRY_FORMAT, data[cur_pos:(cur_pos + cls._TOC_ENTRY_LENGTH)])
             cur_pos += cls._TOC_ENTRY_LENGTH
             # Read variable-length name
@@ -158,10 +173,13 @@ def _parse_toc(cls, data):
 
             # The TOC should not contain duplicates, except for OPTION entries. Therefore, keep those
             # in a separate list. With options, the rest of the entries do not make sense, anyway.
+            # The TOC hash index is used only by the bootloader, so it is omitted.
             if typecode == 'o':
                 options.append(name)
+            elif typecode == PKG_ITEM_TOC_INDEX:
+                continue
             else:
-                toc[name] = (entry_offset, data_length, uncompressed_length, compression_flag, typecode)
+                toc[name] = (entry_offset, data_length, uncompressed_length, codec, typecode)
 
         return toc, options
 
@@ -174,16 +192,173 @@ def extract(self, name):
         if entry is None:
             raise KeyError(f"No entry named {name} found in the archive!")
 
-        entry_offset, data_length, uncompressed_length, compression_flag, typecode = entry
-        with open(self._filename, "rb") as fp:
-            fp.seek(self._start_offset + entry_offset, os.SEEK_SET)
-            data = fp.read(data_length)
+        entry_offset, data_length, uncompressed_length, codec, typecode = entry
+        return decompress(self._read_entry_data(None, entry_offset, data_length), codec)
+
+    def iter_entries(self, workers=None):
+        """
+        Iterate over the entries of the archive (excluding OPTION entries), in the order of the TOC. Yields `(name,
+        data)` tuples, where `data` is the decompressed data of the entry.
 
-        if compression_flag:
-            import zlib
-            data = zlib.decompress(data)
+        The archive file is memory-mapped (if possible), and the entries are decompressed in a thread pool with up to
+        `workers` threads (if `None`, the default of `concurrent.futures.ThreadPoolExecutor` is used; if 1, the entries
+        are decompressed serially). The number of entries that are in flight is bounded, to limit the memory used by
+        the decompressed data.
+        """
+        def _extract_entry(mapping, name, entry):
+            entry_offset, data_length, uncompressed_length, codec, typecode = entry
+            return name, decompress(self._read_entry_data(mapping, entry_offset, data_length), codec)
+
+        with self._map_file() as mapping:
+            yield from self._run_parallel(_extract_entry, mapping, self.toc.items(), workers)
+
+    def extract_all(self, dest, workers=None):
+        """
+        Extract all entries of the archive (excluding OPTION and DEPENDENCY entries) into the destination directory,
+        which is created if necessary. The entries are extracted under their names; symbolic link entries are extracted
+        as symbolic links. Returns the list of full paths to the extracted files (under the fully-resolved destination
+        directory path).
+
+        The archive file is memory-mapped (if possible), and the entries are decompressed and written in a thread pool
+        with up to `workers` threads (see `iter_entries`). The data of large entries is decompressed and written in
+        chunks. The symbolic links are created after all other entries have been extracted, so that the files are never
+        written through them.
+
+        Raises ArchiveReadError if an entry would be written outside of the destination directory (including via a
+        symbolic link), or if a symbolic link entry has an absolute target or a target outside of the destination
+        directory.
+        """
+        os.makedirs(dest, exist_ok=True)
+        dest = os.path.realpath(dest)
+
+        def _is_within_dest(path):
+            return os.path.commonpath([dest, path]) == dest
+
+        def _get_filename(name):
+            # Guard against entry names that point outside of the destination directory, either directly or via a
+            # symbolic link in one of the parent directories.
+            filename = os.path.normpath(os.path.join(dest, name))
+            if not _is_within_dest(filename) or filename == dest:
+                raise ArchiveReadError(f"Entry name {name!r} points outside of the destination directory!")
+            parent_dir = os.path.dirname(filename)
+            os.makedirs(parent_dir, exist_ok=True)
+            if not _is_within_dest(os.path.realpath(parent_dir)):
+                raise ArchiveReadError(f"Entry name {name!r} points outside of the destination directory!")
+            return filename
+
+        def _extract_entry(mapping, name, entry):
+            entry_offset, data_length, uncompressed_length, codec, typecode = entry
+            filename = _get_filename(name)
+            data = self._read_entry_data(mapping, entry_offset, data_length)
+            with open(filename, 'wb') as fp:
+                if codec == CODEC_ZLIB:
+                    decompressor = zlib.decompressobj()
+                    for pos in range(0, len(data), self._EXTRACT_CHUNK_SIZE):
+                        fp.write(decompressor.decompress(data[pos:pos + self._EXTRACT_CHUNK_SIZE]))
+                    fp.write(decompressor.flush())
+                else:
+                    fp.write(decompress(data, codec))
+            return filename
+
+        def _extract_symlink(mapping, name, entry):
+            entry_offset, data_length, uncompressed_length, codec, typecode = entry
+            filename = _get_filename(name)
+            data = self._read_entry_data(mapping, entry_offset, data_length)
+            target = decompress(data, codec).rstrip(b'\0').decode('utf-8')
+            resolved_target = os.path.realpath(os.path.join(os.path.dirname(filename), target))
+            if os.path.isabs(target) or not _is_within_dest(resolved_target):
+                raise ArchiveReadError(f"Symbolic link {name!r} points outside of the destination directory!")
+            os.symlink(target, filename)
+            return filename
+
+        # DEPENDENCY entries refer to files in other executables, and have no data.
+        entries = [(name, entry) for name, entry in self.toc.items() if entry[4] != PKG_ITEM_DEPENDENCY]
+        file_entries = [(name, entry) for name, entry in entries if entry[4] != PKG_ITEM_SYMLINK]
+        symlink_entries = [(name, entry) for name, entry in entries if entry[4] == PKG_ITEM_SYMLINK]
+        with self._map_file() as mapping:
+            results = self._run_parallel(_extract_entry, mapping, file_entries, workers)
+            filenames = {name: filename for (name, entry), filename in zip(file_entries, results)}
+            for name, entry in symlink_entries:
+                filenames[name] = _extract_symlink(mapping, name, entry)
+        return [filenames[name] for name, entry in entries]
 
-        return data
+    @classmethod
+    def _run_parallel(cls, func, mapping, entries, workers):
+        """
+        Call `func(mapping, name, entry)` for each of the given `(name, entry)` TOC items, in a thread pool with up to
+        `workers` threads. Yields the results in the order of the items.
+
+        To reduce the overhead for small entries, the items are processed in batches of up to `_BATCH_SIZE` bytes of
+        (compressed) data.
+        """
+        if workers == 1:
+            for name, entry in entries:
+                yield func(mapping, name, entry)
+            return
+
+        def _iter_batches():
+            batch = []
+            batch_size = 0
+            for name, entry in entries:
+                batch.append((name, entry))
+                batch_size += entry[1]
+                if batch_size >= cls._BATCH_SIZE:
+                    yield batch
+                    batch = []
+                    batch_size = 0
+            if batch:
+                yield batch
+
+        def _process_batch(batch):
+            return [func(mapping, name, entry) for name, entry in batch]
+
+        max_pending = 4 * (workers or os.cpu_count() or 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pyi-reader") as executor:
+            pending = collections.deque()
+            for batch in _iter_batches():
+                pending.append(executor.submit(_process_batch, batch))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            for future in pending:
+                yield from future.result()
+
+    @contextlib.contextmanager
+    def _map_file(self):
+        """
+        Context manager that memory-maps the archive file, and yields the memoryview of the mapping, or None if the
+        file cannot be mapped.
+        """
+        try:
+            import mmap
+            with open(self._filename, 'rb') as fp:
+                mapped_file = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ImportError, OSError, ValueError):
+            yield None
+            return
+
+        mapping = memoryview(mapped_file)
+        try:
+            yield mapping
+        finally:
+            # If slices of the mapping are still referenced (for example, by a traceback), the mapping cannot be
+            # released and closed; leave that to the garbage collector.
+            try:
+                mapping.release()
+                mapped_file.close()
+            except BufferError:
+                pass
+
+    def _read_entry_data(self, mapping, entry_offset, data_length):
+        """
+        Read the (compressed) data of an entry; either as a slice of the memory-mapped file, if available, or from the
+        file.
+        """
+        entry_offset += self._start_offset
+        if mapping is not None:
+            return mapping[entry_offset:entry_offset + data_length]
+        with open(self._filename, "rb") as fp:
+            fp.seek(entry_offset, os.SEEK_SET)
+            return fp.read(data_length)
 
     def open_embedded_archive(self, name):
         """
@@ -194,7 +369,7 @@ def open_embedded_archive(self, name):
         if entry is None:
             raise KeyError(f"No entry named {name} found in the archive!")
 
-        entry_offset, data_length, uncompressed_length, compression_flag, typecode = entry
+        entry_offset, data_length, uncompressed_length, codec, typecode = entry
 
         if typecode == PKG_ITEM_PYZ:
             # Open as embedded archive, without extraction.
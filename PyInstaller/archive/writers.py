@@ -12,16 +12,190 @@
 Utilities to create data structures for embedding Python modules and additional files into the executable.
 """
 
+import collections
+import concurrent.futures
+import hashlib
+import heapq
 import marshal
 import os
 import shutil
 import struct
 import sys
+import tempfile
 import zlib
 
+from PyInstaller.archive.readers import PKG_ITEM_TOC_INDEX
 from PyInstaller.building.utils import get_code_object, strip_paths_in_code
-from PyInstaller.compat import BYTECODE_MAGIC, is_win, strict_collect_mode
-from PyInstaller.loader.pyimod01_archive import PYZ_ITEM_MODULE, PYZ_ITEM_NSPKG, PYZ_ITEM_PKG
+from PyInstaller.compat import BYTECODE_MAGIC, is_linux, is_win, strict_collect_mode
+from PyInstaller.loader.pyimod01_archive import (
+    CODEC_LZMA, CODEC_STORED, CODEC_ZLIB, CODEC_ZLIB_DICT, PYZ_FLAG_COMPACT_TOC, PYZ_FLAG_MMAP, PYZ_FLAG_PREFETCH,
+    PYZ_ITEM_MODULE, PYZ_ITEM_NSPKG, PYZ_ITEM_PKG, CompactToc, ZlibArchiveReader, decompress
+)
+
+# Names of compression codecs that can be selected for archive entries.
+CODECS = {
+    'stored': CODEC_STORED,
+    'zlib': CODEC_ZLIB,
+    'lzma': CODEC_LZMA,
+    'zlib-dict': CODEC_ZLIB_DICT,
+}
+
+# Codecs that can be used for CArchive entries; the bootloader is able to decompress only these.
+CARCHIVE_CODECS = {CODEC_STORED, CODEC_ZLIB}
+
+# Name of the CArchive entry that contains the TOC hash index (see `CArchiveWriter._build_toc_index`), and the value
+# that marks empty slots of the index.
+_TOC_INDEX_NAME = 'pyi-toc-index'
+_TOC_INDEX_EMPTY_SLOT = 0xFFFFFFFF
+
+
+def get_codec_id(codec):
+    """
+    Resolve the codec specification into codec ID. The codec can be specified by its name (see `CODECS`), or by a
+    boolean compression flag, in which case `True` corresponds to zlib and `False` to no compression.
+    """
+    if isinstance(codec, bool):
+        return CODEC_ZLIB if codec else CODEC_STORED
+    try:
+        return CODECS[codec]
+    except (KeyError, TypeError):
+        raise ValueError(f"Invalid compression codec {codec!r}; valid codecs: {', '.join(CODECS)}.") from None
+
+
+def toc_index_hash(name):
+    """
+    Compute the hash of the CArchive entry name for the TOC hash index: 32-bit FNV-1a hash of the UTF-8 encoded name,
+    with ASCII letters converted to lower case. Must be kept in sync with `_pyi_archive_hash_name` in
+    `bootloader/src/pyi_archive.c`.
+    """
+    value = 0x811C9DC5
+    for byte in name.encode('utf-8').lower():
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return value
+
+
+def compress(data, codec, level, zdict=None):
+    """
+    Compress the data with the given codec (codec ID) and compression level (zlib compression level, or lzma preset).
+    The `zdict` is the shared compression dictionary, required by the CODEC_ZLIB_DICT codec.
+    """
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, level)
+    elif codec == CODEC_ZLIB_DICT:
+        compressor = zlib.compressobj(level, zdict=zdict)
+        return compressor.compress(data) + compressor.flush()
+    elif codec == CODEC_STORED:
+        return data
+    elif codec == CODEC_LZMA:
+        import lzma
+
+        # The decompressor allocates the whole dictionary (whose size is stored in the header); so limit its size to the
+        # size of the data, as most entries are small.
+        dict_size = min(max(len(data), 4096), 64 * 1024 * 1024)
+        filters = [{'id': lzma.FILTER_LZMA1, 'preset': level, 'dict_size': dict_size}]
+        return lzma.compress(data, format=lzma.FORMAT_ALONE, filters=filters)
+    raise ValueError(f"Unsupported compression codec: {codec}!")
+
+
+def build_zdict(samples, size=32 * 1024, sample_size=512 * 1024, kmer_length=8, segment_length=64):
+    """
+    Build a shared compression dictionary (zlib `zdict`) from the given list of sample data (e.g., marshalled code
+    objects). The size of the dictionary is limited to the given size; zlib cannot use more than 32 KiB of it.
+
+    The samples are split into segments, and the segments are scored by the number of samples that contain each of
+    the segment's k-mers (substrings with the given length). The best segments are then greedily picked into the
+    dictionary; once a segment is picked, its k-mers do not contribute to scores of the remaining segments anymore. As
+    zlib encodes near matches more cheaply, the best segments are placed at the end of the dictionary.
+
+    To bound the running time, only an evenly-spaced subset of the samples with total size of about `sample_size` is
+    used. The result depends only on the samples, so it is reproducible.
+    """
+    total_size = sum(len(data) for data in samples)
+    samples = samples[::max(1, total_size // sample_size)]
+
+    def _get_kmers(data):
+        return {data[pos:pos + kmer_length] for pos in range(len(data) - kmer_length + 1)}
+
+    # Count the samples that contain each k-mer.
+    kmer_counts = collections.Counter()
+    for data in samples:
+        kmer_counts.update(_get_kmers(data))
+
+    # Collect segments and their k-mers; k-mers that occur in a single sample are useless.
+    segments = []
+    heap = []
+    for data in samples:
+        for start in range(0, len(data), segment_length):
+            segment = data[start:start + segment_length]
+            kmers = {kmer for kmer in _get_kmers(segment) if kmer_counts[kmer] > 1}
+            if kmers:
+                heap.append((-sum(kmer_counts[kmer] for kmer in kmers), len(segments)))
+                segments.append((segment, kmers))
+    heapq.heapify(heap)
+
+    # Greedily pick the best segments. The scores in the heap might be stale (too high); when a segment is popped, its
+    # score is re-computed, and if it does not remain the best, the segment is pushed back with the updated score.
+    picked = []
+    picked_size = 0
+    while heap and picked_size < size:
+        neg_score, idx = heapq.heappop(heap)
+        segment, kmers = segments[idx]
+        score = sum(kmer_counts[kmer] for kmer in kmers)
+        if heap and score < -heap[0][0]:
+            if score:
+                heapq.heappush(heap, (-score, idx))
+            continue
+        if not score:
+            break
+        picked.append(segment)
+        picked_size += len(segment)
+        for kmer in kmers:
+            kmer_counts[kmer] = 0
+
+    return b''.join(reversed(picked))[-size:]
+
+
+def _copy_file_data(in_fp, out_fp):
+    """
+    Copy the remaining data from the input file object to the output file object. On Linux, the data is copied within
+    the kernel (using `os.copy_file_range` or `os.sendfile`) if possible, without passing it through user-space
+    buffers; otherwise, it is copied using a large buffer.
+    """
+    if is_linux:
+        in_fd = in_fp.fileno()
+        out_fd = out_fp.fileno()
+        in_pos = in_fp.tell()
+        remaining = os.fstat(in_fd).st_size - in_pos
+        out_fp.flush()
+        out_pos = out_fp.tell()
+
+        # Prefer `copy_file_range` (which allows reflinks on file systems that support them), and fall back to
+        # `sendfile`, which is available on older kernels (and python versions), but writes at the current position
+        # of the output file.
+        copy_funcs = []
+        if hasattr(os, 'copy_file_range'):
+            copy_funcs.append(lambda count: os.copy_file_range(in_fd, out_fd, count, in_pos, out_pos))
+        copy_funcs.append(lambda count: os.sendfile(out_fd, in_fd, in_pos, count))
+        for copy_func in copy_funcs:
+            try:
+                os.lseek(out_fd, out_pos, os.SEEK_SET)
+                while remaining > 0:
+                    num_copied = copy_func(min(remaining, 1024 * 1024 * 1024))
+                    if not num_copied:
+                        break  # End of the input file.
+                    in_pos += num_copied
+                    out_pos += num_copied
+                    remaining -= num_copied
+                break
+            except OSError:
+                # Not supported for this pair of files (or by the kernel); continue with the next method.
+                continue
+
+        # Synchronize the positions of file objects.
+        in_fp.seek(in_pos, os.SEEK_SET)
+        out_fp.seek(out_pos, os.SEEK_SET)
+
+    shutil.copyfileobj(in_fp, out_fp, 1024 * 1024)
 
 
 class ZlibArchiveWriter:
@@ -33,7 +207,17 @@ class ZlibArchiveWriter:
     _HEADER_LENGTH = 12 + 5
     _COMPRESSION_LEVEL = 6  # zlib compression level
 
-    def __init__(self, filename, entries, code_dict=None):
+    def __init__(
+        self,
+        filename,
+        entries,
+        code_dict=None,
+        jobs=None,
+        previous_archive=None,
+        codec='zlib',
+        use_mmap=False,
+        import_order=None,
+    ):
         """
         filename
             Target filename of the archive.
@@ -43,37 +227,222 @@ def __init__(self, filename, entries, code_dict=None):
             file from which the resource is read, and `typecode` is the Analysis-level TOC typecode (`PYMODULE`).
         code_dict
             Optional code dictionary containing code objects for analyzed/collected python modules.
+        jobs
+            Maximum number of threads used to compress the entries. If `None`, the default of
+            `concurrent.futures.ThreadPoolExecutor` is used. If 1, the entries are compressed serially. The entries
+            are written in the order in which they are given, so the archive does not depend on the number of threads.
+        previous_archive
+            Optional filename of a previously-built PYZ archive (which may be the same as the target filename). The
+            compressed data of entries whose contents are unchanged is copied from the previous archive instead of
+            being compressed again.
+        codec
+            Name of the compression codec used for the entries (see `CODECS`). The codec is recorded in each entry's
+            TOC entry. With the `zlib-dict` codec, a shared compression dictionary is built from the entries and
+            stored in the archive, which improves the compression of small entries.
+        use_mmap
+            If True, the PYZ_FLAG_MMAP flag is set in the archive header, so that the frozen application reads the
+            archive via memory-mapping.
+        import_order
+            Optional list of module names, in the order in which they are imported during the start-up of the
+            application (see `PyInstaller.building.utils.load_import_order`). The entries of these modules are placed
+            at the start of the archive, in this order, and listed in the prefetch table (which follows the TOC; see
+            `PyInstaller.loader.pyimod01_archive.ZlibArchiveReader`), so that the frozen application can read them in
+            a single read and decompress them in a background thread. The remaining entries follow in the order in
+            which they are given.
         """
         code_dict = code_dict or {}
+        self._codec = get_codec_id(codec)
+        self._zdict = None
+
+        # Statistics
+        self.reused_entries = 0
+        self.compressed_entries = 0
+        self.prefetched_entries = 0
+
+        import_rank = {name: idx for idx, name in enumerate(import_order or [])}
+        if import_rank:
+            # Stable sort; the entries that are not in the import order keep their relative order.
+            entries = sorted(entries, key=lambda entry: import_rank.get(entry[0], len(import_rank)))
+
+        prepared_entries = (self._prepare_entry(entry, code_dict) for entry in entries)
+        if self._codec == CODEC_ZLIB_DICT:
+            # The dictionary is built from the data of all entries, so they need to be prepared up-front.
+            prepared_entries = list(prepared_entries)
+            self._zdict = build_zdict([data for name, typecode, data in prepared_entries])
+
+        previous_toc, previous_fp = self._open_previous_archive(previous_archive)
+
+        # Write the new archive into a temporary file, as the previous archive (from which we might be reading) might be
+        # the one that we are about to replace.
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_filename, "wb") as fp:
+                # Reserve space for the header.
+                fp.write(b'\0' * self._HEADER_LENGTH)
+
+                # Write entries' data and collect TOC entries
+                toc = []
+                prefetch_table = []
+                for name, typecode, obj in self._compress_entries(prepared_entries, jobs, previous_toc, previous_fp):
+                    toc.append((name, (typecode, fp.tell(), len(obj), self._codec)))
+                    if name in import_rank:
+                        prefetch_table.append(ZlibArchiveReader.PREFETCH_RECORD.pack(fp.tell(), len(obj), self._codec))
+                    fp.write(obj)
+
+                # Write the compression dictionary, if any; it is located immediately before the TOC.
+                zdict_length = 0
+                if self._zdict:
+                    zdict_length = len(self._zdict)
+                    fp.write(self._zdict)
+
+                # Write TOC
+                toc_offset = fp.tell()
+                toc_data = self._serialize_toc(toc)
+                fp.write(toc_data)
+
+                # Write the prefetch table, if any; it is located immediately after the TOC.
+                if prefetch_table:
+                    fp.write(ZlibArchiveReader.PREFETCH_HEADER.pack(len(prefetch_table)))
+                    fp.write(b''.join(prefetch_table))
+                    self.prefetched_entries = len(prefetch_table)
+
+                # Write header:
+                #  - PYZ magic pattern (4 bytes)
+                #  - python bytecode magic pattern (4 bytes)
+                #  - TOC offset (32-bit int, 4 bytes)
+                #  - length of the compression dictionary (32-bit unsigned int, 4 bytes)
+                #  - flags (1 byte)
+                fp.seek(0, os.SEEK_SET)
+
+                flags = PYZ_FLAG_COMPACT_TOC
+                if use_mmap:
+                    flags |= PYZ_FLAG_MMAP
+                if prefetch_table:
+                    flags |= PYZ_FLAG_PREFETCH
+                fp.write(self._PYZ_MAGIC_PATTERN)
+                fp.write(BYTECODE_MAGIC)
+                fp.write(struct.pack('!iIB', toc_offset, zdict_length, flags))
+        except BaseException:
+            os.remove(tmp_filename)
+            raise
+        finally:
+            if previous_fp is not None:
+                previous_fp.close()
+
+        os.replace(tmp_filename, filename)
+
+    @staticmethod
+    def _serialize_toc(toc):
+        """
+        Serialize the TOC (list of `(name, (typecode, offset, length, codec))` tuples) into compact binary format; see
+        `PyInstaller.loader.pyimod01_archive.CompactToc`.
+        """
+        encoded_toc = sorted((name.encode('utf-8'), entry) for name, entry in toc)
+
+        num_slots = 1
+        while num_slots < 2 * len(encoded_toc):
+            num_slots *= 2
+        mask = num_slots - 1
+
+        records = []
+        slots = [CompactToc.EMPTY_SLOT] * num_slots
+        strings_length = 0
+        for index, (name, (typecode, offset, length, codec)) in enumerate(encoded_toc):
+            records.append(CompactToc.RECORD.pack(strings_length, len(name), typecode, codec, offset, length))
+            strings_length += len(name)
+
+            slot = zlib.crc32(name) & mask
+            while slots[slot] != CompactToc.EMPTY_SLOT:
+                slot = (slot + 1) & mask
+            slots[slot] = index
+
+        return b''.join([
+            CompactToc.HEADER.pack(len(encoded_toc), num_slots, strings_length),
+            *records,
+            struct.pack(f'!{num_slots}I', *slots),
+            *(name for name, entry in encoded_toc),
+        ])
+
+    def _open_previous_archive(self, filename):
+        """
+        Open the previous archive, and read its TOC. Returns the TOC dictionary and the open file object, or `(None,
+        None)` if the archive does not exist or cannot be used (e.g., because it was created for a different python
+        version, or with a different compression dictionary).
+        """
+        if filename is None or not os.path.isfile(filename):
+            return None, None
+        try:
+            reader = ZlibArchiveReader(filename, start_offset=0, check_pymagic=True, use_mmap=False)
+        except Exception:
+            return None, None
+        if reader.zdict != self._zdict:
+            return None, None
+        return reader.toc, open(filename, 'rb')
+
+    def _compress_entries(self, prepared_entries, jobs, previous_toc, previous_fp):
+        """
+        Compress the data of the given prepared entries (see `_prepare_entry`). Yields `(name, typecode,
+        compressed_data)` tuples, in the order of entries.
 
-        with open(filename, "wb") as fp:
-            # Reserve space for the header.
-            fp.write(b'\0' * self._HEADER_LENGTH)
-
-            # Write entries' data and collect TOC entries
-            toc = []
-            for entry in entries:
-                toc_entry = self._write_entry(fp, entry, code_dict)
-                toc.append(toc_entry)
-
-            # Write TOC
-            toc_offset = fp.tell()
-            toc_data = marshal.dumps(toc)
-            fp.write(toc_data)
-
-            # Write header:
-            #  - PYZ magic pattern (4 bytes)
-            #  - python bytecode magic pattern (4 bytes)
-            #  - TOC offset (32-bit int, 4 bytes)
-            #  - 4 unused bytes
-            fp.seek(0, os.SEEK_SET)
+        The compression is performed in a thread pool (zlib releases the GIL while compressing), while the entries are
+        prepared (marshalled) in the calling thread. The number of entries that are in flight is bounded, to avoid
+        holding the compressed data of the whole archive in memory.
 
-            fp.write(self._PYZ_MAGIC_PATTERN)
-            fp.write(BYTECODE_MAGIC)
-            fp.write(struct.pack('!i', toc_offset))
+        If the previous archive is available, the compressed data of the corresponding entry (if compressed with the
+        same codec) is read from it and, if it decompresses to the same data (decompression being much cheaper than
+        compression), re-used as-is.
+        """
+        def _iter_entries():
+            for name, typecode, data in prepared_entries:
+                previous_obj = None
+                previous_entry = previous_toc.get(name) if previous_toc else None
+                # NOTE: entries of archives created by older PyInstaller versions have no codec field.
+                if previous_entry is not None and previous_entry[0] == typecode and \
+                        previous_entry[3:] == (self._codec,):
+                    _, offset, length, _ = previous_entry
+                    previous_fp.seek(offset, os.SEEK_SET)
+                    previous_obj = previous_fp.read(length)
+                yield name, typecode, data, previous_obj
+
+        def _get_result(name, typecode, result):
+            obj, reused = result
+            if reused:
+                self.reused_entries += 1
+            else:
+                self.compressed_entries += 1
+            return name, typecode, obj
+
+        if jobs == 1:
+            for name, typecode, data, previous_obj in _iter_entries():
+                yield _get_result(name, typecode, self._compress_entry(data, previous_obj))
+            return
+
+        max_pending = 4 * (jobs or os.cpu_count() or 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pyi-pyz") as executor:
+            pending = collections.deque()
+            for name, typecode, data, previous_obj in _iter_entries():
+                pending.append((name, typecode, executor.submit(self._compress_entry, data, previous_obj)))
+                if len(pending) >= max_pending:
+                    name, typecode, future = pending.popleft()
+                    yield _get_result(name, typecode, future.result())
+            for name, typecode, future in pending:
+                yield _get_result(name, typecode, future.result())
+
+    def _compress_entry(self, data, previous_obj):
+        """
+        Compress the given data, unless the given previously-compressed data (if any) matches it. Returns the
+        compressed data and a flag indicating whether it was re-used.
+        """
+        if previous_obj is not None:
+            try:
+                if decompress(previous_obj, self._codec, self._zdict) == data:
+                    return previous_obj, True
+            except Exception:
+                pass
+        return compress(data, self._codec, self._COMPRESSION_LEVEL, self._zdict), False
 
-    @classmethod
-    def _write_entry(cls, fp, entry, code_dict):
+    @staticmethod
+    def _prepare_entry(entry, code_dict):
         name, src_path, typecode = entry
         assert typecode in {'PYMODULE', 'PYMODULE-1', 'PYMODULE-2'}
 
@@ -88,16 +457,7 @@ def _write_entry(cls, fp, entry, code_dict):
                 typecode = PYZ_ITEM_PKG
         data = marshal.dumps(code_dict[name])
 
-        # First compress, then encrypt.
-        obj = zlib.compress(data, cls._COMPRESSION_LEVEL)
-
-        # Create TOC entry
-        toc_entry = (name, (typecode, fp.tell(), len(obj)))
-
-        # Write data blob
-        fp.write(obj)
-
-        return toc_entry
+        return name, typecode, data
 
 
 class CArchiveWriter:
@@ -120,36 +480,70 @@ class CArchiveWriter:
 
     _COMPRESSION_LEVEL = 9  # zlib compression level
 
-    def __init__(self, filename, entries, pylib_name):
+    # Files up to this size are compressed in memory; larger files are compressed into temporary files.
+    _IN_MEMORY_SIZE_LIMIT = 1024 * 1024
+
+    # Files with these suffixes contain already-compressed data, and are stored without compression. For other files
+    # larger than the in-memory size limit, a sample of the data is compressed first (at the lowest compression
+    # level); if it does not shrink below the given ratio, the file is stored without compression.
+    _INCOMPRESSIBLE_SUFFIXES = {
+        '.7z', '.bz2', '.egg', '.gz', '.jar', '.jpeg', '.jpg', '.lzma', '.mp3', '.mp4', '.ogg', '.png', '.tgz', '.webp',
+        '.whl', '.woff', '.woff2', '.xz', '.zip', '.zst'
+    }
+    _PROBE_SAMPLE_SIZE = 64 * 1024
+    _INCOMPRESSIBLE_RATIO = 0.95
+
+    def __init__(self, filename, entries, pylib_name, jobs=None):
         """
         filename
             Target filename of the archive.
         entries
             An iterable containing entries in the form of tuples: (dest_name, src_name, compress, typecode), where
             `dest_name` is the name under which the resource is stored in the archive (and name under which it is
-            extracted at runtime), `src_name` is name of the file from which the resouce is read, `compress` is a
-            boolean compression flag, and `typecode` is the Analysis-level TOC typecode.
+            extracted at runtime), `src_name` is name of the file from which the resouce is read, `compress` is the
+            compression codec name (`stored` or `zlib`; see `CODECS`) or a boolean compression flag, and `typecode`
+            is the Analysis-level TOC typecode.
         pylib_name
             Name of the python shared library.
+        jobs
+            Maximum number of threads used to compress the entries. If `None`, the default of
+            `concurrent.futures.ThreadPoolExecutor` is used. If 1, the entries are compressed serially. The entries
+            are written in the order in which they are given, so the archive does not depend on the number of threads.
         """
         self._collected_names = set()  # Track collected names for strict package mode.
 
+        # Statistics
+        self.shared_entries = 0
+
         with open(filename, "wb") as fp:
-            # Write entries' data and collect TOC entries
+            # Write entries' data and collect TOC entries. The data of entries with identical contents is written only
+            # once, and their TOC entries point to the same data.
             toc = []
-            for entry in entries:
-                toc_entry = self._write_entry(fp, entry)
-                toc.append(toc_entry)
-
-            # Write TOC
+            written_data = {}  # (digest, data_length, codec) -> (data_offset, compressed_length)
+            for dest_name, typecode, codec, data_length, payload, digest in self._compress_entries(entries, jobs):
+                shared_data = written_data.get((digest, data_length, codec)) if data_length else None
+                if shared_data is not None:
+                    data_offset, compressed_length = shared_data
+                    if not isinstance(payload, (bytes, str)):
+                        payload.close()  # Discard the temporary file.
+                    self.shared_entries += 1
+                else:
+                    data_offset = fp.tell()
+                    self._write_payload(fp, payload)
+                    compressed_length = fp.tell() - data_offset
+                    written_data[(digest, data_length, codec)] = (data_offset, compressed_length)
+                toc.append((data_offset, compressed_length, data_length, codec, typecode, dest_name))
+
+            # Write TOC, followed by the TOC hash index
             toc_offset = fp.tell()
-            toc_data = self._serialize_toc(toc)
+            toc_data, toc_index_data = self._serialize_toc(toc, toc_offset)
             toc_length = len(toc_data)
 
             fp.write(toc_data)
+            fp.write(toc_index_data)
 
             # Write cookie
-            archive_length = toc_offset + toc_length + self._COOKIE_LENGTH
+            archive_length = toc_offset + toc_length + len(toc_index_data) + self._COOKIE_LENGTH
             pyvers = sys.version_info[0] * 100 + sys.version_info[1]
             cookie_data = struct.pack(
                 self._COOKIE_FORMAT,
@@ -163,13 +557,47 @@ def __init__(self, filename, entries, pylib_name):
 
             fp.write(cookie_data)
 
-    def _write_entry(self, fp, entry):
+    def _compress_entries(self, entries, jobs):
+        """
+        Prepare the given entries (see `_prepare_entry`), and compress them. Yields `(dest_name, typecode, codec,
+        data_length, payload, digest)` tuples (see `_compress_entry`), in the order of entries.
+
+        The entries are prepared in the calling thread, and compressed in a thread pool (zlib releases the GIL while
+        compressing). The number of entries that are in flight is bounded, to limit the memory used by the compressed
+        data.
+        """
+        prepared_entries = (self._prepare_entry(entry) for entry in entries)
+
+        if jobs == 1:
+            for prepared_entry in prepared_entries:
+                yield self._compress_entry(*prepared_entry)
+            return
+
+        max_pending = 4 * (jobs or os.cpu_count() or 1)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pyi-pkg") as executor:
+            pending = collections.deque()
+            for prepared_entry in prepared_entries:
+                pending.append(executor.submit(self._compress_entry, *prepared_entry))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            for future in pending:
+                yield future.result()
+
+    def _prepare_entry(self, entry):
+        """
+        Validate and normalize the entry, and produce its data. Returns `(dest_name, typecode, codec, blob, src_name)`
+        tuple, where either `blob` contains the data of the entry, or `src_name` is the name of the file that contains
+        it.
+        """
         dest_name, src_name, compress, typecode = entry
+        codec = get_codec_id(compress)
+        if codec not in CARCHIVE_CODECS:
+            raise ValueError(f"Compression codec {compress!r} of {dest_name!r} is not supported by the bootloader!")
 
         # Write OPTION entries as-is, without normalizing them. This also exempts them from duplication check,
         # allowing them to be specified multiple times.
         if typecode == 'o':
-            return self._write_blob(fp, b"", dest_name, typecode)
+            return dest_name, typecode, CODEC_STORED, b"", None
 
         # Ensure forward slashes in paths are on Windows converted to back slashes '\\', as on Windows the bootloader
         # works only with back slashes.
@@ -205,14 +633,14 @@ def _write_entry(self, fp, entry):
         if typecode == 'd':
             # Dependency; merge src_name (= reference path prefix) and dest_name (= name) into single-string format that
             # is parsed by bootloader.
-            return self._write_blob(fp, b"", f"{src_name}:{dest_name}", typecode)
+            return f"{src_name}:{dest_name}", typecode, CODEC_STORED, b"", None
         elif typecode in {'s', 's1', 's2'}:
             # If it is a source code file, compile it to a code object and marshal the object, so it can be unmarshalled
             # by the bootloader. For that, we need to know target optimization level, which is stored in typecode.
             optim_level = {'s': 0, 's1': 1, 's2': 2}[typecode]
             code = get_code_object(dest_name, src_name, optimize=optim_level)
             code = strip_paths_in_code(code)
-            return self._write_blob(fp, marshal.dumps(code), dest_name, 's', compress=compress)
+            return dest_name, 's', codec, marshal.dumps(code), None
         elif typecode in ('m', 'M'):
             # Read the PYC file. We do not perform compilation here (in contrast to script files in the above branch),
             # so typecode does not contain optimization level information.
@@ -224,81 +652,187 @@ def _write_entry(self, fp, entry):
             code = strip_paths_in_code(code)
             # These module entries are loaded and executed within the bootloader, which requires only the code
             # object, without the PYC header.
-            return self._write_blob(fp, marshal.dumps(code), dest_name, typecode, compress=compress)
+            return dest_name, typecode, codec, marshal.dumps(code), None
         elif typecode == 'n':
             # Symbolic link; store target name (as NULL-terminated string)
-            data = src_name.encode('utf-8') + b'\x00'
-            return self._write_blob(fp, data, dest_name, typecode, compress=compress)
+            return dest_name, typecode, codec, src_name.encode('utf-8') + b'\x00', None
         else:
-            return self._write_file(fp, src_name, dest_name, typecode, compress=compress)
+            return dest_name, typecode, codec, None, src_name
 
-    def _write_blob(self, out_fp, blob: bytes, dest_name, typecode, compress=False):
+    def _compress_entry(self, dest_name, typecode, codec, blob, src_name):
         """
-        Write the binary contents (**blob**) of a small file to the archive and return the corresponding CArchive TOC
-        entry.
+        Compress the data of the prepared entry. Returns `(dest_name, typecode, codec, data_length, payload, digest)`
+        tuple, where `payload` is the data to be written (see `_write_payload`), and `digest` is the SHA-256 digest of
+        the uncompressed data, which is used to find entries with identical contents. The codec might differ from the
+        requested one, if the data turns out to be incompressible.
         """
-        data_offset = out_fp.tell()
-        data_length = len(blob)
-        if compress:
-            blob = zlib.compress(blob, level=self._COMPRESSION_LEVEL)
-        out_fp.write(blob)
-
-        return (data_offset, len(blob), data_length, int(compress), typecode, dest_name)
+        if blob is not None:
+            digest = hashlib.sha256(blob).digest()
+            return dest_name, typecode, codec, len(blob), compress(blob, codec, self._COMPRESSION_LEVEL), digest
 
-    def _write_file(self, out_fp, src_name, dest_name, typecode, compress=False):
-        """
-        Stream copy a large file into the archive and return the corresponding CArchive TOC entry.
-        """
-        data_offset = out_fp.tell()
         data_length = os.stat(src_name).st_size
         with open(src_name, 'rb') as in_fp:
-            if compress:
-                tmp_buffer = bytearray(16 * 1024)
-                compressor = zlib.compressobj(self._COMPRESSION_LEVEL)
+            if data_length <= self._IN_MEMORY_SIZE_LIMIT:
+                data = in_fp.read()
+                digest = hashlib.sha256(data).digest()
+                if codec == CODEC_STORED:
+                    return dest_name, typecode, codec, data_length, data, digest
+                compressed_data = compress(data, codec, self._COMPRESSION_LEVEL)
+                if len(compressed_data) >= len(data):
+                    return dest_name, typecode, CODEC_STORED, data_length, data, digest
+                return dest_name, typecode, codec, data_length, compressed_data, digest
+
+            # Buffer size scales with the file size.
+            buffer_size = min(max(data_length // 16, 256 * 1024), 4 * 1024 * 1024)
+            tmp_buffer = bytearray(buffer_size)
+            hasher = hashlib.sha256()
+
+            if codec == CODEC_STORED or not self._is_compressible(src_name, in_fp, data_length):
+                # Copied directly from the source file.
                 while True:
                     num_read = in_fp.readinto(tmp_buffer)
                     if not num_read:
                         break
-                    out_fp.write(compressor.compress(tmp_buffer[:num_read]))
-                out_fp.write(compressor.flush())
-            else:
-                shutil.copyfileobj(in_fp, out_fp)
+                    hasher.update(memoryview(tmp_buffer)[:num_read])
+                return dest_name, typecode, CODEC_STORED, data_length, src_name, hasher.digest()
 
-        return (data_offset, out_fp.tell() - data_offset, data_length, int(compress), typecode, dest_name)
+            # Stream the compressed data into a temporary file.
+            compressor = zlib.compressobj(self._COMPRESSION_LEVEL)
+            tmp_fp = tempfile.TemporaryFile(prefix='pyi-pkg-')
+            try:
+                while True:
+                    num_read = in_fp.readinto(tmp_buffer)
+                    if not num_read:
+                        break
+                    chunk = memoryview(tmp_buffer)[:num_read]
+                    hasher.update(chunk)
+                    tmp_fp.write(compressor.compress(chunk))
+                tmp_fp.write(compressor.flush())
+                tmp_fp.seek(0, os.SEEK_SET)
+            except BaseException:
+                tmp_fp.close()
+                raise
+            return dest_name, typecode, codec, data_length, tmp_fp, hasher.digest()
+
+    @classmethod
+    def _is_compressible(cls, src_name, in_fp, data_length):
+        """
+        Check whether the (large) file is worth compressing, based on its suffix and on the compression ratio of the
+        data samples from the beginning and from the middle of the file.
+        """
+        if os.path.splitext(src_name)[1].lower() in cls._INCOMPRESSIBLE_SUFFIXES:
+            return False
+
+        sample = in_fp.read(cls._PROBE_SAMPLE_SIZE)
+        in_fp.seek(data_length // 2, os.SEEK_SET)
+        sample += in_fp.read(cls._PROBE_SAMPLE_SIZE)
+        in_fp.seek(0, os.SEEK_SET)
+
+        return len(zlib.compress(sample, 1)) < cls._INCOMPRESSIBLE_RATIO * len(sample)
+
+    @staticmethod
+    def _write_payload(out_fp, payload):
+        """
+        Write the payload of an entry to the archive. The payload is either the data itself, name of the file to be
+        copied, or (temporary) file object to be copied and closed.
+        """
+        if isinstance(payload, bytes):
+            out_fp.write(payload)
+        elif isinstance(payload, str):
+            with open(payload, 'rb') as in_fp:
+                _copy_file_data(in_fp, out_fp)
+        else:
+            with payload:
+                _copy_file_data(payload, out_fp)
 
     @classmethod
-    def _serialize_toc(cls, toc):
+    def _serialize_toc(cls, toc, toc_offset):
+        """
+        Serialize the TOC entries, and build the TOC hash index (see `_build_toc_index`). The entry of the hash index
+        is appended to the TOC, and its data is placed immediately after the TOC. Returns the serialized TOC and the
+        data of the hash index.
+        """
         serialized_toc = []
         for toc_entry in toc:
-            data_offset, compressed_length, data_length, compress, typecode, name = toc_entry
-
-            # Encode names as UTF-8. This should be safe as standard python modules only contain ASCII-characters (and
-            # standard shared libraries should have the same), and thus the C-code still can handle this correctly.
-            name = name.encode('utf-8')
-            name_length = len(name) + 1  # Add 1 for string-terminating zero byte.
-
-            # Ensure TOC entries are aligned on 16-byte boundary, so they can be read by bootloader (C code) on
-            # platforms with strict data alignment requirements (for example linux on `armhf`/`armv7`, such as 32-bit
-            # Debian Buster on Raspberry Pi).
-            entry_length = cls._TOC_ENTRY_LENGTH + name_length
-            if entry_length % 16 != 0:
-                padding_length = 16 - (entry_length % 16)
-                name_length += padding_length
-
-            # Serialize
-            serialized_entry = struct.pack(
-                cls._TOC_ENTRY_FORMAT + f"{name_length}s",  # "Ns" format automatically pads the string with zero bytes.
-                cls._TOC_ENTRY_LENGTH + name_length,
-                data_offset,
-                compressed_length,
-                data_length,
-                compress,
-                typecode.encode('ascii'),
-                name,
+            serialized_toc.append(cls._serialize_toc_entry(*toc_entry))
+
+        # Compute the offsets of the entries, relative to the start of the TOC.
+        entry_offsets = []
+        toc_length = 0
+        for serialized_entry in serialized_toc:
+            entry_offsets.append(toc_length)
+            toc_length += len(serialized_entry)
+
+        # The length of the index entry does not depend on its values, so the position of index data (right after the
+        # TOC, including the index entry itself) can be computed up-front.
+        index_entry_length = len(cls._serialize_toc_entry(0, 0, 0, CODEC_STORED, PKG_ITEM_TOC_INDEX, _TOC_INDEX_NAME))
+        index_data = cls._build_toc_index([toc_entry[5] for toc_entry in toc], entry_offsets)
+        serialized_toc.append(
+            cls._serialize_toc_entry(
+                toc_offset + toc_length + index_entry_length,
+                len(index_data),
+                len(index_data),
+                CODEC_STORED,
+                PKG_ITEM_TOC_INDEX,
+                _TOC_INDEX_NAME,
             )
-            serialized_toc.append(serialized_entry)
+        )
 
-        return b''.join(serialized_toc)
+        return b''.join(serialized_toc), index_data
+
+    @classmethod
+    def _serialize_toc_entry(cls, data_offset, compressed_length, data_length, codec, typecode, name):
+        # Encode names as UTF-8. This should be safe as standard python modules only contain ASCII-characters (and
+        # standard shared libraries should have the same), and thus the C-code still can handle this correctly.
+        name = name.encode('utf-8')
+        name_length = len(name) + 1  # Add 1 for string-terminating zero byte.
+
+        # Ensure TOC entries are aligned on 16-byte boundary, so they can be read by bootloader (C code) on
+        # platforms with strict data alignment requirements (for example linux on `armhf`/`armv7`, such as 32-bit
+        # Debian Buster on Raspberry Pi).
+        entry_length = cls._TOC_ENTRY_LENGTH + name_length
+        if entry_length % 16 != 0:
+            padding_length = 16 - (entry_length % 16)
+            name_length += padding_length
+
+        # Serialize
+        return struct.pack(
+            cls._TOC_ENTRY_FORMAT + f"{name_length}s",  # "Ns" format automatically pads the string with zero bytes.
+            cls._TOC_ENTRY_LENGTH + name_length,
+            data_offset,
+            compressed_length,
+            data_length,
+            codec,
+            typecode.encode('ascii'),
+            name,
+        )
+
+    @staticmethod
+    def _build_toc_index(names, entry_offsets):
+        """
+        Build the TOC hash index, which allows the bootloader to look up entries by name without scanning the whole
+        TOC. The index is an open-addressing hash table with linear probing; it is serialized as an array of big-endian
+        32-bit integers, where the first one is the number of slots (a power of two, at least twice the number of
+        entries), followed by the slots. Each slot contains the offset of the TOC entry relative to the start of the
+        TOC, or `_TOC_INDEX_EMPTY_SLOT`. The entries are inserted in the TOC order, so that the lookup finds the first
+        of the entries with the same name (as the linear scan of the TOC does).
+
+        The hash of the name is computed by `toc_index_hash`; it is case-insensitive (for ASCII characters), so that
+        the bootloader can perform case-insensitive lookup of extractable entries on Windows and macOS.
+        """
+        num_slots = 2
+        while num_slots < 2 * len(names):
+            num_slots *= 2
+        mask = num_slots - 1
+
+        slots = [_TOC_INDEX_EMPTY_SLOT] * num_slots
+        for name, entry_offset in zip(names, entry_offsets):
+            slot = toc_index_hash(name) & mask
+            while slots[slot] != _TOC_INDEX_EMPTY_SLOT:
+                slot = (slot + 1) & mask
+            slots[slot] = entry_offset
+
+        return struct.pack(f'!{num_slots + 1}I', num_slots, *slots)
 
 
 class SplashWriter:
@@ -24,11 +24,11 @@
 
 from PyInstaller import HOMEPATH, PLATFORM
 from PyInstaller import log as logging
-from PyInstaller.archive.writers import CArchiveWriter, ZlibArchiveWriter
+from PyInstaller.archive.writers import CARCHIVE_CODECS, CArchiveWriter, ZlibArchiveWriter, get_codec_id
 from PyInstaller.building.datastruct import Target, _check_guts_eq, normalize_pyz_toc, normalize_toc
 from PyInstaller.building.utils import (
-    _check_guts_toc, _make_clean_directory, _rmtree, process_collected_binary, get_code_object, strip_paths_in_code,
-    compile_pymodule
+    _check_guts_toc, _make_clean_directory, _rmtree, process_collected_binaries, get_code_object, strip_paths_in_code,
+    compile_pymodule, load_import_order
 )
 from PyInstaller.building.splash import Splash  # argument type validation in EXE
 from PyInstaller.compat import is_cygwin, is_darwin, is_linux, is_win, strict_collect_mode, is_nogil
@@ -59,6 +59,24 @@ def __init__(self, *tocs, **kwargs):
 
             name
                 A filename for the .pyz. Normally not needed, as the generated name will do fine.
+            codec
+                Name of the compression codec for the modules: `zlib` (the default), `zlib-dict` (zlib with a shared
+                compression dictionary built from the collected modules; smaller archive, but slower build), `lzma`
+                (smaller archive, but slower decompression), or `stored` (no compression; fastest to load, but largest
+                archive).
+            use_mmap
+                If True, the frozen application memory-maps the file containing the PYZ archive once, instead of
+                opening it each time a module is imported. On Windows, this prevents the executable from being moved
+                or deleted while the application is running; on other platforms, the executable must not be
+                overwritten in place.
+            import_order
+                Filename of the import profile report from a "training" run of the frozen application (obtained by
+                running it with the PYINSTALLER_IMPORT_PROFILE environment variable set to the report filename), of a
+                report of `python -X importtime`, or of a file containing a plain list of module names, one per line.
+                Relative paths are resolved with respect to the spec file's directory. Alternatively, a list (or tuple)
+                of module names. The modules are placed at the start of the archive in the order of their imports, and
+                the frozen application reads and decompresses them in a background thread at start-up, ahead of their
+                imports.
         """
         if kwargs.get("cipher"):
             from PyInstaller.exceptions import RemovedCipherFeatureError
@@ -76,8 +94,24 @@ def __init__(self, *tocs, **kwargs):
         if name is None:
             self.name = os.path.splitext(self.tocfilename)[0] + '.pyz'
 
+        self.codec = kwargs.get('codec', 'zlib')
+        get_codec_id(self.codec)  # Validate the codec name.
+        self.use_mmap = bool(kwargs.get('use_mmap', False))
+
+        self.import_order = []
+        import_order = kwargs.get('import_order')
+        if isinstance(import_order, (list, tuple)):
+            self.import_order = list(dict.fromkeys(import_order))  # Remove duplicates, keeping the first occurrence.
+        elif import_order:
+            if not isinstance(import_order, (str, os.PathLike)):
+                raise TypeError(
+                    "PYZ: 'import_order' must be a filename or a list of module names, not "
+                    f"{type(import_order).__name__!r}!"
+                )
+            self.import_order = load_import_order(os.path.join(CONF['specpath'], import_order))
+
         # PyInstaller bootstrapping modules.
-        bootstrap_dependencies = get_bootstrap_modules()
+        bootstrap_dependencies = get_bootstrap_modules(pyz_codec=self.codec, pyz_mmap=self.use_mmap)
 
         # Compile the python modules that are part of bootstrap dependencies, so that they can be collected into the
         # CArchive/PKG and imported by the bootstrap script.
@@ -130,11 +164,16 @@ def __init__(self, *tocs, **kwargs):
     _GUTS = (
         # input parameters
         ('name', _check_guts_eq),
+        ('codec', _check_guts_eq),
+        ('use_mmap', _check_guts_eq),
+        ('import_order', _check_guts_eq),
         ('toc', _check_guts_toc),
         # no calculated/analysed values
     )
 
     def assemble(self):
+        from PyInstaller.config import CONF
+
         logger.info("Building PYZ (ZlibArchive) %s", self.name)
 
         # Ensure code objects are available for all modules we are about to collect.
@@ -155,8 +194,22 @@ def assemble(self):
         # Remove leading parts of paths in code objects.
         self.code_dict = {name: strip_paths_in_code(code) for name, code in self.code_dict.items()}
 
-        # Create the archive
-        ZlibArchiveWriter(self.name, archive_toc, code_dict=self.code_dict)
+        # Create the archive. If the archive from the previous build exists, re-use its compressed entries for the
+        # modules that have not changed.
+        writer = ZlibArchiveWriter(
+            self.name,
+            archive_toc,
+            code_dict=self.code_dict,
+            jobs=CONF.get('jobs'),
+            previous_archive=self.name,
+            codec=self.codec,
+            use_mmap=self.use_mmap,
+            import_order=self.import_order,
+        )
+        logger.debug(
+            "PYZ archive: %d entries compressed, %d entries re-used from previous build, %d entries prefetched at "
+            "start-up.", writer.compressed_entries, writer.reused_entries, writer.prefetched_entries
+        )
         logger.info("Building PYZ (ZlibArchive) %s completed successfully.", self.name)
 
 
@@ -209,9 +262,9 @@ def __init__(
         name
             An optional filename for the PKG.
         cdict
-            Dictionary that specifies compression by typecode. For Example, PYZ is left uncompressed so that it
-            can be accessed inside the PKG. The default uses sensible values. If zlib is not available, no
-            compression is used.
+            Dictionary that specifies compression by typecode. The values are either compression codec names (`zlib`
+            or `stored`), or boolean compression flags (`True` for zlib). For Example, PYZ is left uncompressed so that
+            it can be accessed inside the PKG. The default uses sensible values.
         exclude_binaries
             If True, EXTENSIONs and BINARYs will be left out of the PKG, and forwarded to its container (usually
             a COLLECT).
@@ -250,6 +303,9 @@ def __init__(
                 # Do not compress target names in symbolic links.
                 'SYMLINK': UNCOMPRESSED,
             }
+        for typecode, codec in self.cdict.items():
+            if get_codec_id(codec) not in CARCHIVE_CODECS:
+                raise ValueError(f"Compression codec {codec!r} for {typecode!r} entries is not supported in PKG!")
 
         self.__postinit__()
 
@@ -269,6 +325,8 @@ def __init__(
     )
 
     def assemble(self):
+        from PyInstaller.config import CONF
+
         logger.info("Building PKG (CArchive) %s", os.path.basename(self.name))
 
         pkg_file = pathlib.Path(self.name).resolve()  # Used to detect attempts at PKG feeding itself
@@ -276,6 +334,26 @@ def assemble(self):
         bootstrap_toc = []  # TOC containing bootstrap scripts and modules, which must not be sorted.
         archive_toc = []  # TOC containing all other elements. Sorted to enable reproducible builds.
 
+        # In onefile mode, process all binaries (strip, UPX, and platform-specific processing) in a single batch ahead
+        # of time, so that they can be processed in parallel.
+        if self.exclude_binaries:
+            binaries = []
+        else:
+            binaries = [(src_name, dest_name, typecode == 'EXTENSION') for dest_name, src_name, typecode in self.toc
+                        if typecode in ('BINARY', 'EXTENSION') and os.path.exists(src_name)
+                        and pathlib.Path(src_name).resolve() != pkg_file]
+        processed_names = process_collected_binaries(
+            binaries,
+            use_strip=self.strip_binaries,
+            use_upx=self.upx_binaries,
+            upx_exclude=self.upx_exclude,
+            target_arch=self.target_arch,
+            codesign_identity=self.codesign_identity,
+            entitlements_file=self.entitlements_file,
+        )
+        processed_binaries = {(dest_name, src_name): processed_name
+                              for (src_name, dest_name, _), processed_name in zip(binaries, processed_names)}
+
         for dest_name, src_name, typecode in self.toc:
             # Ensure that the source file exists, if necessary. Skip the check for OPTION entries, where 'src_name' is
             # None. Also skip DEPENDENCY entries due to special contents of 'dest_name' and/or 'src_name'. Same for the
@@ -309,19 +387,9 @@ def assemble(self):
                     # container's TOC de-duplication should take care of them (same as with EXTENSION ones, really).
                     self.dependencies.append((dest_name, src_name, typecode))
                 else:
-                    # This is onefile-specific codepath. The binaries (both EXTENSION and BINARY entries) need to be
-                    # processed using `process_collected_binary` helper.
-                    src_name = process_collected_binary(
-                        src_name,
-                        dest_name,
-                        use_strip=self.strip_binaries,
-                        use_upx=self.upx_binaries,
-                        upx_exclude=self.upx_exclude,
-                        target_arch=self.target_arch,
-                        codesign_identity=self.codesign_identity,
-                        entitlements_file=self.entitlements_file,
-                        strict_arch_validation=(typecode == 'EXTENSION'),
-                    )
+                    # This is onefile-specific codepath. The binaries (both EXTENSION and BINARY entries) have been
+                    # processed using `process_collected_binaries` helper above.
+                    src_name = processed_binaries[(dest_name, src_name)]
                     archive_toc.append((dest_name, src_name, self.cdict.get(typecode, False), self.xformdict[typecode]))
             elif typecode in ('DATA', 'ZIPFILE'):
                 # Same logic as above for BINARY and EXTENSION; if `exclude_binaries` is set, we are in onedir mode;
@@ -351,7 +419,7 @@ def assemble(self):
         archive_toc.sort(key=itemgetter(3, 0))
         # Do *not* sort modules and scripts, as their order is important.
         # TODO: Think about having all modules first and then all scripts.
-        CArchiveWriter(self.name, bootstrap_toc + archive_toc, pylib_name=self.python_lib_name)
+        CArchiveWriter(self.name, bootstrap_toc + archive_toc, pylib_name=self.python_lib_name, jobs=CONF.get('jobs'))
 
         logger.info("Building PKG (CArchive) %s completed successfully.", os.path.basename(self.name))
 
@@ -1133,6 +1201,8 @@ def _check_guts(self, data, last_build):
     def assemble(self):
         _make_clean_directory(self.name)
         logger.info("Building COLLECT %s", self.tocbasename)
+
+        collect_toc = []
         for dest_name, src_name, typecode in self.toc:
             # Ensure that the source file exists, if necessary. Skip the check for DEPENDENCY entries due to special
             # contents of 'dest_name' and/or 'src_name'. Same for the SYMLINK entries, where 'src_name' is relative
@@ -1151,6 +1221,25 @@ def assemble(self):
                 raise SystemExit(
                     'Security-Alert: attempting to store file outside of the dist directory: %r. Aborting.' % dest_name
                 )
+            collect_toc.append((dest_name, src_name, typecode))
+
+        # Process all binaries (strip, UPX, and platform-specific processing) in a single batch, so that they can be
+        # processed in parallel.
+        binaries = [(src_name, dest_name, typecode == 'EXTENSION') for dest_name, src_name, typecode in collect_toc
+                    if typecode in ('EXTENSION', 'BINARY')]
+        processed_names = process_collected_binaries(
+            binaries,
+            use_strip=self.strip_binaries,
+            use_upx=self.upx_binaries,
+            upx_exclude=self.upx_exclude,
+            target_arch=self.target_arch,
+            codesign_identity=self.codesign_identity,
+            entitlements_file=self.entitlements_file,
+        )
+        processed_binaries = {(dest_name, src_name): processed_name
+                              for (src_name, dest_name, _), processed_name in zip(binaries, processed_names)}
+
+        for dest_name, src_name, typecode in collect_toc:
             # Create parent directory structure, if necessary
             if typecode in ("EXECUTABLE", "PKG"):
                 dest_path = os.path.join(self.name, dest_name)
@@ -1165,17 +1254,7 @@ def assemble(self):
                     "but there already exists a file at that path!"
                 )
             if typecode in ('EXTENSION', 'BINARY'):
-                src_name = process_collected_binary(
-                    src_name,
-                    dest_name,
-                    use_strip=self.strip_binaries,
-                    use_upx=self.upx_binaries,
-                    upx_exclude=self.upx_exclude,
-                    target_arch=self.target_arch,
-                    codesign_identity=self.codesign_identity,
-                    entitlements_file=self.entitlements_file,
-                    strict_arch_validation=(typecode == 'EXTENSION'),
-                )
+                src_name = processed_binaries[(dest_name, src_name)]
             if typecode == 'SYMLINK':
                 # On Windows, ensure that symlink target path (stored in src_name) is using Windows-style back slash
                 # separators.
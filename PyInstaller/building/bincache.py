@@ -0,0 +1,292 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2024, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+"""
+Index of the binary cache (processed copies of collected binaries; see `PyInstaller.building.utils.
+process_collected_binaries`).
+
+The index of each cache directory is stored as an append-only journal, in which each line is a JSON-encoded record.
+Records are appended while holding an exclusive lock on a separate lock file, so that multiple builds (for example,
+parallel jobs on a CI agent) can share the same cache directory. When the journal grows too large compared to the
+number of live entries, it is compacted (rewritten and atomically replaced). When the total size of the cached files
+exceeds the limit, the least recently used entries are evicted.
+
+Cached files are stored under `<cache directory>/<source file digest>/<destination name>`, so different versions of
+a binary with the same destination name can co-exist in the cache, and a build never overwrites a file that another
+build is using. The index (`index.dat`) and the cached files of older PyInstaller versions, which are stored directly
+under the cache directory, are left alone, as they might still be in use by those versions.
+"""
+
+import contextlib
+import errno
+import json
+import os
+import time
+
+from PyInstaller import compat
+from PyInstaller import log as logging
+
+if compat.is_win:
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+# Default limit for the total size of cached files in a cache directory, in MiB; can be overridden via the
+# PYINSTALLER_BINCACHE_MAX_SIZE environment variable. The value of 0 disables the eviction.
+DEFAULT_MAX_SIZE = 2048
+
+# Entries that have been used within this period (in seconds) are never evicted, as they might be in use by a build
+# that is running concurrently.
+EVICTION_GRACE_PERIOD = 3600
+
+# Compact the journal if it contains more than this many records, and more than twice as many records as there are live
+# entries.
+_COMPACTION_THRESHOLD = 1000
+
+# Maximum time (in seconds) to wait for the lock held by another build, on Windows.
+_LOCK_TIMEOUT = 600
+
+_JOURNAL_NAME = 'index.journal'
+_LOCK_NAME = 'index.lock'
+
+
+@contextlib.contextmanager
+def _locked(lock_file):
+    """
+    Context manager that holds an exclusive lock on the given lock file (which is created if necessary).
+    """
+    with open(lock_file, 'a+b') as fp:
+        if compat.is_win:
+            # `msvcrt.locking` with LK_LOCK gives up after 10 seconds; keep retrying while the lock is held by another
+            # build (which might be compacting a large journal), up to the timeout. Other errors are raised immediately.
+            fp.seek(0)
+            start_time = time.monotonic()
+            while True:
+                try:
+                    msvcrt.locking(fp.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as e:
+                    if e.errno not in (errno.EDEADLOCK, errno.EACCES):
+                        raise
+                    if time.monotonic() - start_time >= _LOCK_TIMEOUT:
+                        raise TimeoutError(
+                            f"Timed out waiting for the lock on the binary cache index {lock_file!r}, which is held by "
+                            "another process."
+                        ) from e
+                    logger.info("Waiting for the lock on the binary cache index %r...", lock_file)
+            try:
+                yield
+            finally:
+                fp.seek(0)
+                msvcrt.locking(fp.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fp.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fp.fileno(), fcntl.LOCK_UN)
+
+
+def _get_max_size():
+    value = compat.getenv('PYINSTALLER_BINCACHE_MAX_SIZE')
+    if not value:
+        return DEFAULT_MAX_SIZE * 1024 * 1024
+    try:
+        return int(value) * 1024 * 1024
+    except ValueError:
+        logger.warning("Ignoring invalid value of PYINSTALLER_BINCACHE_MAX_SIZE: %r", value)
+        return DEFAULT_MAX_SIZE * 1024 * 1024
+
+
+class BinaryCacheIndex:
+    """
+    Index of a binary cache directory. Entries are keyed by `(cached_id, digest)` tuples, where `cached_id` is the
+    case-normalized destination name of the binary, and `digest` is the hex digest of the source file. Each entry
+    records the size of the cached file and the time of its last use.
+
+    The index is read when the object is created. Lookups (`__contains__`, `get_path`) do not modify the object, and
+    are safe to perform from multiple threads. Additions and uses are recorded by `add` and `touch`, and written to the
+    journal (and applied to the object) by `commit`; these should be called from a single thread.
+
+    cache_dir
+            Full path to the cache directory.
+    max_size
+            Limit for the total size of cached files, in bytes. If `None`, the value is obtained from the
+            PYINSTALLER_BINCACHE_MAX_SIZE environment variable (in MiB), or the default is used. If 0, the size is not
+            limited.
+    """
+    def __init__(self, cache_dir, max_size=None):
+        self.cache_dir = cache_dir
+        self.max_size = _get_max_size() if max_size is None else max_size
+
+        self._journal_file = os.path.join(cache_dir, _JOURNAL_NAME)
+        self._lock_file = os.path.join(cache_dir, _LOCK_NAME)
+        self._pending = []
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._entries, _ = self._read_journal()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_path(self, dest_name, digest):
+        """
+        Return the full path to the cached copy of the binary with given destination name and source file digest.
+        """
+        return os.path.join(self.cache_dir, digest, dest_name)
+
+    def add(self, cached_id, digest, size):
+        """
+        Record the addition of a newly processed binary to the cache.
+        """
+        self._pending.append(['add', cached_id, digest, size, time.time()])
+
+    def touch(self, cached_id, digest):
+        """
+        Record the use of a cached binary.
+        """
+        self._pending.append(['use', cached_id, digest, time.time()])
+
+    def commit(self):
+        """
+        Append the pending records to the journal. Compact the journal and evict the least recently used entries, if
+        necessary.
+        """
+        if not self._pending:
+            return
+
+        with _locked(self._lock_file):
+            self._append_records(self._pending)
+            self._pending = []
+
+            # Re-read the journal, to take into account the records appended by other builds.
+            self._entries, num_records = self._read_journal()
+
+            if self.max_size:
+                num_records += self._evict()
+
+            if num_records > _COMPACTION_THRESHOLD and num_records > 2 * len(self._entries):
+                self._compact()
+
+    def _read_journal(self):
+        """
+        Replay the journal. Returns the dictionary of live entries, and the number of records in the journal.
+        """
+        entries = {}
+        num_records = 0
+        try:
+            fp = open(self._journal_file, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return entries, num_records
+
+        with fp:
+            for line in fp:
+                num_records += 1
+                try:
+                    op, cached_id, digest, *args = json.loads(line)
+                    key = (cached_id, digest)
+                    if op == 'add':
+                        size, timestamp = args
+                        entries[key] = [size, timestamp]
+                    elif op == 'use':
+                        timestamp, = args
+                        if key in entries:
+                            entries[key][1] = max(entries[key][1], timestamp)
+                    elif op == 'del':
+                        entries.pop(key, None)
+                except Exception:
+                    # Malformed record (for example, a partially-written one, if a build was interrupted); ignore it.
+                    continue
+
+        return entries, num_records
+
+    def _evict(self):
+        """
+        Evict the least recently used entries until the total size of cached files is within limits. Must be called
+        with the lock held. Returns the number of records appended to the journal.
+        """
+        total_size = sum(size for size, timestamp in self._entries.values())
+        if total_size <= self.max_size:
+            return 0
+
+        # Evict down to 90% of the limit, so that eviction does not need to be performed on every build.
+        target_size = self.max_size * 0.9
+        cutoff_time = time.time() - EVICTION_GRACE_PERIOD
+        evicted = []
+        for key, (size, timestamp) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if total_size <= target_size or timestamp > cutoff_time:
+                break
+            cached_id, digest = key
+            digest_dir = os.path.join(self.cache_dir, digest)
+            self._remove_file(digest_dir, cached_id)
+            try:
+                os.rmdir(digest_dir)  # Succeeds only if there are no other entries with the same digest.
+            except OSError:
+                pass
+            evicted.append(key)
+            total_size -= size
+
+        if not evicted:
+            return 0
+
+        logger.debug("Evicted %d entries from binary cache %r.", len(evicted), self.cache_dir)
+        for key in evicted:
+            del self._entries[key]
+        self._append_records([['del', cached_id, digest] for cached_id, digest in evicted])
+        return len(evicted)
+
+    def _append_records(self, records):
+        """
+        Append the given records to the journal. Must be called with the lock held.
+        """
+        data = ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+        with open(self._journal_file, 'a+b') as fp:
+            # If the last record was only partially written (e.g., a build was interrupted), terminate it, so that it
+            # does not corrupt the first of our records.
+            fp.seek(0, os.SEEK_END)
+            if fp.tell() > 0:
+                fp.seek(-1, os.SEEK_END)
+                if fp.read(1) != b'\n':
+                    data = b'\n' + data
+            fp.write(data)
+
+    @staticmethod
+    def _remove_file(base_dir, name):
+        """
+        Remove the given file (relative to the base directory), and its parent directories below the base directory,
+        if they are empty.
+        """
+        path = os.path.join(base_dir, name)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        path = os.path.dirname(path)
+        while os.path.normcase(path) != os.path.normcase(base_dir):
+            try:
+                os.rmdir(path)
+            except OSError:
+                break
+            path = os.path.dirname(path)
+
+    def _compact(self):
+        """
+        Rewrite the journal so that it contains only the records of live entries. Must be called with the lock held.
+        """
+        tmp_file = f"{self._journal_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as fp:
+            for (cached_id, digest), (size, timestamp) in self._entries.items():
+                fp.write(json.dumps(['add', cached_id, digest, size, timestamp]) + '\n')
+        os.replace(tmp_file, self._journal_file)
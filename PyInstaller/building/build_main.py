@@ -38,6 +38,9 @@
 from PyInstaller.compat import is_win, is_conda, is_darwin, is_linux
 from PyInstaller.depend import bindepend
 from PyInstaller.depend.analysis import initialize_modgraph, HOOK_PRIORITY_USER_HOOKS
+from PyInstaller.depend.bindepcache import BinaryDependencyCache
+from PyInstaller.depend.scancache import ModuleScanCache
+from PyInstaller.depend.scanpool import ModuleScanPool
 from PyInstaller.depend.utils import create_py3_base_library, scan_code_for_ctypes
 from PyInstaller import isolated
 from PyInstaller.utils.misc import absnormpath, get_path_to_toplevel_modules, mtime
@@ -130,7 +133,7 @@ def discover_hook_directories():
     return hook_directories
 
 
-def find_binary_dependencies(binaries, import_packages, symlink_suppression_patterns):
+def find_binary_dependencies(binaries, import_packages, symlink_suppression_patterns, cache=None):
     """
     Find dynamic dependencies (linked shared libraries) for the provided list of binaries.
 
@@ -150,9 +153,12 @@ def find_binary_dependencies(binaries, import_packages, symlink_suppression_patt
             is preserved). When binary dependency analysis discovers a shared library, it matches its *source path*
             against all symlink suppression patterns (using `pathlib.PurePath.match`) to determine whether to create
             a symbolic link to top-level application directory or not.
+    cache
+            Optional `BinaryDependencyCache` for the results of binary dependency analysis.
 
     :return: expanded list of binaries and then dependencies.
     """
+    from PyInstaller.config import CONF
 
     # Extra library search paths (used on Windows to resolve DLL paths).
     extra_libdirs = []
@@ -310,6 +316,8 @@ def process_search_paths():
         binaries,
         search_paths=extra_libdirs,
         symlink_suppression_patterns=symlink_suppression_patterns,
+        jobs=CONF.get('jobs'),
+        cache=cache,
     )
 
 
@@ -662,141 +670,189 @@ def assemble(self):
 
         for m in self.excludes:
             logger.debug("Excluding module '%s'" % m)
-        self.graph = initialize_modgraph(excludes=self.excludes, user_hook_dirs=self.hookspath)
-
-        # Initialize `binaries` and `datas` with `_input_binaries` and `_input_datas`. Make sure to copy the lists
-        # to prevent modifications of original lists, which we need to store in original form for guts comparison.
-        self.datas = [entry for entry in self._input_datas]
-        self.binaries = [entry for entry in self._input_binaries]
-
-        # TODO: find a better place where to put 'base_library.zip' and when to created it.
-        # For Python 3 it is necessary to create file 'base_library.zip' containing core Python modules. In Python 3
-        # some built-in modules are written in pure Python. base_library.zip is a way how to have those modules as
-        # "built-in".
-        libzip_filename = os.path.join(CONF['workpath'], 'base_library.zip')
-        create_py3_base_library(libzip_filename, graph=self.graph)
-        # Bundle base_library.zip as data file.
-        # Data format of TOC item: ('relative_path_in_dist_dir', 'absolute_path_on_disk', 'DATA')
-        self.datas.append((os.path.basename(libzip_filename), libzip_filename, 'DATA'))
-
-        # Expand sys.path of module graph. The attribute is the set of paths to use for imports: sys.path, plus our
-        # loader, plus other paths from e.g. --path option).
-        self.graph.path = self.pathex + self.graph.path
-
-        # Scan for legacy namespace packages.
-        self.graph.scan_legacy_namespace_packages()
-
-        # Search for python shared library, which we need to collect into frozen application.
-        logger.info('Looking for Python shared library...')
-        python_lib = bindepend.get_python_library_path()
-        if python_lib is None:
-            from PyInstaller.exceptions import PythonLibraryNotFoundError
-            raise PythonLibraryNotFoundError()
-        logger.info('Using Python shared library: %s', python_lib)
-        if is_darwin and osxutils.is_framework_bundle_lib(python_lib):
-            # If python library is located in macOS .framework bundle, collect the bundle, and create symbolic link to
-            # top-level directory.
-            src_path = pathlib.PurePath(python_lib)
-            dst_path = pathlib.PurePath(src_path.relative_to(src_path.parent.parent.parent.parent))
-            self.binaries.append((str(dst_path), str(src_path), 'BINARY'))
-            self.binaries.append((os.path.basename(python_lib), str(dst_path), 'SYMLINK'))
-        else:
-            self.binaries.append((os.path.basename(python_lib), python_lib, 'BINARY'))
-
-        # -- Module graph. --
-        #
-        # Construct the module graph of import relationships between modules required by this user's application. For
-        # each entry point (top-level user-defined Python script), all imports originating from this entry point are
-        # recursively parsed into a subgraph of the module graph. This subgraph is then connected to this graph's root
-        # node, ensuring imported module nodes will be reachable from the root node -- which is is (arbitrarily) chosen
-        # to be the first entry point's node.
-
-        # List of graph nodes corresponding to program scripts.
-        program_scripts = []
-
-        # Assume that if the script does not exist, Modulegraph will raise error. Save the graph nodes of each in
-        # sequence.
-        for script in self.inputs:
-            logger.info("Analyzing %s", script)
-            program_scripts.append(self.graph.add_script(script))
-
-        # Analyze the script's hidden imports (named on the command line)
-        self.graph.add_hiddenimports(self.hiddenimports)
-
-        # -- Post-graph hooks. --
-        self.graph.process_post_graph_hooks(self)
 
-        # Update 'binaries' and 'datas' TOC lists with entries collected from hooks.
-        self.binaries += self.graph.make_hook_binaries_toc()
-        self.datas += self.graph.make_hook_datas_toc()
-
-        # We do not support zipped eggs anymore (PyInstaller v6.0), so `zipped_data` and `zipfiles` are always empty.
-        self.zipped_data = []
-        self.zipfiles = []
+        # Persistent cache of module scan results, which allows us to avoid re-scanning unchanged modules when the
+        # analysis is re-run.
+        scan_cache = ModuleScanCache(
+            os.path.join(CONF['cachedir'], f'modscancache-py{sys.version_info[0]}{sys.version_info[1]}.dat')
+        )
 
-        # -- Automatic binary vs. data reclassification. --
-        #
-        # At this point, `binaries` and `datas` contain  TOC entries supplied by user via input arguments, and by hooks
-        # that were ran during the analysis. Neither source can be fully trusted regarding the DATA vs BINARY
-        # classification (no thanks to our hookutils not being 100% reliable, either!). Therefore, inspect the files and
-        # automatically reclassify them as necessary.
-        #
-        # The proper classification is important especially for collected binaries - to ensure that they undergo binary
-        # dependency analysis and platform-specific binary processing. On macOS, the .app bundle generation code also
-        # depends on files to be properly classified.
-        #
-        # For entries added to `binaries` and `datas` after this point, we trust their typecodes due to the nature of
-        # their origin.
-        combined_toc = normalize_toc(self.datas + self.binaries)
+        # Persistent cache of binary vs. data classification and binary dependency analysis results. Shared between
+        # all builds (and projects) that use the same cache directory.
+        bindep_cache = BinaryDependencyCache(os.path.join(CONF['cachedir'], f'bindepcache-{compat.architecture}.dat'))
 
-        logger.info('Performing binary vs. data reclassification (%d entries)', len(combined_toc))
+        # If parallel build was requested, scan source modules in worker processes. The module graph itself is still
+        # constructed here, in the same order as without the worker processes.
+        jobs = CONF.get('jobs') or 1
+        scan_pool = ModuleScanPool(jobs) if jobs > 1 else None
 
-        self.datas = []
-        self.binaries = []
+        # Make sure that the scan workers are shut down even if the construction of the module graph fails (for
+        # example, due to an error in a hook).
+        self.graph = None
+        try:
+            self.graph = initialize_modgraph(
+                excludes=self.excludes,
+                user_hook_dirs=self.hookspath,
+                scan_cache=scan_cache,
+                scan_pool=scan_pool,
+            )
 
-        for dest_name, src_name, typecode in combined_toc:
-            # Returns 'BINARY' or 'DATA', or None if file cannot be classified.
-            detected_typecode = bindepend.classify_binary_vs_data(src_name)
-            if detected_typecode is not None:
-                if detected_typecode != typecode:
-                    logger.debug(
-                        "Reclassifying collected file %r from %s to %s...", src_name, typecode, detected_typecode
-                    )
-                typecode = detected_typecode
-
-            # Put back into corresponding TOC list.
-            if typecode in {'BINARY', 'EXTENSION'}:
-                self.binaries.append((dest_name, src_name, typecode))
+            # Initialize `binaries` and `datas` with `_input_binaries` and `_input_datas`. Make sure to copy the lists
+            # to prevent modifications of original lists, which we need to store in original form for guts comparison.
+            self.datas = [entry for entry in self._input_datas]
+            self.binaries = [entry for entry in self._input_binaries]
+
+            # TODO: find a better place where to put 'base_library.zip' and when to created it.
+            # For Python 3 it is necessary to create file 'base_library.zip' containing core Python modules. In Python 3
+            # some built-in modules are written in pure Python. base_library.zip is a way how to have those modules as
+            # "built-in".
+            libzip_filename = os.path.join(CONF['workpath'], 'base_library.zip')
+            create_py3_base_library(libzip_filename, graph=self.graph)
+            # Bundle base_library.zip as data file.
+            # Data format of TOC item: ('relative_path_in_dist_dir', 'absolute_path_on_disk', 'DATA')
+            self.datas.append((os.path.basename(libzip_filename), libzip_filename, 'DATA'))
+
+            # Expand sys.path of module graph. The attribute is the set of paths to use for imports: sys.path, plus our
+            # loader, plus other paths from e.g. --path option).
+            self.graph.path = self.pathex + self.graph.path
+
+            # Scan for legacy namespace packages.
+            self.graph.scan_legacy_namespace_packages()
+
+            # Search for python shared library, which we need to collect into frozen application.
+            logger.info('Looking for Python shared library...')
+            python_lib = bindepend.get_python_library_path()
+            if python_lib is None:
+                from PyInstaller.exceptions import PythonLibraryNotFoundError
+                raise PythonLibraryNotFoundError()
+            logger.info('Using Python shared library: %s', python_lib)
+            if is_darwin and osxutils.is_framework_bundle_lib(python_lib):
+                # If python library is located in macOS .framework bundle, collect the bundle, and create symbolic link
+                # to top-level directory.
+                src_path = pathlib.PurePath(python_lib)
+                dst_path = pathlib.PurePath(src_path.relative_to(src_path.parent.parent.parent.parent))
+                self.binaries.append((str(dst_path), str(src_path), 'BINARY'))
+                self.binaries.append((os.path.basename(python_lib), str(dst_path), 'SYMLINK'))
             else:
-                self.datas.append((dest_name, src_name, typecode))
-
-        # -- Look for dlls that are imported by Python 'ctypes' module. --
-        # First get code objects of all modules that import 'ctypes'.
-        logger.info('Looking for ctypes DLLs')
-        # dict like: {'module1': code_obj, 'module2': code_obj}
-        ctypes_code_objs = self.graph.get_code_using("ctypes")
+                self.binaries.append((os.path.basename(python_lib), python_lib, 'BINARY'))
+
+            # -- Module graph. --
+            #
+            # Construct the module graph of import relationships between modules required by this user's application.
+            # For each entry point (top-level user-defined Python script), all imports originating from this entry point
+            # are recursively parsed into a subgraph of the module graph. This subgraph is then connected to this
+            # graph's root node, ensuring imported module nodes will be reachable from the root node -- which is is
+            # (arbitrarily) chosen to be the first entry point's node.
+
+            # List of graph nodes corresponding to program scripts.
+            program_scripts = []
+
+            # Assume that if the script does not exist, Modulegraph will raise error. Save the graph nodes of each in
+            # sequence.
+            for script in self.inputs:
+                logger.info("Analyzing %s", script)
+                program_scripts.append(self.graph.add_script(script))
+
+            # Analyze the script's hidden imports (named on the command line)
+            self.graph.add_hiddenimports(self.hiddenimports)
+
+            # -- Post-graph hooks. --
+            self.graph.process_post_graph_hooks(self)
+
+            # Update 'binaries' and 'datas' TOC lists with entries collected from hooks.
+            self.binaries += self.graph.make_hook_binaries_toc()
+            self.datas += self.graph.make_hook_datas_toc()
+
+            # We do not support zipped eggs anymore (PyInstaller v6.0), so `zipped_data` and `zipfiles` are always
+            # empty.
+            self.zipped_data = []
+            self.zipfiles = []
+
+            # -- Automatic binary vs. data reclassification. --
+            #
+            # At this point, `binaries` and `datas` contain  TOC entries supplied by user via input arguments, and by
+            # hooks that were ran during the analysis. Neither source can be fully trusted regarding the DATA vs BINARY
+            # classification (no thanks to our hookutils not being 100% reliable, either!). Therefore, inspect the files
+            # and automatically reclassify them as necessary.
+            #
+            # The proper classification is important especially for collected binaries - to ensure that they undergo
+            # binary dependency analysis and platform-specific binary processing. On macOS, the .app bundle generation
+            # code also depends on files to be properly classified.
+            #
+            # For entries added to `binaries` and `datas` after this point, we trust their typecodes due to the nature
+            # of their origin.
+            combined_toc = normalize_toc(self.datas + self.binaries)
+
+            logger.info('Performing binary vs. data reclassification (%d entries)', len(combined_toc))
+
+            self.datas = []
+            self.binaries = []
+
+            # Classify all files in one batch; returns 'BINARY' or 'DATA', or None if file cannot be classified.
+            detected_typecodes = bindepend.classify_binary_vs_data_batch(
+                [src_name for dest_name, src_name, typecode in combined_toc],
+                jobs=CONF.get('jobs'),
+                cache=bindep_cache,
+            )
 
-        for name, co in ctypes_code_objs.items():
-            # Get dlls that might be needed by ctypes.
-            logger.debug('Scanning %s for ctypes-based references to shared libraries', name)
-            try:
-                ctypes_binaries = scan_code_for_ctypes(co)
-                # As this scan happens after automatic binary-vs-data classification, we need to validate the binaries
-                # ourselves, just in case.
-                for dest_name, src_name, typecode in set(ctypes_binaries):
-                    # Allow for `None` in case re-classification is not supported on the given platform.
-                    if bindepend.classify_binary_vs_data(src_name) not in (None, 'BINARY'):
-                        logger.warning("Ignoring %s found via ctypes - not a valid binary!", src_name)
-                        continue
+            for dest_name, src_name, typecode in combined_toc:
+                detected_typecode = detected_typecodes[src_name]
+                if detected_typecode is not None:
+                    if detected_typecode != typecode:
+                        logger.debug(
+                            "Reclassifying collected file %r from %s to %s...", src_name, typecode, detected_typecode
+                        )
+                    typecode = detected_typecode
+
+                # Put back into corresponding TOC list.
+                if typecode in {'BINARY', 'EXTENSION'}:
                     self.binaries.append((dest_name, src_name, typecode))
-            except Exception as ex:
-                raise RuntimeError(f"Failed to scan the module '{name}'. This is a bug. Please report it.") from ex
+                else:
+                    self.datas.append((dest_name, src_name, typecode))
 
-        self.datas.extend((dest, source, "DATA")
-                          for (dest, source) in format_binaries_and_datas(self.graph.metadata_required()))
+            # -- Look for dlls that are imported by Python 'ctypes' module. --
+            # First get code objects of all modules that import 'ctypes'.
+            logger.info('Looking for ctypes DLLs')
+            # dict like: {'module1': code_obj, 'module2': code_obj}
+            ctypes_code_objs = self.graph.get_code_using("ctypes")
 
-        # Analyze run-time hooks.
-        rhtook_scripts = self.graph.analyze_runtime_hooks(self.custom_runtime_hooks)
+            for name, co in ctypes_code_objs.items():
+                # Get dlls that might be needed by ctypes.
+                logger.debug('Scanning %s for ctypes-based references to shared libraries', name)
+                try:
+                    ctypes_binaries = scan_code_for_ctypes(co)
+                    # As this scan happens after automatic binary-vs-data classification, we need to validate the
+                    # binaries ourselves, just in case.
+                    for dest_name, src_name, typecode in set(ctypes_binaries):
+                        # Allow for `None` in case re-classification is not supported on the given platform.
+                        if bindepend.classify_binary_vs_data(src_name, cache=bindep_cache) not in (None, 'BINARY'):
+                            logger.warning("Ignoring %s found via ctypes - not a valid binary!", src_name)
+                            continue
+                        self.binaries.append((dest_name, src_name, typecode))
+                except Exception as ex:
+                    raise RuntimeError(f"Failed to scan the module '{name}'. This is a bug. Please report it.") from ex
+
+            self.datas.extend((dest, source, "DATA")
+                              for (dest, source) in format_binaries_and_datas(self.graph.metadata_required()))
+
+            # Analyze run-time hooks.
+            rhtook_scripts = self.graph.analyze_runtime_hooks(self.custom_runtime_hooks)
+        finally:
+            # Module graph is complete at this point (or its construction failed); shut down the scan workers.
+            if scan_pool is not None:
+                if self.graph is not None:
+                    self.graph._scan_pool = None
+                scan_pool.close()
+
+        # Persist the scan cache for subsequent builds.
+        scan_cache.save()
+
+        dir_index = self.graph._dir_index
+        logger.debug(
+            "Module search directory index: %d directories listed, %d lookups (%d found), %d lookups via importers, "
+            "%d invalidations.", dir_index.listings, dir_index.lookups, dir_index.found, dir_index.fallbacks,
+            dir_index.invalidations
+        )
 
         # -- Extract the nodes of the graph as TOCs for further processing. --
 
@@ -946,8 +1002,14 @@ def assemble(self):
 
         collected_packages = self.graph.get_collected_packages()
         self.binaries.extend(
-            find_binary_dependencies(self.binaries, collected_packages, self.graph._bindepend_symlink_suppression)
+            find_binary_dependencies(
+                self.binaries,
+                collected_packages,
+                self.graph._bindepend_symlink_suppression,
+                cache=bindep_cache,
+            )
         )
+        bindep_cache.save()
 
         # Apply work-around for (potential) binaries collected from `pywin32` package...
         if is_win:
@@ -1224,6 +1286,17 @@ def __add_options(parser):
         default=False,
         help="Clean PyInstaller cache and remove temporary files before building.",
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=None,
+        metavar="N",
+        help="Number of parallel jobs to use during the build. If greater than one, source modules are scanned for "
+        "imports by N worker processes during the analysis. Binary dependency analysis, processing of collected "
+        "binaries (strip, UPX), and compression of the PYZ and CArchive archives use up to N threads. By default, "
+        "source modules are scanned serially, and the number of threads is chosen based on the number of CPUs.",
+    )
 
 
 def main(
@@ -1248,5 +1321,6 @@ def main(
 
     CONF['ui_admin'] = kw.get('ui_admin', False)
     CONF['ui_access'] = kw.get('ui_uiaccess', False)
+    CONF['jobs'] = kw.get('jobs')
 
     build(specfile, distpath, workpath, clean_build)
@@ -461,6 +461,16 @@ def __add_options(parser):
         '"v" (equivalent to "--debug imports"), "u", "W <warning control>", "X <xoption>", and "hash_seed=<value>". '
         'For details, see the section "Specifying Python Interpreter Options" in PyInstaller manual.',
     )
+    g.add_argument(
+        '--lazy-import',
+        dest='lazy_imports',
+        metavar='MODULENAME',
+        action='append',
+        default=[],
+        help='Defer the execution of the named module (and its submodules) in the frozen application until its '
+        'attributes are first accessed. The name may contain "*" and "?" wildcards. This option can be used multiple '
+        'times. Equivalent to "--python-option X pyi_lazy_imports=<comma-separated names>".',
+    )
     g.add_argument(
         "-s",
         "--strip",
@@ -703,6 +713,7 @@ def main(
     argv_emulation=False,
     hide_console=None,
     optimize=None,
+    lazy_imports=[],
     **_kwargs
 ):
     # Default values for onefile and console when not explicitly specified on command-line (indicated by None)
@@ -841,6 +852,8 @@ def main(
     # Create OPTIONs array
     if 'imports' in debug and 'v' not in python_options:
         python_options.append('v')
+    if lazy_imports:
+        python_options.append('X pyi_lazy_imports=' + ','.join(lazy_imports))
     python_options_array = [(opt, None, 'OPTION') for opt in python_options]
 
     d = {
@@ -17,7 +17,7 @@
 
 from PyInstaller.building.api import COLLECT, EXE
 from PyInstaller.building.datastruct import Target, logger, normalize_toc
-from PyInstaller.building.utils import _check_path_overlap, _rmtree, process_collected_binary
+from PyInstaller.building.utils import _check_path_overlap, _rmtree, process_collected_binaries
 from PyInstaller.compat import is_darwin, strict_collect_mode
 from PyInstaller.building.icon import normalize_icon_type
 import PyInstaller.utils.misc as miscutils
@@ -601,8 +601,32 @@ def assemble(self):
         # Pre-process the TOC into its final BUNDLE-compatible form.
         bundle_toc = self._process_bundle_toc(self.toc)
 
-        # Perform the actual collection.
+        # Process extensions and binaries via cache, in a single batch. This ensures that these files undergo
+        # additional binary processing - have paths to linked libraries rewritten (relative to `@rpath`) and have rpath
+        # set to the top-level directory (relative to `@loader_path`, i.e., the file's location). The "top-level"
+        # directory in this case corresponds to `Contents/MacOS` (where `sys._MEIPASS` also points), so we need to pass
+        # the cache retrieval function the *original* destination path (which is without preceding
+        # `Contents/MacOS`).
         CONTENTS_FRAMEWORKS_PATH = pathlib.PurePath('Contents/Frameworks')
+        binaries = [(dest_name, src_name, typecode) for dest_name, src_name, typecode in bundle_toc
+                    if typecode in ('EXTENSION', 'BINARY')]
+        processed_names = process_collected_binaries(
+            [(
+                src_name,
+                str(pathlib.PurePath(dest_name).relative_to(CONTENTS_FRAMEWORKS_PATH)),
+                typecode == 'EXTENSION',
+            ) for dest_name, src_name, typecode in binaries],
+            use_strip=self.strip,
+            use_upx=self.upx,
+            upx_exclude=self.upx_exclude,
+            target_arch=self.target_arch,
+            codesign_identity=self.codesign_identity,
+            entitlements_file=self.entitlements_file,
+        )
+        processed_binaries = {(dest_name, src_name): processed_name
+                              for (dest_name, src_name, _), processed_name in zip(binaries, processed_names)}
+
+        # Perform the actual collection.
         for dest_name, src_name, typecode in bundle_toc:
             # Create parent directory structure, if necessary
             dest_path = os.path.join(self.name, dest_name)  # Absolute destination path
@@ -614,25 +638,9 @@ def assemble(self):
                     f"Pyinstaller needs to create a directory at {dest_dir!r}, "
                     "but there already exists a file at that path!"
                 )
-            # Copy extensions and binaries from cache. This ensures that these files undergo additional binary
-            # processing - have paths to linked libraries rewritten (relative to `@rpath`) and have rpath set to the
-            # top-level directory (relative to `@loader_path`, i.e., the file's location). The "top-level" directory
-            # in this case corresponds to `Contents/MacOS` (where `sys._MEIPASS` also points), so we need to pass
-            # the cache retrieval function the *original* destination path (which is without preceding
-            # `Contents/MacOS`).
+            # Copy extensions and binaries from cache (see above).
             if typecode in ('EXTENSION', 'BINARY'):
-                orig_dest_name = str(pathlib.PurePath(dest_name).relative_to(CONTENTS_FRAMEWORKS_PATH))
-                src_name = process_collected_binary(
-                    src_name,
-                    orig_dest_name,
-                    use_strip=self.strip,
-                    use_upx=self.upx,
-                    upx_exclude=self.upx_exclude,
-                    target_arch=self.target_arch,
-                    codesign_identity=self.codesign_identity,
-                    entitlements_file=self.entitlements_file,
-                    strict_arch_validation=(typecode == 'EXTENSION'),
-                )
+                src_name = processed_binaries[(dest_name, src_name)]
             if typecode == 'SYMLINK':
                 os.symlink(src_name, dest_path)  # Create link at dest_path, pointing at (relative) src_name
             else:
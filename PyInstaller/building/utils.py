@@ -9,6 +9,7 @@
 # SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
 #-----------------------------------------------------------------------------
 
+import concurrent.futures
 import fnmatch
 import glob
 import hashlib
@@ -21,10 +22,12 @@
 import struct
 import subprocess
 import sys
+import threading
 import zipfile
 
 from PyInstaller import compat
 from PyInstaller import log as logging
+from PyInstaller.building.bincache import BinaryCacheIndex
 from PyInstaller.compat import EXTENSION_SUFFIXES, is_darwin, is_win, is_linux
 from PyInstaller.config import CONF
 from PyInstaller.exceptions import InvalidSrcDestTupleError
@@ -122,14 +125,131 @@ def process_collected_binary(
 
     In addition to given arguments, this function also uses CONF['cachedir'] and CONF['upx_dir'].
     """
-    from PyInstaller.config import CONF
+    return process_collected_binaries(
+        [(src_name, dest_name, strict_arch_validation)],
+        use_strip=use_strip,
+        use_upx=use_upx,
+        upx_exclude=upx_exclude,
+        target_arch=target_arch,
+        codesign_identity=codesign_identity,
+        entitlements_file=entitlements_file,
+        jobs=1,
+    )[0]
+
+
+def process_collected_binaries(
+    binaries,
+    use_strip=False,
+    use_upx=False,
+    upx_exclude=None,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    jobs=None,
+):
+    """
+    Process the given collected binaries; the batched equivalent of `process_collected_binary`. The `binaries` is a
+    list of `(src_name, dest_name, strict_arch_validation)` tuples, and the returned list contains the names of the
+    processed files, in the same order.
 
-    # We need to use cache in the following scenarios:
-    #  * extra binary processing due to use of `strip` or `upx`
-    #  * building on macOS, where we need to rewrite library paths in binaries' headers and (re-)sign the binaries.
-    if not use_strip and not use_upx and not is_darwin:
-        return src_name
+    The binaries that are not found in the cache are processed in parallel, using up to `jobs` threads (if `None`,
+    CONF['jobs'] is used, and if that is not set either, the number of CPUs). The processing is dominated by the
+    `strip`, `upx`, and `codesign` subprocesses, so threads suffice to keep multiple CPUs busy. The index of each cache
+    directory (see `PyInstaller.building.bincache.BinaryCacheIndex`) is updated once, after all binaries have been
+    processed.
+
+    In addition to given arguments, this function also uses CONF['cachedir'], CONF['upx_dir'], and CONF['jobs'].
+    """
+    if jobs is None:
+        jobs = CONF.get('jobs') or os.cpu_count() or 1
+
+    results = [None] * len(binaries)
+    cache_dirs = {}  # (use_strip, use_upx) -> cache directory
+    cache_indices = {}  # cache directory -> cache index
+    pending = {}  # (cache directory, cached_id) -> (list of result indices, processing arguments)
+
+    for idx, (src_name, dest_name, strict_arch_validation) in enumerate(binaries):
+        entry_use_strip, entry_use_upx = _apply_binary_processing_rules(src_name, use_strip, use_upx, upx_exclude)
+
+        # We need to use cache in the following scenarios:
+        #  * extra binary processing due to use of `strip` or `upx`
+        #  * building on macOS, where we need to rewrite library paths in binaries' headers and (re-)sign the binaries.
+        if not entry_use_strip and not entry_use_upx and not is_darwin:
+            results[idx] = src_name
+            continue
+
+        cache_dir = cache_dirs.get((entry_use_strip, entry_use_upx))
+        if cache_dir is None:
+            cache_dir = _get_bincache_dir(
+                entry_use_strip, entry_use_upx, target_arch, codesign_identity, entitlements_file
+            )
+            cache_dirs[(entry_use_strip, entry_use_upx)] = cache_dir
+        cache_index = cache_indices.get(cache_dir)
+        if cache_index is None:
+            cache_index = cache_indices[cache_dir] = BinaryCacheIndex(cache_dir)
+
+        # Look up the file in cache; use case-normalized destination name as identifier. The same binary might be
+        # collected more than once (e.g., in MERGE-based multipackage builds); process it only once.
+        cached_id = os.path.normcase(dest_name)
+        key = (cache_dir, cached_id)
+        if key in pending:
+            pending[key][0].append(idx)
+            continue
+        pending[key] = ([idx], (
+            src_name,
+            dest_name,
+            cache_index,
+            cached_id,
+            entry_use_strip,
+            entry_use_upx,
+            target_arch,
+            codesign_identity,
+            entitlements_file,
+            strict_arch_validation,
+        ))
+
+    # Process the binaries, and record the results in the cache indices.
+    def _store_result(key, indices, result):
+        cached_name, src_digest, cached_size = result
+        for idx in indices:
+            results[idx] = cached_name
+        cache_dir, cached_id = key
+        if cached_size is None:
+            cache_indices[cache_dir].touch(cached_id, src_digest)
+        else:
+            cache_indices[cache_dir].add(cached_id, src_digest, cached_size)
 
+    try:
+        if jobs == 1 or len(pending) <= 1:
+            for key, (indices, args) in pending.items():
+                _store_result(key, indices, _process_binary(*args))
+        else:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pyi-binproc") as executor:
+                futures = [(key, indices, executor.submit(_process_binary, *args))
+                           for key, (indices, args) in pending.items()]
+                try:
+                    for key, indices, future in futures:
+                        _store_result(key, indices, future.result())
+                except BaseException:
+                    # Do not start processing of remaining binaries; the ones already being processed are waited for
+                    # by the executor's shutdown.
+                    for key, indices, future in futures:
+                        future.cancel()
+                    raise
+    finally:
+        # Update cache indices with all binaries that were successfully processed, even if processing of some other
+        # binary failed.
+        for cache_index in cache_indices.values():
+            cache_index.commit()
+
+    return results
+
+
+def _apply_binary_processing_rules(src_name, use_strip, use_upx, upx_exclude):
+    """
+    Apply UPX exclude patterns and automatic disablement rules for UPX and strip to the given binary. Returns the
+    resulting `(use_strip, use_upx)` tuple.
+    """
     # Match against provided UPX exclude patterns.
     upx_exclude = upx_exclude or []
     if use_upx:
@@ -165,12 +285,15 @@ def process_collected_binary(
         elif chk_path.is_file():
             logger.info('Disabling UPX and/or strip for %s due to accompanying .chk file!', src_name)
             use_upx = use_strip = False
-        del src_path, hmac_path, chk_path
 
-    # Exit early if no processing is required after above rules are applied.
-    if not use_strip and not use_upx and not is_darwin:
-        return src_name
+    return use_strip, use_upx
+
 
+def _get_bincache_dir(use_strip, use_upx, target_arch, codesign_identity, entitlements_file):
+    """
+    Return the path to the binary cache directory for the given processing options, creating the directory if
+    necessary.
+    """
     # Prepare cache directory path. Cache is tied to python major/minor version, but also to various processing options.
     pyver = f'py{sys.version_info[0]}{sys.version_info[1]}'
     arch = platform.architecture()[0]
@@ -197,35 +320,79 @@ def process_collected_binary(
         else:
             cache_dir = os.path.join(cache_dir, 'no-entitlements')
     os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
 
-    # Load cache index, if available
-    cache_index_file = os.path.join(cache_dir, "index.dat")
-    try:
-        cache_index = misc.load_py_data_struct(cache_index_file)
-    except FileNotFoundError:
-        cache_index = {}
-    except Exception:
-        # Tell the user they may want to fix their cache... However, do not delete it for them; if it keeps getting
-        # corrupted, we will never find out.
-        logger.warning("PyInstaller bincache may be corrupted; use pyinstaller --clean to fix it.")
-        raise
-
-    # Look up the file in cache; use case-normalized destination name as identifier.
-    cached_id = os.path.normcase(dest_name)
-    cached_name = os.path.join(cache_dir, dest_name)
+
+def _process_binary(
+    src_name,
+    dest_name,
+    cache_index,
+    cached_id,
+    use_strip,
+    use_upx,
+    target_arch,
+    codesign_identity,
+    entitlements_file,
+    strict_arch_validation,
+):
+    """
+    Helper for `process_collected_binaries`; process a single binary into the cache, unless the cache already contains
+    a processed copy of the same source file. Returns a tuple `(cached_name, src_digest, cached_size)`, where
+    `cached_size` is `None` if the cached copy was used.
+    """
     src_digest = _compute_file_digest(src_name)
 
-    if cached_id in cache_index:
-        # If digest matches to the cached digest, return the cached file...
-        if src_digest == cache_index[cached_id]:
-            return cached_name
+    # Look up the file in cache; the cached copy is stored under the digest of the source file.
+    final_cached_name = cache_index.get_path(dest_name, src_digest)
+    if (cached_id, src_digest) in cache_index and os.path.isfile(final_cached_name):
+        return final_cached_name, src_digest, None
+
+    # Process the file in a temporary directory that is private to this build and thread, then move it into place.
+    # This way, other builds sharing the cache directory never see a partially-processed file. Keep the original file
+    # name, as it is used as identifier during code signing on macOS.
+    tmp_dir = os.path.join(os.path.dirname(final_cached_name), f".tmp-{os.getpid()}-{threading.get_ident()}")
+    os.makedirs(tmp_dir, exist_ok=True)
+    cached_name = os.path.join(tmp_dir, os.path.basename(dest_name))
+
+    try:
+        _process_binary_file(
+            src_name,
+            dest_name,
+            cached_name,
+            use_strip,
+            use_upx,
+            target_arch,
+            codesign_identity,
+            entitlements_file,
+            strict_arch_validation,
+        )
+        try:
+            os.replace(cached_name, final_cached_name)
+        except OSError:
+            # On Windows, replacing the file fails if another build that shares the cache directory has just placed
+            # its copy there (and is using it). That copy is equivalent to ours.
+            if not os.path.isfile(final_cached_name):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
-        # ... otherwise remove it.
-        os.remove(cached_name)
+    return final_cached_name, src_digest, os.path.getsize(final_cached_name)
 
-    # Ensure parent path exists
-    os.makedirs(os.path.dirname(cached_name), exist_ok=True)
 
+def _process_binary_file(
+    src_name,
+    dest_name,
+    cached_name,
+    use_strip,
+    use_upx,
+    target_arch,
+    codesign_identity,
+    entitlements_file,
+    strict_arch_validation,
+):
+    """
+    Copy the binary to the given location, and apply strip, UPX, and platform-specific processing to the copy.
+    """
     # Use `shutil.copyfile` to copy the file with default permissions bits, then manually set executable
     # bits. This way, we avoid copying permission bits and metadata from the original file, which might be too
     # restrictive for further processing (read-only permissions, immutable flag on FreeBSD, and so on).
@@ -333,19 +500,13 @@ def process_collected_binary(
         except Exception as e:
             raise SystemError(f"Failed to process binary {cached_name!r}!") from e
 
-    # Update cache index
-    cache_index[cached_id] = src_digest
-    misc.save_py_data_struct(cache_index_file, cache_index)
-
-    return cached_name
-
 
 def _compute_file_digest(filename):
     hasher = hashlib.sha1()
     with open(filename, "rb") as fp:
         for chunk in iter(lambda: fp.read(16 * 1024), b""):
             hasher.update(chunk)
-    return bytearray(hasher.digest())
+    return hasher.hexdigest()
 
 
 def _check_path_overlap(path):
@@ -740,6 +901,51 @@ def _read_pyc_data(filename):
     return pyc_data
 
 
+def load_import_order(filename):
+    """
+    Read the names of imported modules, in the order in which their imports started, from the import profile report
+    of a "training" run of the frozen application (see `PYINSTALLER_IMPORT_PROFILE`). Supports JSON reports, reports
+    in `-X importtime` format (including the output of `python -X importtime`), and plain lists of module names (one
+    per line).
+
+    The reports list the modules in the order in which their imports completed, with the nesting depth; they are
+    re-ordered so that each module precedes the modules that it imported.
+    """
+    with open(filename, 'r', encoding='utf-8') as fp:
+        content = fp.read()
+
+    records = []  # (name, depth); depth is None for plain lists
+    if content.lstrip().startswith('{'):
+        import json
+        records = [(record['name'], record['depth']) for record in json.loads(content)['modules']]
+    else:
+        for line in content.splitlines():
+            if line.startswith('import time:'):
+                field = line.rsplit('|', 1)[-1]
+                name = field.strip()
+                if not name or name == 'imported package':
+                    continue  # Header
+                # The field is a space, followed by two spaces of indentation per nesting level.
+                records.append((name, (len(field) - len(field.lstrip()) - 1) // 2))
+            elif line.strip() and not line.lstrip().startswith('#'):
+                records.append((line.strip(), None))
+
+    # Convert the completion order (post-order) into start order (pre-order): the nested imports of a module are the
+    # records with greater depth that completed immediately before it.
+    pending = []  # (depth, names in start order)
+    for name, depth in records:
+        if depth is None:
+            pending.append((depth, [name]))
+            continue
+        nested = []
+        while pending and pending[-1][0] is not None and pending[-1][0] > depth:
+            nested.append(pending.pop()[1])
+        pending.append((depth, [name] + [nested_name for names in reversed(nested) for nested_name in names]))
+
+    # Remove duplicates (for example, modules imported in several runs), keeping the first occurrence.
+    return list(dict.fromkeys(name for depth, names in pending for name in names))
+
+
 def postprocess_binaries_toc_pywin32(binaries):
     """
     Process the given `binaries` TOC list to apply work around for `pywin32` package, fixing the target directory
@@ -35,6 +35,7 @@
 
 cachedir
 hiddenimports
+jobs
 noconfirm
 pathex
 ui_admin
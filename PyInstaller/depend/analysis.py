@@ -124,6 +124,8 @@ def _reset(self, user_hook_dirs):
         self._additional_files_cache = AdditionalFilesCache()
         self._module_collection_mode = dict()
         self._bindepend_symlink_suppression = set()
+        # Directory listings from a previous build may be stale; the index is re-populated on demand.
+        self._dir_index.clear()
         # Hook sources: user-supplied (command-line / spec file), entry-point (upstream hooks, contributed hooks), and
         # built-in hooks. The order does not really matter anymore, because each entry is now a (location, priority)
         # tuple, and order is determined from assigned priority (which may also be overridden by hooks themselves).
@@ -911,7 +913,7 @@ def make_hook_datas_toc(self) -> list:
 _cached_module_graph_ = None
 
 
-def initialize_modgraph(excludes=(), user_hook_dirs=()):
+def initialize_modgraph(excludes=(), user_hook_dirs=(), scan_cache=None, scan_pool=None):
     """
     Create the cached module graph.
 
@@ -925,6 +927,10 @@ def initialize_modgraph(excludes=(), user_hook_dirs=()):
     user_hook_dirs : list
         List of the absolute paths of all directories containing user-defined hooks for the current application or
         `None` if no such directories were specified.
+    scan_cache : ModuleScanCache
+        Optional persistent cache of module scan results (see `PyInstaller.depend.scancache`), or `None`.
+    scan_pool : ModuleScanPool
+        Optional pool for parallel scanning of modules (see `PyInstaller.depend.scanpool`), or `None`.
 
     Returns
     ----------
@@ -951,6 +957,8 @@ def initialize_modgraph(excludes=(), user_hook_dirs=()):
         logger.info('Reusing cached module dependency graph...')
         graph = deepcopy(_cached_module_graph_)
         graph._reset(user_hook_dirs)
+        graph._scan_cache = scan_cache
+        graph._scan_pool = scan_pool
         return graph
 
     logger.info('Initializing module dependency graph...')
@@ -962,13 +970,19 @@ def initialize_modgraph(excludes=(), user_hook_dirs=()):
         # get_implies() are hidden imports known by modulgraph.
         implies=get_implies(),
         user_hook_dirs=user_hook_dirs,
+        scan_cache=scan_cache,
+        scan_pool=scan_pool,
     )
 
     if not _cached_module_graph_:
         # Only cache the first graph, see above for explanation.
         logger.info('Caching module dependency graph...')
-        # cache a deep copy of the graph
+        # cache a deep copy of the graph; the scan cache is not copied, as it is supplied anew on each reuse.
+        graph._scan_cache = None
+        graph._scan_pool = None
         _cached_module_graph_ = deepcopy(graph)
+        graph._scan_cache = scan_cache
+        graph._scan_pool = scan_pool
         # Clear data which does not need to be copied from the cached graph since it will be reset by
         # ``PyiModulegraph._reset()`` anyway.
         _cached_module_graph_._hooks = None
@@ -978,9 +992,11 @@ def initialize_modgraph(excludes=(), user_hook_dirs=()):
     return graph
 
 
-def get_bootstrap_modules():
+def get_bootstrap_modules(pyz_codec='zlib', pyz_mmap=False):
     """
     Get TOC with the bootstrapping modules and their dependencies.
+    :param pyz_codec: Name of the compression codec used by the PYZ archive.
+    :param pyz_mmap: Whether the PYZ archive is read via memory-mapping.
     :return: TOC with modules
     """
     # Import 'struct' modules to get real paths to module file names.
@@ -990,8 +1006,14 @@ def get_bootstrap_modules():
     loaderpath = os.path.join(HOMEPATH, 'PyInstaller', 'loader')
     # On some platforms (Windows, Debian/Ubuntu) '_struct' and zlib modules are built-in modules (linked statically)
     # and thus does not have attribute __file__. 'struct' module is required for reading Python bytecode from
-    # executable. 'zlib' is required to decompress this bytecode.
-    for mod_name in ['_struct', 'zlib']:
+    # executable. 'zlib' is required to decompress this bytecode, and '_lzma' if PYZ entries are compressed with lzma.
+    # 'mmap' is required if the PYZ archive is read via memory-mapping.
+    extension_mod_names = ['_struct', 'zlib']
+    if pyz_codec == 'lzma':
+        extension_mod_names.append('_lzma')
+    if pyz_mmap:
+        extension_mod_names.append('mmap')
+    for mod_name in extension_mod_names:
         mod = __import__(mod_name)  # C extension.
         if hasattr(mod, '__file__'):
             mod_file = os.path.abspath(mod.__file__)
@@ -0,0 +1,183 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2005-2023, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+"""
+Persistent cache of binary dependency analysis results.
+
+Analyzing a binary for linked shared libraries and classifying files as binaries or data files depends only on the
+file itself and on the library search environment, so the results can be stored in PyInstaller's cache directory and
+re-used by subsequent builds - of the same project or of any other project that collects the same files (for example,
+the python shared library or system libraries).
+"""
+
+import os
+
+from PyInstaller import __version__ as pyi_version
+from PyInstaller import compat
+from PyInstaller.depend.cachefile import CacheFile
+
+# Version of the on-disk format; bump whenever the layout of entries changes.
+_FORMAT_VERSION = 1
+
+# Environment variables that affect the resolution of shared libraries' full paths.
+if compat.is_win:
+    _LIBRARY_PATH_VARIABLES = ('PATH',)
+elif compat.is_darwin:
+    _LIBRARY_PATH_VARIABLES = ('DYLD_LIBRARY_PATH', 'DYLD_FALLBACK_LIBRARY_PATH')
+elif compat.is_aix:
+    _LIBRARY_PATH_VARIABLES = ('LIBPATH',)
+else:
+    _LIBRARY_PATH_VARIABLES = ('LD_LIBRARY_PATH',)
+
+# The dynamic linker cache on linux; if it is updated (e.g., by installing new libraries), cached import resolution
+# results are invalidated.
+_LD_SO_CACHE = '/etc/ld.so.cache'
+
+
+def _get_stamp(filename):
+    """
+    Return a stamp `(size, mtime_ns, inode)` that identifies the current state of the given file, or `None` if the file
+    does not exist.
+    """
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return get_stamp_from_stat(st)
+
+
+def get_stamp_from_stat(st):
+    """
+    Return a file stamp (see `_get_stamp`) from the given `os.stat_result`. This allows callers that have already
+    obtained the file status to avoid another `stat` call.
+    """
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+class BinaryDependencyCache(CacheFile):
+    """
+    Cache of binary dependency analysis results, keyed by the full path to the analyzed file.
+
+    Each entry is a tuple `(stamp, typecode, imports)`, where `stamp` is the `(size, mtime_ns, inode)` tuple of the file
+    at the time of analysis, `typecode` is the result of binary vs. data classification ('BINARY' or 'DATA', or `None`
+    if the file has not been classified), and `imports` is either `None` (if the file has not been analyzed for
+    imports) or a tuple `(environment, libraries)`. The `environment` describes the library search environment that
+    the imports were resolved in (the additional search paths, the library search path environment variables, and the
+    state of the dynamic linker cache), and `libraries` is a list of `(name, path, stamp)` tuples, where `stamp` is the
+    stamp of the resolved library file.
+
+    An entry is valid if the stamp of the file is unchanged. Its cached imports are valid if, in addition, the search
+    environment is unchanged, and if all referenced libraries have been resolved and their stamps are also unchanged.
+    Libraries that could not be resolved are never cached, as they might have been installed in the meantime.
+
+    The cache is loaded from the given file when the object is created, and is written back by `save()` (see
+    `CacheFile`). It is not thread-safe.
+
+    filename
+            Full path to the cache file.
+    """
+    _description = 'binary dependency cache'
+
+    def __init__(self, filename):
+        super().__init__(filename, (_FORMAT_VERSION, pyi_version, compat.system, compat.architecture))
+
+        # State of the library search environment that does not depend on the per-call search paths.
+        self._environment = (
+            tuple(compat.getenv(name) for name in _LIBRARY_PATH_VARIABLES),
+            _get_stamp(_LD_SO_CACHE) if compat.is_linux else None,
+        )
+
+    def _get_environment(self, search_paths):
+        return (tuple(search_paths or ()), *self._environment)
+
+    def _lookup(self, filename, stamp=None):
+        """
+        Return the entry for the given file, if it exists and its stamp matches the file.
+        """
+        entry = self._entries.get(filename)
+        if entry is None:
+            return None
+        if (stamp or _get_stamp(filename)) != entry[0]:
+            return None
+        return entry
+
+    def get_typecode(self, filename, stamp=None):
+        """
+        Look up the binary vs. data classification result for the given file. Returns 'BINARY' or 'DATA', or `None`
+        if no valid entry is available. If the current stamp of the file is already known, it can be passed via the
+        optional `stamp` argument.
+        """
+        entry = self._lookup(filename, stamp)
+        typecode = entry[1] if entry is not None else None
+        if typecode is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return typecode
+
+    def put_typecode(self, filename, typecode, stamp=None):
+        """
+        Store the binary vs. data classification result for the given file. If the stamp of the file at the time of
+        classification is known, it can be passed via the optional `stamp` argument.
+        """
+        self._update(filename, stamp, typecode=typecode)
+
+    def get_imports(self, filename, search_paths=None):
+        """
+        Look up the imports (set of `(name, fullpath)` tuples; see `bindepend.get_imports`) of the given binary that
+        were resolved using the given additional search paths. Returns `None` if no valid entry is available.
+        """
+        imports = self._lookup_imports(filename, search_paths)
+        if imports is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return imports
+
+    def _lookup_imports(self, filename, search_paths):
+        entry = self._lookup(filename)
+        if entry is None or entry[2] is None:
+            return None
+
+        environment, libraries = entry[2]
+        if environment != self._get_environment(search_paths):
+            return None
+
+        imports = set()
+        for name, path, stamp in libraries:
+            if path is None or _get_stamp(path) != stamp:
+                return None
+            imports.add((name, path))
+        return imports
+
+    def put_imports(self, filename, search_paths, imports):
+        """
+        Store the imports (set of `(name, fullpath)` tuples) of the given binary that were resolved using the given
+        additional search paths.
+        """
+        libraries = [(name, path, _get_stamp(path) if path else None) for name, path in imports]
+        if any(stamp is None for name, path, stamp in libraries):
+            # Do not cache results with unresolved libraries.
+            self._update(filename, None, imports=None)
+            return
+        self._update(filename, None, imports=(self._get_environment(search_paths), sorted(libraries)))
+
+    def _update(self, filename, stamp, **fields):
+        stamp = stamp or _get_stamp(filename)
+        if stamp is None:
+            return
+        entry = self._entries.get(filename)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, None, None)
+        typecode = fields.get('typecode', entry[1])
+        imports = fields.get('imports', entry[2])
+        if (stamp, typecode, imports) != entry:
+            self._entries[filename] = (stamp, typecode, imports)
+            self._dirty = True
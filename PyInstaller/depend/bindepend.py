@@ -12,17 +12,21 @@
 Find external dependencies of binary libraries.
 """
 
+import collections
+import concurrent.futures
 import ctypes.util
 import os
 import pathlib
 import re
+import stat
 import sys
 import sysconfig
 import subprocess
 
 from PyInstaller import compat
 from PyInstaller import log as logging
-from PyInstaller.depend import dylib, utils
+from PyInstaller.depend import bindepcache, dylib, utils
+from PyInstaller.utils import elf as elfutils
 from PyInstaller.utils.win32 import winutils
 
 if compat.is_darwin:
@@ -106,13 +110,95 @@ def _select_destination_directory(src_filename, parent_dir_preservation_paths):
     return src_filename.name
 
 
-def binary_dependency_analysis(binaries, search_paths=None, symlink_suppression_patterns=None):
+class _ImportsAnalyzer:
+    """
+    Helper for `binary_dependency_analysis` that runs `get_imports` for the binaries ahead of time, in a thread pool.
+    Obtaining the imports is dominated by I/O and by waiting on external processes (e.g., `ldd`), so the analysis of
+    independent binaries can proceed in parallel. The results are retrieved in the same order as if they were computed
+    serially, so the output of the dependency analysis does not depend on the number of threads.
+
+    jobs
+            Maximum number of threads. If `None`, the default of `concurrent.futures.ThreadPoolExecutor` is used. If 1,
+            the imports are obtained serially, on demand.
+    cache
+            Optional `BinaryDependencyCache` instance. Cached results are used instead of analyzing the binaries, and
+            new results are stored into the cache. The cache is accessed only from the calling thread.
+    """
+    def __init__(self, search_paths, jobs=None, cache=None):
+        self._search_paths = search_paths
+        self._cache = cache
+        self._futures = {}
+        if jobs == 1:
+            self._executor = None
+        else:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pyi-bindepend")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._executor is None:
+            return
+        # If analysis was aborted, do not bother with binaries that have not been analyzed yet.
+        for future in self._futures.values():
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+    def submit(self, src_name):
+        """
+        Schedule the analysis of the given binary, unless it has already been scheduled.
+        """
+        if self._executor is None:
+            return
+        src_path = pathlib.Path(src_name)
+        if src_path in self._futures:
+            return
+        imports = self._get_cached_imports(src_name)
+        if imports is not None:
+            future = concurrent.futures.Future()
+            future.set_result(imports)
+            future.from_cache = True
+        else:
+            future = self._executor.submit(get_imports, src_name, self._search_paths)
+        self._futures[src_path] = future
+
+    def get_imports(self, src_name):
+        """
+        Return the result of `get_imports` for the given binary, waiting for it if necessary.
+        """
+        future = self._futures.pop(pathlib.Path(src_name), None)
+        if future is None:
+            imports = self._get_cached_imports(src_name)
+            if imports is not None:
+                return imports
+            imports = get_imports(src_name, self._search_paths)
+        elif getattr(future, 'from_cache', False):
+            return future.result()
+        else:
+            imports = future.result()
+        if self._cache is not None:
+            self._cache.put_imports(src_name, self._search_paths, imports)
+        return imports
+
+    def _get_cached_imports(self, src_name):
+        if self._cache is None:
+            return None
+        return self._cache.get_imports(src_name, self._search_paths)
+
+
+def binary_dependency_analysis(binaries, search_paths=None, symlink_suppression_patterns=None, jobs=None, cache=None):
     """
     Perform binary dependency analysis on the given TOC list of collected binaries, by recursively scanning each binary
     for linked dependencies (shared library imports). Returns new TOC list that contains both original entries and their
     binary dependencies.
 
     Additional search paths for dependencies' full path resolution may be supplied via optional argument.
+
+    The binaries are analyzed in parallel, using up to `jobs` threads (see `_ImportsAnalyzer`); the returned TOC list
+    and the emitted warnings are the same regardless of the number of threads.
+
+    If a `BinaryDependencyCache` is given via optional `cache` argument, the imports of binaries that have not changed
+    since they were last analyzed are taken from the cache.
     """
 
     # Get all path prefixes for binaries' parent-directory preservation. For binaries collected from packages in (for
@@ -131,81 +217,89 @@ def binary_dependency_analysis(binaries, search_paths=None, symlink_suppression_
     # Populate output TOC with input binaries - this also serves as TODO list, as we iterate over it while appending
     # new entries at the end.
     output_toc = binaries[:]
-    for dest_name, src_name, typecode in output_toc:
-        # Do not process symbolic links (already present in input TOC list, or added during analysis below).
-        if typecode == 'SYMLINK':
-            continue
+    with _ImportsAnalyzer(search_paths, jobs, cache) as analyzer:
+        # Start analyzing the input binaries right away; the dependencies discovered along the way are scheduled as
+        # they are added to the output TOC.
+        for dest_name, src_name, typecode in output_toc:
+            if typecode != 'SYMLINK':
+                analyzer.submit(src_name)
+
+        for dest_name, src_name, typecode in output_toc:
+            # Do not process symbolic links (already present in input TOC list, or added during analysis below).
+            if typecode == 'SYMLINK':
+                continue
 
-        # Keep track of processed binaries, to avoid unnecessarily repeating analysis of the same file. Use pathlib.Path
-        # to avoid having to worry about case normalization.
-        src_path = pathlib.Path(src_name)
-        if src_path in processed_binaries:
-            continue
-        processed_binaries.add(src_path)
+            # Keep track of processed binaries, to avoid unnecessarily repeating analysis of the same file. Use
+            # pathlib.Path to avoid having to worry about case normalization.
+            src_path = pathlib.Path(src_name)
+            if src_path in processed_binaries:
+                continue
+            processed_binaries.add(src_path)
 
-        logger.debug("Analyzing binary %r", src_name)
+            logger.debug("Analyzing binary %r", src_name)
 
-        # Analyze imports (linked dependencies)
-        for dep_name, dep_src_path in get_imports(src_name, search_paths):
-            logger.debug("Processing dependency, name: %r, resolved path: %r", dep_name, dep_src_path)
+            # Analyze imports (linked dependencies)
+            for dep_name, dep_src_path in analyzer.get_imports(src_name):
+                logger.debug("Processing dependency, name: %r, resolved path: %r", dep_name, dep_src_path)
 
-            # Skip unresolved dependencies. Defer the missing-library warnings until after binary dependency analysis
-            # is complete.
-            if not dep_src_path:
-                missing_dependencies.append((dep_name, src_name))
-                continue
+                # Skip unresolved dependencies. Defer the missing-library warnings until after binary dependency
+                # analysis is complete.
+                if not dep_src_path:
+                    missing_dependencies.append((dep_name, src_name))
+                    continue
 
-            # Compare resolved dependency against global inclusion/exclusion rules.
-            if not dylib.include_library(dep_src_path):
-                logger.debug("Skipping dependency %r due to global exclusion rules.", dep_src_path)
-                continue
+                # Compare resolved dependency against global inclusion/exclusion rules.
+                if not dylib.include_library(dep_src_path):
+                    logger.debug("Skipping dependency %r due to global exclusion rules.", dep_src_path)
+                    continue
 
-            dep_src_path = pathlib.Path(dep_src_path)  # Turn into pathlib.Path for subsequent processing
+                dep_src_path = pathlib.Path(dep_src_path)  # Turn into pathlib.Path for subsequent processing
 
-            # Avoid processing this dependency if we have already processed it.
-            if dep_src_path in processed_dependencies:
-                logger.debug("Skipping dependency %r due to prior processing.", str(dep_src_path))
-                continue
-            processed_dependencies.add(dep_src_path)
-
-            # Try to preserve parent directory structure, if applicable.
-            # NOTE: do not resolve the source path, because on macOS and linux, it may be a versioned .so (e.g.,
-            # libsomething.so.1, pointing at libsomething.so.1.2.3), and we need to collect it under original name!
-            dep_dest_path = _select_destination_directory(dep_src_path, parent_dir_preservation_paths)
-            dep_dest_path = pathlib.PurePath(dep_dest_path)  # Might be a str() if it is just a basename...
-
-            # If we are collecting library into top-level directory on macOS, check whether it comes from a
-            # .framework bundle. If it does, re-create the .framework bundle in the top-level directory
-            # instead.
-            if compat.is_darwin and dep_dest_path.parent == pathlib.PurePath('.'):
-                if osxutils.is_framework_bundle_lib(dep_src_path):
-                    # dst_src_path is parent_path/Name.framework/Versions/Current/Name
-                    framework_parent_path = dep_src_path.parent.parent.parent.parent
-                    dep_dest_path = pathlib.PurePath(dep_src_path.relative_to(framework_parent_path))
-
-            logger.debug("Collecting dependency %r as %r.", str(dep_src_path), str(dep_dest_path))
-            output_toc.append((str(dep_dest_path), str(dep_src_path), 'BINARY'))
-
-            # On non-Windows, if we are not collecting the binary into application's top-level directory ('.'),
-            # add a symbolic link from top-level directory to the actual location. This is to accommodate
-            # LD_LIBRARY_PATH being set to the top-level application directory on linux (although library search
-            # should be mostly done via rpaths, so this might be redundant) and to accommodate library path
-            # rewriting on macOS, which assumes that the library was collected into top-level directory.
-            if compat.is_win:
-                # We do not use symlinks on Windows.
-                pass
-            elif dep_dest_path.parent == pathlib.PurePath('.'):
-                # The shared library itself is being collected into top-level application directory.
-                pass
-            elif any(dep_src_path.match(pattern) for pattern in symlink_suppression_patterns):
-                # Honor symlink suppression patterns specified by hooks.
-                logger.debug(
-                    "Skipping symbolic link from %r to top-level application directory due to source path matching one "
-                    "of symlink suppression path patterns.", str(dep_dest_path)
-                )
-            else:
-                logger.debug("Adding symbolic link from %r to top-level application directory.", str(dep_dest_path))
-                output_toc.append((str(dep_dest_path.name), str(dep_dest_path), 'SYMLINK'))
+                # Avoid processing this dependency if we have already processed it.
+                if dep_src_path in processed_dependencies:
+                    logger.debug("Skipping dependency %r due to prior processing.", str(dep_src_path))
+                    continue
+                processed_dependencies.add(dep_src_path)
+
+                # Try to preserve parent directory structure, if applicable.
+                # NOTE: do not resolve the source path, because on macOS and linux, it may be a versioned .so (e.g.,
+                # libsomething.so.1, pointing at libsomething.so.1.2.3), and we need to collect it under original name!
+                dep_dest_path = _select_destination_directory(dep_src_path, parent_dir_preservation_paths)
+                dep_dest_path = pathlib.PurePath(dep_dest_path)  # Might be a str() if it is just a basename...
+
+                # If we are collecting library into top-level directory on macOS, check whether it comes from a
+                # .framework bundle. If it does, re-create the .framework bundle in the top-level directory
+                # instead.
+                if compat.is_darwin and dep_dest_path.parent == pathlib.PurePath('.'):
+                    if osxutils.is_framework_bundle_lib(dep_src_path):
+                        # dst_src_path is parent_path/Name.framework/Versions/Current/Name
+                        framework_parent_path = dep_src_path.parent.parent.parent.parent
+                        dep_dest_path = pathlib.PurePath(dep_src_path.relative_to(framework_parent_path))
+
+                logger.debug("Collecting dependency %r as %r.", str(dep_src_path), str(dep_dest_path))
+                output_toc.append((str(dep_dest_path), str(dep_src_path), 'BINARY'))
+                analyzer.submit(str(dep_src_path))
+
+                # On non-Windows, if we are not collecting the binary into application's top-level directory ('.'),
+                # add a symbolic link from top-level directory to the actual location. This is to accommodate
+                # LD_LIBRARY_PATH being set to the top-level application directory on linux (although library search
+                # should be mostly done via rpaths, so this might be redundant) and to accommodate library path
+                # rewriting on macOS, which assumes that the library was collected into top-level directory.
+                if compat.is_win:
+                    # We do not use symlinks on Windows.
+                    pass
+                elif dep_dest_path.parent == pathlib.PurePath('.'):
+                    # The shared library itself is being collected into top-level application directory.
+                    pass
+                elif any(dep_src_path.match(pattern) for pattern in symlink_suppression_patterns):
+                    # Honor symlink suppression patterns specified by hooks.
+                    logger.debug(
+                        "Skipping symbolic link from %r to top-level application directory due to source path matching "
+                        "one of symlink suppression path patterns.", str(dep_dest_path)
+                    )
+                else:
+                    logger.debug("Adding symbolic link from %r to top-level application directory.", str(dep_dest_path))
+                    output_toc.append((str(dep_dest_path.name), str(dep_dest_path), 'SYMLINK'))
 
     # Display warnings about missing dependencies
     seen_binaries = set([
@@ -252,6 +346,11 @@ def get_imports(filename, search_paths=None):
     elif compat.is_darwin:
         return _get_imports_macholib(filename, search_paths)
     else:
+        if _use_elf_reader:
+            try:
+                return _get_imports_elf(filename, search_paths)
+            except (elfutils.InvalidBinaryError, _UnsupportedBinaryError, OSError) as e:
+                logger.debug("Falling back to ldd for %r: %s", filename, e)
         return _get_imports_ldd(filename, search_paths)
 
 
@@ -302,6 +401,262 @@ def _get_imports_pefile(filename, search_paths):
     return output
 
 
+# On glibc-based linux, obtain the imports by reading the ELF binaries directly, instead of running `ldd` for each
+# binary. Setting the PYINSTALLER_USE_LDD environment variable to a non-zero value restores the use of `ldd`.
+_use_elf_reader = compat.is_linux and not compat.is_musl and os.environ.get("PYINSTALLER_USE_LDD", "0") == "0"
+
+
+class _UnsupportedBinaryError(Exception):
+    """
+    Raised by `_get_imports_elf` for binaries whose library search it cannot emulate.
+    """
+    pass
+
+
+# Cache of `elfutils.ELFFile` instances (or `None` for invalid files), keyed by file path. Each entry is stored
+# along with the file's stat signature, to detect modified files.
+_elf_files = {}
+
+
+def _read_elf_file(path):
+    """
+    Return `elfutils.ELFFile` for the given path and the file's identity (device and inode numbers), or `(None, None)`
+    if the file does not exist or is not a valid ELF binary.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, None
+    if not stat.S_ISREG(st.st_mode):
+        return None, None
+    signature = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    cached = _elf_files.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1], signature[:2]
+    try:
+        elf = elfutils.ELFFile(path)
+    except (elfutils.InvalidBinaryError, OSError):
+        elf = None
+    _elf_files[path] = (signature, elf)
+    return elf, signature[:2]
+
+
+_RPATH_TOKEN_PATTERN = re.compile(r'\$(?:\{(\w+)\}|(\w+))')
+
+
+def _expand_origin(path, origin):
+    """
+    Expand the `$ORIGIN` token in the given path; `origin` is the directory of the binary that contains the path, or
+    `None` if the path does not come from a binary.
+    """
+    def _expand_token(m):
+        token = m.group(1) or m.group(2)
+        if token != 'ORIGIN' or origin is None:
+            # $LIB and $PLATFORM depend on the dynamic linker's configuration.
+            raise _UnsupportedBinaryError(f"Unsupported token in library path: {m.group(0)!r}")
+        return origin
+
+    if '$' not in path:
+        return path
+    return _RPATH_TOKEN_PATTERN.sub(_expand_token, path)
+
+
+def _split_search_path(path_list, origin):
+    """
+    Split the given DT_RPATH/DT_RUNPATH/LD_LIBRARY_PATH string into list of directories, expanding the `$ORIGIN` token.
+    """
+    # Empty entries denote current working directory.
+    return [_expand_origin(path, origin) or '.' for path in re.split('[:;]', path_list)]
+
+
+def _get_default_library_dirs():
+    """
+    Return the list of the default library directories of the dynamic linker (the "trusted directories"), which are
+    searched after the ld.so cache.
+    """
+    paths = []
+    arch_subdir = sysconfig.get_config_var('multiarchsubdir')
+    if arch_subdir:
+        arch_subdir = os.path.basename(arch_subdir)
+        paths += [os.path.join('/lib', arch_subdir), os.path.join('/usr/lib', arch_subdir)]
+    if compat.is_64bits:
+        paths += ['/lib64', '/usr/lib64']
+    paths += ['/lib', '/usr/lib']
+    return paths
+
+
+class _LoadedObject:
+    """
+    Binary loaded during the emulated library search of `_get_imports_elf`.
+    """
+    def __init__(self, elf, path, loader):
+        self.elf = elf
+        self.path = path
+        self.loader = loader  # The object that caused this object to be loaded.
+        self.origin = os.path.dirname(os.path.abspath(path))
+
+
+def _get_imports_elf(filename, search_paths):
+    """
+    Helper for `get_imports`, which reads the dynamic sections of ELF binaries directly (see `PyInstaller.utils.elf`)
+    and emulates the library search performed by glibc's dynamic linker. Used on glibc-based linux.
+
+    Produces the same output as `_get_imports_ldd`; i.e., the set of all libraries that would be loaded along with the
+    given binary (and not just its direct dependencies), but without running `ldd`. Raises `InvalidBinaryError`,
+    `_UnsupportedBinaryError`, or `OSError` if the binary cannot be processed, in which case the caller should fall
+    back to `_get_imports_ldd`.
+    """
+    main_elf = elfutils.ELFFile(filename)
+    if not main_elf.is_dynamic or main_elf.type not in (elfutils.ET_EXEC, elfutils.ET_DYN):
+        # `ldd` reports static binaries and object files as "not a dynamic executable".
+        return set()
+
+    # The binary must be loadable by the dynamic linker of the running python interpreter; `ldd` handles other cases
+    # (e.g., 32-bit binaries on 64-bit system) by selecting the appropriate dynamic linker, if available.
+    rtld_path, rtld_elf, rtld_id = _get_dynamic_linker()
+    if rtld_elf is None or not main_elf.is_compatible(rtld_elf):
+        raise _UnsupportedBinaryError("Binary is not compatible with the dynamic linker of the python interpreter.")
+
+    # Names and identities of loaded objects. The dynamic linker itself is always loaded, but it is not reported.
+    loaded_names = {rtld_path: rtld_path}
+    if rtld_elf.soname:
+        loaded_names[rtld_elf.soname] = rtld_path
+    loaded_ids = {rtld_id}
+
+    ld_library_path = compat.getenv('LD_LIBRARY_PATH', '')
+    env_dirs = _split_search_path(ld_library_path, None) if ld_library_path else []
+
+    output = set()
+    queue = collections.deque([_LoadedObject(main_elf, filename, None)])
+    while queue:
+        obj = queue.popleft()
+        for name in obj.elf.needed:
+            if name in loaded_names:
+                continue
+
+            if '/' in name:
+                path = _expand_origin(name, obj.origin)
+                elf, identity = _read_elf_file(path)
+                if elf is None or not elf.is_compatible(main_elf):
+                    path = None
+            else:
+                path, elf, identity = _search_library(name, obj, main_elf, env_dirs)
+
+            if path is None:
+                loaded_names[name] = None
+                output.add((name, None))
+                continue
+            loaded_names[name] = path
+
+            # The same file might be found under different name; in this case, it is not loaded again.
+            if identity in loaded_ids:
+                continue
+            loaded_ids.add(identity)
+            if elf.soname:
+                loaded_names.setdefault(elf.soname, path)
+
+            # `ldd` does not report the libraries that are referenced by their full path (which it prints without the
+            # `=>` separator).
+            if name != path:
+                output.add((name, path))
+            queue.append(_LoadedObject(elf, path, obj))
+
+    # Post-process in the same way as `_get_imports_ldd` does.
+    result = set()
+    for name, lib in output:
+        # Fall back to searching the supplied search paths, if any.
+        if not lib:
+            lib = _resolve_library_path_in_search_paths(
+                os.path.basename(name),  # Search for basename of the referenced name.
+                search_paths,
+            )
+
+        # Normalize the resolved path, to remove any extraneous "../" elements.
+        if lib:
+            lib = os.path.normpath(lib)
+
+        result.add((name, lib))
+
+    return result
+
+
+def _search_library(name, obj, main_elf, env_dirs):
+    """
+    Search for the library with the given name, requested by the given `_LoadedObject`, in the same order as glibc's
+    dynamic linker does. Returns tuple (path, elf, identity), or (None, None, None) if library cannot be found.
+    """
+    def _search_dirs(dirs):
+        for directory in dirs:
+            path = os.path.join(directory, name)
+            elf, identity = _read_elf_file(path)
+            # Like the dynamic linker, skip over files that are not ELF binaries or that are built for other
+            # architecture.
+            if elf is not None and elf.is_compatible(main_elf):
+                return path, elf, identity
+        return None
+
+    # DT_RPATH of the requesting object, and of the objects that caused it to be loaded, up to the main binary; unless
+    # the requesting object has DT_RUNPATH.
+    if obj.elf.runpath is None:
+        loader = obj
+        while loader is not None:
+            if loader.elf.rpath:
+                found = _search_dirs(_split_search_path(loader.elf.rpath, loader.origin))
+                if found:
+                    return found
+            loader = loader.loader
+
+    # LD_LIBRARY_PATH
+    found = _search_dirs(env_dirs)
+    if found:
+        return found
+
+    # DT_RUNPATH of the requesting object.
+    if obj.elf.runpath:
+        found = _search_dirs(_split_search_path(obj.elf.runpath, obj.origin))
+        if found:
+            return found
+
+    # Objects with DF_1_NODEFLIB flag do not search the ld.so cache and the default directories.
+    if obj.elf.flags_1 & elfutils.DF_1_NODEFLIB:
+        return None, None, None
+
+    # ld.so cache
+    utils.load_ldconfig_cache()
+    path = utils.LDCONFIG_CACHE.get(name)
+    if path:
+        elf, identity = _read_elf_file(path)
+        if elf is not None and elf.is_compatible(main_elf):
+            return path, elf, identity
+
+    # Default library directories.
+    found = _search_dirs(_get_default_library_dirs())
+    if found:
+        return found
+
+    return None, None, None
+
+
+_dynamic_linker = None
+
+
+def _get_dynamic_linker():
+    """
+    Return tuple (path, elf, identity) describing the dynamic linker (program interpreter) of the running python
+    interpreter. The elf is `None` if the dynamic linker cannot be determined.
+    """
+    global _dynamic_linker
+    if _dynamic_linker is None:
+        rtld_path = None
+        try:
+            rtld_path = elfutils.ELFFile(compat.python_executable).interpreter
+        except (elfutils.InvalidBinaryError, OSError):
+            pass
+        rtld_elf, rtld_id = _read_elf_file(rtld_path) if rtld_path else (None, None)
+        _dynamic_linker = (rtld_path, rtld_elf, rtld_id)
+    return _dynamic_linker
+
+
 def _get_imports_ldd(filename, search_paths):
     """
     Helper for `get_imports`, which uses `ldd` to analyze shared libraries. Used on Linux and other POSIX-like platforms
@@ -850,37 +1205,166 @@ def _find_lib_in_libdirs(*libdirs):
 #- Binary vs data (re)classification
 
 
-def classify_binary_vs_data(filename):
+def classify_binary_vs_data(filename, cache=None):
     """
     Classify the given file as either BINARY or a DATA, using appropriate platform-specific method. Returns 'BINARY'
     or 'DATA' string depending on the determined file type, or None if classification cannot be performed (non-existing
     file, missing tool, and other errors during classification).
+
+    If a `BinaryDependencyCache` is given via optional `cache` argument, the result is looked up in and stored into
+    the cache.
     """
 
     # We cannot classify non-existent files.
     if not os.path.isfile(filename):
         return None
 
+    if cache is not None:
+        typecode = cache.get_typecode(filename)
+        if typecode is not None:
+            return typecode
+
     # Use platform-specific implementation.
-    return _classify_binary_vs_data(filename)
+    typecode = _classify_binary_vs_data(filename)
+
+    # Do not cache failed classification (e.g., due to missing tool).
+    if cache is not None and typecode is not None:
+        cache.put_typecode(filename, typecode)
+
+    return typecode
+
+
+def classify_binary_vs_data_batch(filenames, jobs=None, cache=None):
+    """
+    Classify the given files as either BINARY or DATA; the batched equivalent of `classify_binary_vs_data`. Returns a
+    dictionary that maps each of the given file names to 'BINARY', 'DATA', or None.
+
+    The files are processed in parallel, using up to `jobs` threads (or serially, if `jobs` is 1). For each file, the
+    file status is obtained first, and compared against the optional `BinaryDependencyCache`. Files that are not in the
+    cache are checked for binary file signature (magic bytes), which suffices to classify the majority of data files.
+    Only the files with binary signature are subjected to (more costly) deep validation using the platform-specific
+    method. The number of files classified in each of these ways is reported in the log.
+    """
+    filenames = list(dict.fromkeys(filenames))
+    results = {}
+
+    # Obtain the file status in parallel; this is the only step that needs to be performed for every file, and on a
+    # cold file system cache, it is dominated by I/O.
+    stats = _map_in_threads(_stat_file, filenames, jobs)
+
+    # Look up the results in cache; we do this in the calling thread, as the cache is not thread-safe.
+    pending = []
+    num_cached = 0
+    for filename, st in zip(filenames, stats):
+        if st is None or not stat.S_ISREG(st.st_mode):
+            # We cannot classify non-existent files.
+            results[filename] = None
+            continue
+        if cache is not None:
+            typecode = cache.get_typecode(filename, stamp=bindepcache.get_stamp_from_stat(st))
+            if typecode is not None:
+                results[filename] = typecode
+                num_cached += 1
+                continue
+        pending.append((filename, st))
+
+    # Check the signatures and validate the potential binaries in parallel.
+    classified = _map_in_threads(_classify_by_signature, [filename for filename, st in pending], jobs)
+    num_validated = 0
+    for (filename, st), (typecode, validated) in zip(pending, classified):
+        results[filename] = typecode
+        num_validated += validated
+        # Do not cache failed classification (e.g., due to missing tool).
+        if cache is not None and typecode is not None:
+            cache.put_typecode(filename, typecode, stamp=bindepcache.get_stamp_from_stat(st))
+
+    logger.info(
+        "Binary vs. data classification: %d files, %d classified using cached results, %d classified by file "
+        "signature, %d required deep validation.", len(filenames), num_cached,
+        len(pending) - num_validated, num_validated
+    )
+
+    return results
+
+
+def _stat_file(filename):
+    try:
+        return os.stat(filename)
+    except OSError:
+        return None
+
+
+def _classify_by_signature(filename):
+    """
+    Helper for `classify_binary_vs_data_batch`; returns the result of classification, and a flag indicating whether
+    the file required deep validation.
+    """
+    if _BINARY_SIGNATURES is None:
+        return _classify_binary_vs_data(filename), False
+    has_signature = _has_binary_signature(filename)
+    if not has_signature:
+        return (None if has_signature is None else 'DATA'), False
+    return _validate_binary(filename), True
+
+
+def _map_in_threads(func, items, jobs, chunk_size=256):
+    """
+    Apply the function to each item from the given list, using up to `jobs` threads. The items are processed in chunks,
+    to avoid the overhead of scheduling each item separately. Returns list of results, in the order of items.
+    """
+    if jobs == 1 or len(items) <= chunk_size:
+        return [func(item) for item in items]
+
+    def _process_chunk(chunk):
+        return [func(item) for item in chunk]
+
+    chunks = [items[idx:idx + chunk_size] for idx in range(0, len(items), chunk_size)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pyi-classify") as executor:
+        return [result for chunk_results in executor.map(_process_chunk, chunks) for result in chunk_results]
+
+
+def _has_binary_signature(filename):
+    """
+    Check whether the given file starts with one of the platform's binary file signatures. Returns None if the file
+    cannot be read.
+    """
+    try:
+        with open(filename, 'rb') as fp:
+            sig = fp.read(_BINARY_SIGNATURE_LENGTH)
+    except Exception:
+        return None
+    return sig.startswith(_BINARY_SIGNATURES)
+
+
+def _classify_binary_vs_data(filename):
+    # Classification not implemented for the platform.
+    if _BINARY_SIGNATURES is None:
+        return None
+
+    # First check for binary signature, in order to quickly classify the majority of data files without having to
+    # perform costly validation.
+    has_signature = _has_binary_signature(filename)
+    if not has_signature:
+        return None if has_signature is None else 'DATA'
+
+    return _validate_binary(filename)
 
 
 if compat.is_linux:
 
-    def _classify_binary_vs_data(filename):
-        # First check for ELF signature, in order to avoid calling `objdump` on every data file, which can be costly.
-        try:
-            with open(filename, 'rb') as fp:
-                sig = fp.read(4)
-        except Exception:
-            return None
+    _BINARY_SIGNATURES = (b"\x7FELF",)
 
-        if sig != b"\x7FELF":
-            return "DATA"
+    def _validate_binary(filename):
+        # Verify the binary by validating its ELF headers. The preceding ELF signature check should ensure that this is
+        # an ELF file, while this check should ensure that it is a valid ELF file. In the future, we could try checking
+        # that the architecture matches the running platform.
+        if _use_elf_reader:
+            try:
+                return 'BINARY' if elfutils.is_elf_binary(filename) else 'DATA'
+            except (OSError, elfutils.InvalidBinaryError):
+                return None
 
-        # Verify the binary by checking if `objdump` recognizes the file. The preceding ELF signature check should
-        # ensure that this is an ELF file, while this check should ensure that it is a valid ELF file. In the future,
-        # we could try checking that the architecture matches the running platform.
+        # Fall back to checking if `objdump` recognizes the file.
         cmd_args = ['objdump', '-a', filename]
         try:
             p = subprocess.run(
@@ -897,18 +1381,10 @@ def _classify_binary_vs_data(filename):
 
 elif compat.is_win:
 
-    def _classify_binary_vs_data(filename):
-        import pefile
-
-        # First check for MZ signature, which should allow us to quickly classify the majority of data files.
-        try:
-            with open(filename, 'rb') as fp:
-                sig = fp.read(2)
-        except Exception:
-            return None
+    _BINARY_SIGNATURES = (b"MZ",)
 
-        if sig != b"MZ":
-            return "DATA"
+    def _validate_binary(filename):
+        import pefile
 
         # Check if the file can be opened using `pefile`.
         try:
@@ -924,7 +1400,17 @@ def _classify_binary_vs_data(filename):
 
 elif compat.is_darwin:
 
-    def _classify_binary_vs_data(filename):
+    # Thin Mach-O binaries (32-bit and 64-bit, in either byte order), and fat (universal) binaries.
+    _BINARY_SIGNATURES = (
+        b"\xfe\xed\xfa\xce",
+        b"\xce\xfa\xed\xfe",
+        b"\xfe\xed\xfa\xcf",
+        b"\xcf\xfa\xed\xfe",
+        b"\xca\xfe\xba\xbe",
+        b"\xca\xfe\xba\xbf",
+    )
+
+    def _validate_binary(filename):
         # See if the file can be opened using `macholib`.
         import macholib.MachO
 
@@ -939,6 +1425,7 @@ def _classify_binary_vs_data(filename):
 
 else:
 
-    def _classify_binary_vs_data(filename):
-        # Classification not implemented for the platform.
-        return None
+    _BINARY_SIGNATURES = None
+
+if _BINARY_SIGNATURES is not None:
+    _BINARY_SIGNATURE_LENGTH = max(len(sig) for sig in _BINARY_SIGNATURES)
@@ -0,0 +1,116 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2005-2023, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+"""
+Common base for the persistent analysis caches that are stored in PyInstaller's cache directory (see
+`PyInstaller.depend.scancache` and `PyInstaller.depend.bindepcache`).
+"""
+
+import marshal
+import os
+
+from PyInstaller import log as logging
+
+logger = logging.getLogger(__name__)
+
+
+class CacheFile:
+    """
+    Dictionary of cache entries, keyed by the full path to the file that they describe, which is stored in a
+    marshal-ed file. Subclasses implement the lookup and validation of entries.
+
+    The entries are loaded from the given file when the object is created, and are written back by `save()`. The file
+    is written only if the entries have been modified (which subclasses indicate by setting `_dirty`), and is replaced
+    atomically, so that multiple builds can share it. If the file has been updated by another process in the meantime,
+    its entries are merged with ours.
+
+    filename
+            Full path to the cache file.
+    header
+            Marshal-able value that identifies the format of entries and the environment that they are valid in. The
+            file is ignored if its header does not match.
+    """
+    # Name of the cache, used in log messages.
+    _description = 'cache'
+
+    def __init__(self, filename, header):
+        self.filename = filename
+        self._header = header
+        self._dirty = False
+        self._file_mtime = None
+
+        # Statistics, reported at the end of analysis.
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _load(self):
+        """
+        Read entries from the cache file. Returns empty dict if the file does not exist, is corrupted, or has a
+        different header.
+        """
+        try:
+            with open(self.filename, 'rb') as fp:
+                self._file_mtime = os.fstat(fp.fileno()).st_mtime_ns
+                header, entries = marshal.load(fp)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.debug("Ignoring unreadable %s %r: %s", self._description, self.filename, e)
+            return {}
+
+        if header != self._header or not isinstance(entries, dict):
+            logger.debug("Ignoring incompatible %s %r.", self._description, self.filename)
+            return {}
+
+        return entries
+
+    def save(self):
+        """
+        Write the cache back to its file, if it has been modified.
+
+        If the cache file has been updated by another process in the meantime, its entries are merged with ours.
+        Entries corresponding to files that no longer exist are dropped.
+        """
+        logger.debug("%s: %d hits, %d misses.", self._description.capitalize(), self.hits, self.misses)
+        if not self._dirty:
+            return
+
+        entries = self._entries
+        try:
+            file_mtime = os.stat(self.filename).st_mtime_ns
+        except OSError:
+            file_mtime = None
+        if file_mtime is not None and file_mtime != self._file_mtime:
+            entries = {**self._load(), **entries}
+
+        entries = {filename: entry for filename, entry in entries.items() if os.path.isfile(filename)}
+
+        tmp_filename = f"{self.filename}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+            with open(tmp_filename, 'wb') as fp:
+                marshal.dump((self._header, entries), fp)
+            os.replace(tmp_filename, self.filename)
+        except OSError as e:
+            logger.warning("Failed to write %s %r: %s", self._description, self.filename, e)
+            try:
+                os.remove(tmp_filename)
+            except OSError:
+                pass
+            return
+
+        self._entries = entries
+        self._file_mtime = os.stat(self.filename).st_mtime_ns
+        self._dirty = False
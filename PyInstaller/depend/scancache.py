@@ -0,0 +1,116 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2005-2023, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+"""
+Persistent cache of module scan results, used to speed up repeated analysis of the same modules.
+
+Scanning a source module (reading the source, compiling it into AST and code object, and extracting imports and global
+attribute names) is the most expensive part of module graph construction. The results of the scan depend only on the
+contents of the source file (and the python interpreter/PyInstaller version), so they can be stored in PyInstaller's
+cache directory and re-used by subsequent builds. The module graph is then re-connected from cached import lists; only
+the modules that have changed since the previous build need to be re-scanned.
+"""
+
+import hashlib
+import os
+import sys
+
+from PyInstaller import __version__ as pyi_version
+from PyInstaller import compat
+from PyInstaller.depend.cachefile import CacheFile
+
+# Version of the on-disk format; bump whenever the layout of entries changes.
+_FORMAT_VERSION = 1
+
+
+def _compute_digest(data):
+    return hashlib.sha1(data).digest()
+
+
+class ModuleScanCache(CacheFile):
+    """
+    Cache of module scan results, keyed by the full path to the module's source file.
+
+    Each entry is a tuple `(mtime_ns, size, digest, code, imports, global_attr_names)`. An entry is considered valid if
+    modification time and size of the file match the recorded values. If only the modification time differs (e.g., due
+    to a fresh checkout of the sources), the entry is validated using the digest of the file's contents.
+
+    The cache is loaded from the given file when the object is created, and is written back by `save()` (see
+    `CacheFile`).
+
+    filename
+            Full path to the cache file.
+    """
+    _description = 'module scan cache'
+
+    def __init__(self, filename):
+        super().__init__(filename, (_FORMAT_VERSION, compat.BYTECODE_MAGIC, pyi_version, sys.flags.optimize))
+
+    def __contains__(self, filename):
+        return self._lookup(filename) is not None
+
+    def get(self, filename):
+        """
+        Look up the scan result for the given source file.
+
+        Returns a tuple `(code, imports, global_attr_names)` if a valid entry is available, or `None` otherwise.
+        """
+        result = self._lookup(filename)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def _lookup(self, filename):
+        entry = self._entries.get(filename)
+        if entry is None:
+            return None
+
+        mtime, size, digest, *result = entry
+        try:
+            st = os.stat(filename)
+        except OSError:
+            return None
+
+        if st.st_size != size:
+            return None
+
+        if st.st_mtime_ns != mtime:
+            # Modification time differs; check whether the contents have actually changed.
+            try:
+                with open(filename, 'rb') as fp:
+                    data = fp.read()
+            except OSError:
+                return None
+            if _compute_digest(data) != digest:
+                return None
+            # Refresh the modification time so that subsequent builds can use the fast path.
+            self._entries[filename] = (st.st_mtime_ns, size, digest, *result)
+            self._dirty = True
+
+        return tuple(result)
+
+    def put(self, filename, code, imports, global_attr_names):
+        """
+        Store the scan result for the given source file.
+
+        `imports` is a list of marshal-able tuples describing the module's imports, and `global_attr_names` is a list
+        of the module's global attribute names.
+        """
+        try:
+            st = os.stat(filename)
+            with open(filename, 'rb') as fp:
+                digest = _compute_digest(fp.read())
+        except OSError:
+            # Not a regular file (e.g., a module from a zip archive); do not cache.
+            return
+        self._entries[filename] = (st.st_mtime_ns, st.st_size, digest, code, imports, global_attr_names)
+        self._dirty = True
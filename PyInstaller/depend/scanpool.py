@@ -0,0 +1,108 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2005-2023, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+"""
+Pool of isolated python subprocesses for scanning source modules in parallel.
+
+Reading, compiling, and scanning source modules for imports is CPU-bound work that is independent of the module graph,
+so it can be offloaded to worker processes. The module graph itself is still constructed in the main process, in the
+same order as without the pool; the scan results are merely computed ahead of time.
+"""
+
+import concurrent.futures
+import sys
+import threading
+
+from PyInstaller import isolated
+from PyInstaller import log as logging
+
+logger = logging.getLogger(__name__)
+
+
+def _scan_source_file(pathname, optimize):
+    # Executed in isolated subprocess.
+    from PyInstaller.lib.modulegraph import modulegraph
+    return modulegraph.scan_source_file(pathname, optimize)
+
+
+class ModuleScanPool:
+    """
+    Pool of worker processes that scan source modules using `PyInstaller.lib.modulegraph.modulegraph.scan_source_file`.
+
+    Each worker process is an `isolated.Python` subprocess, driven by its own thread. Worker processes are
+    started on demand, and are shut down by `close()`.
+
+    jobs
+            Number of worker processes.
+    """
+    def __init__(self, jobs):
+        logger.info("Scanning modules using %d worker processes", jobs)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pyi-modscan")
+        self._futures = {}
+        self._local = threading.local()
+        self._children = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._executor is None:
+            return
+        # Cancel pending scans of modules that turned out not to be needed.
+        for future in self._futures.values():
+            future.cancel()
+        self._futures = {}
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+        for child in self._children:
+            try:
+                child.__exit__(None, None, None)
+            except Exception as e:
+                logger.debug("Failed to shut down module scan worker: %s", e)
+        self._children = []
+
+    def submit(self, pathname):
+        """
+        Schedule scan of the source module with the given path.
+        """
+        if pathname not in self._futures:
+            self._futures[pathname] = self._executor.submit(self._scan, pathname)
+
+    def pop(self, pathname):
+        """
+        Retrieve the `concurrent.futures.Future` for the scan of the source module with the given path, or `None` if
+        the module has not been submitted.
+        """
+        return self._futures.pop(pathname, None)
+
+    def _get_child(self):
+        child = getattr(self._local, 'child', None)
+        if child is None:
+            child = isolated.Python().__enter__()
+            with self._lock:
+                self._children.append(child)
+            self._local.child = child
+        return child
+
+    def _scan(self, pathname):
+        child = self._get_child()
+        try:
+            return child.call(_scan_source_file, pathname, sys.flags.optimize)
+        except isolated.SubprocessDiedError:
+            # Discard the dead worker; the next scan on this thread will start a new one.
+            with self._lock:
+                self._children.remove(child)
+            self._local.child = None
+            raise
@@ -19,6 +19,7 @@
 import re
 import shutil
 import struct
+import threading
 import zipfile
 from types import CodeType
 
@@ -311,6 +312,7 @@ def _restorePaths(old):
 
 
 LDCONFIG_CACHE = None  # cache the output of `/sbin/ldconfig -p`
+_ldconfig_cache_lock = threading.Lock()
 
 
 def load_ldconfig_cache():
@@ -323,11 +325,18 @@ def load_ldconfig_cache():
     if LDCONFIG_CACHE is not None:
         return
 
+    # May be called from multiple threads during binary dependency analysis; ensure that `ldconfig` is run only once,
+    # and that the cache is published only after it is fully populated.
+    with _ldconfig_cache_lock:
+        if LDCONFIG_CACHE is None:
+            LDCONFIG_CACHE = _read_ldconfig_cache()
+
+
+def _read_ldconfig_cache():
     if compat.is_musl:
         # Musl deliberately doesn't use ldconfig. The ldconfig executable either doesn't exist or it's a functionless
         # executable which, on calling with any arguments, simply tells you that those arguments are invalid.
-        LDCONFIG_CACHE = {}
-        return
+        return {}
 
     ldconfig = shutil.which('ldconfig')
     if ldconfig is None:
@@ -337,8 +346,7 @@ def load_ldconfig_cache():
 
         # If we still could not find the 'ldconfig' command...
         if ldconfig is None:
-            LDCONFIG_CACHE = {}
-            return
+            return {}
 
     if compat.is_freebsd or compat.is_openbsd:
         # This has a quite different format than other Unixes:
@@ -365,12 +373,11 @@ def load_ldconfig_cache():
         text = compat.exec_command(ldconfig, ldconfig_arg)
     except ExecCommandFailed:
         logger.warning("Failed to execute ldconfig. Disabling LD cache.")
-        LDCONFIG_CACHE = {}
-        return
+        return {}
 
     text = text.strip().splitlines()[splitlines_count:]
 
-    LDCONFIG_CACHE = {}
+    ldconfig_cache = {}
     for line in text:
         # :fixme: this assumes library names do not contain whitespace
         m = pattern.match(line)
@@ -397,5 +404,7 @@ def load_ldconfig_cache():
             name = m.group(1)
         # ldconfig may know about several versions of the same lib, e.g., different arch, different libc, etc.
         # Use the first entry.
-        if name not in LDCONFIG_CACHE:
-            LDCONFIG_CACHE[name] = path
+        if name not in ldconfig_cache:
+            ldconfig_cache[name] = path
+
+    return ldconfig_cache
@@ -34,6 +34,7 @@
 from altgraph.ObjectGraph import ObjectGraph
 from altgraph import GraphError
 
+from . import scanner
 from . import util
 
 
@@ -118,6 +119,177 @@ def _merged(self, other):
                     fromlist=self.fromlist and other.fromlist)
 
 
+class _ModuleScanResult(object):
+    """
+    Pre-computed result of scanning a source module: its code object, the list
+    of its imports, and the list of its global attribute names.
+
+    Each import is described by a `(have_star, target_module_partname,
+    target_attr_names, level, edge_attr)` tuple, where `edge_attr` is either a
+    tuple of `DependencyInfo` fields or `None`.
+    """
+    __slots__ = ('code', 'imports', 'global_attr_names')
+
+    def __init__(self, code, imports, global_attr_names):
+        self.code = code
+        self.imports = imports
+        self.global_attr_names = global_attr_names
+
+
+# Suffixes and loaders of the default path-based finder, in the order in which
+# `importlib.machinery.FileFinder` tries them.
+_FILE_FINDER_LOADERS = (
+    [(suffix, importlib.machinery.ExtensionFileLoader) for suffix in importlib.machinery.EXTENSION_SUFFIXES] +
+    [(suffix, importlib.machinery.SourceFileLoader) for suffix in importlib.machinery.SOURCE_SUFFIXES] +
+    [(suffix, importlib.machinery.SourcelessFileLoader) for suffix in importlib.machinery.BYTECODE_SUFFIXES]
+)
+
+
+class _DirectoryIndex(object):
+    """
+    In-memory index of the contents of the directories that are searched for
+    modules, used to resolve modules without querying the file system for each
+    candidate file name.
+
+    Each directory is listed (using `os.scandir()`) at most once, and its
+    listing is shared by all subsequent lookups. The index does not notice
+    changes made to the directories after they have been listed; it is meant
+    to live for the duration of a single build, and is cleared by the
+    `ModuleGraph` when its search path changes.
+
+    The following counters are kept for debugging purposes:
+
+    * `listings`: number of listed directories.
+    * `lookups`: number of module lookups resolved against the index.
+    * `found`: number of those lookups that found the module.
+    * `fallbacks`: number of module lookups that could not use the index
+      (e.g., lookups in zip archives), and were delegated to the importer.
+    * `invalidations`: number of times the index was cleared.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.listings = 0
+        self.lookups = 0
+        self.found = 0
+        self.fallbacks = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        if self._entries:
+            self.invalidations += 1
+        self._entries = {}
+
+    def entries(self, dirpath):
+        """
+        Dictionary mapping the names of the files and subdirectories of the
+        passed directory to their types (`True` for directories, `False` for
+        files) _or_ `None` if the directory cannot be listed. Symbolic links
+        are resolved; other entries are omitted.
+        """
+        try:
+            return self._entries[dirpath]
+        except KeyError:
+            pass
+
+        self.listings += 1
+        entries = {}
+        try:
+            with os.scandir(dirpath or '.') as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            is_dir = True
+                        elif entry.is_file():
+                            is_dir = False
+                        else:
+                            continue
+                    except OSError:
+                        continue
+                    entries[_normalize_listed_name(entry.name)] = is_dir
+        except OSError:
+            entries = None
+        self._entries[dirpath] = entries
+        return entries
+
+    def isfile(self, dirpath, name):
+        """
+        Equivalent of `os.path.isfile(os.path.join(dirpath, name))`.
+        """
+        entries = self.entries(dirpath)
+        if entries is None:
+            return os.path.isfile(os.path.join(dirpath, name))
+        return entries.get(name) is False
+
+    def isdir(self, dirpath, name):
+        """
+        Equivalent of `os.path.isdir(os.path.join(dirpath, name))`.
+        """
+        entries = self.entries(dirpath)
+        if entries is None:
+            return os.path.isdir(os.path.join(dirpath, name))
+        return entries.get(name, False)
+
+    def find_loader(self, dirpath, module_name):
+        """
+        Resolve the module with the passed (unqualified) name in the passed
+        directory in the same way as `importlib.machinery.FileFinder` with the
+        default loaders does, but using the index.
+
+        Returns
+        ----------
+        (loader, namespace_dirs)
+            2-tuple, where `loader` is the loader of the module _or_ `None` if
+            the module was not found, and `namespace_dirs` is the list of
+            namespace package directories contributed by the directory.
+        """
+        self.lookups += 1
+        entries = self.entries(dirpath)
+        if entries is None:
+            return None, []
+
+        namespace_dirs = []
+        is_dir = entries.get(module_name)
+        if is_dir is not None:
+            base_path = os.path.join(dirpath, module_name)
+            for suffix, loader_class in _FILE_FINDER_LOADERS:
+                if self.isfile(base_path, '__init__' + suffix):
+                    self.found += 1
+                    return loader_class(module_name, os.path.join(base_path, '__init__' + suffix)), []
+            if is_dir:
+                namespace_dirs.append(base_path)
+
+        for suffix, loader_class in _FILE_FINDER_LOADERS:
+            if entries.get(module_name + suffix) is False:
+                self.found += 1
+                return loader_class(module_name, os.path.join(dirpath, module_name + suffix)), []
+
+        return None, namespace_dirs
+
+
+def _is_default_file_finder(importer):
+    # Only the finders created by the default path hook can be emulated by the directory index.
+    return (
+        type(importer) is importlib.machinery.FileFinder
+        and getattr(importer, '_loaders', None) == _FILE_FINDER_LOADERS
+    )
+
+
+if sys.platform.startswith('win'):
+    def _normalize_listed_name(name):
+        # As in `importlib.machinery.FileFinder`, file suffixes are matched case-insensitively on Windows.
+        stem, dot, suffix = name.partition('.')
+        if dot:
+            return stem + dot + suffix.lower()
+        return name
+else:
+    def _normalize_listed_name(name):
+        return name
+
+
 #FIXME: Shift the following Node class hierarchy into a new
 #"PyInstaller.lib.modulegraph.node" module. This module is much too long.
 #FIXME: Refactor "_deferred_imports" from a tuple into a proper lightweight
@@ -785,6 +957,139 @@ def uniq(seq):
 DEFAULT_IMPORT_LEVEL = 0
 
 
+def _make_scan_result(module, code):
+    """
+    Marshal-able `(code, imports, global_attr_names)` tuple describing the
+    result of scanning the passed source module; see `_ModuleScanResult`.
+    """
+    imports = []
+    for have_star, import_info, kwargs in module._deferred_imports:
+        target_module_partname, _, target_attr_names, level = import_info
+        edge_attr = kwargs.get('edge_attr')
+        imports.append((
+            have_star,
+            target_module_partname,
+            target_attr_names,
+            level,
+            tuple(edge_attr) if edge_attr is not None else None,
+        ))
+    return (code, imports, sorted(module._global_attr_names))
+
+
+def _scan_source(src, pathname, optimize=-1):
+    """
+    Compile the passed source of the module with the passed path, and scan it
+    for imports and global attribute names.
+
+    The code object is compiled directly from the source, and the imports are
+    extracted by the fast source scanner (see the `scanner` module). The
+    extracted imports are cross-checked against the imports found in the
+    compiled byte-code; if the scanner fails or its results do not match (for
+    example, when the compiler eliminated imports in dead code), the module
+    is parsed into an AST and scanned using the `_Visitor` instead. Either way,
+    the result is the same as that of `ModuleGraph._scan_code()` with the
+    module's AST.
+
+    Returns
+    ----------
+    tuple
+        `(code, imports, global_attr_names)` tuple; see `_ModuleScanResult`.
+
+    Raises
+    ----------
+    SyntaxError
+        If the source cannot be compiled.
+    """
+    co = compile(src, pathname, 'exec', 0, True, optimize)
+    bytecode_imports, global_attr_ops = util.scan_code_object(co)
+
+    global_attr_names = set()
+    for is_store, attr_name in global_attr_ops:
+        if is_store:
+            global_attr_names.add(attr_name)
+        else:
+            global_attr_names.discard(attr_name)
+
+    imports = None
+    source_imports = scanner.scan_source_imports(src)
+    if source_imports is not None:
+        imports = []
+        for target_module_partname, target_attr_names, level, in_if, in_def, in_tryexcept in source_imports:
+            have_star = False
+            if target_attr_names is not None:
+                target_attr_names = uniq(target_attr_names)
+                if '*' in target_attr_names:
+                    target_attr_names.remove('*')
+                    have_star = True
+            edge_attr = DependencyInfo(conditional=in_if, tryexcept=in_tryexcept, function=in_def, fromlist=False)
+            imports.append((have_star, target_module_partname, target_attr_names, level, tuple(edge_attr)))
+
+        if not _is_same_imports(source_imports, bytecode_imports):
+            imports = None
+
+    if imports is None:
+        # Fall back to scanning the AST.
+        co_ast = compile(src, pathname, 'exec', ast.PyCF_ONLY_AST, True)
+        module = SourceModule(pathname)
+        module._deferred_imports = []
+        _Visitor(None, module).visit(co_ast)
+        imports = _make_scan_result(module, co)[1]
+
+    return (co, imports, sorted(global_attr_names))
+
+
+def _is_same_imports(source_imports, bytecode_imports):
+    """
+    Check whether the imports extracted from the source by the fast scanner
+    match the imports found in the byte-code, irrespective of their order.
+    """
+    def _key(target_module_partname, target_attr_names, level):
+        return (
+            target_module_partname,
+            target_attr_names is None,
+            tuple(sorted(set(target_attr_names or ()))),
+            level,
+        )
+
+    from_source = sorted(_key(*entry[:3]) for entry in source_imports)
+
+    from_bytecode = []
+    for target_module_partname, target_attr_names, level in bytecode_imports:
+        if target_attr_names is None:
+            # Plain imports of `__main__` are not collected from the AST.
+            if target_module_partname == '__main__':
+                continue
+        else:
+            target_attr_names = [attr_name for attr_name in target_attr_names if attr_name != '__main__']
+        from_bytecode.append(_key(target_module_partname, target_attr_names, level))
+    from_bytecode.sort()
+
+    return from_source == from_bytecode
+
+
+def scan_source_file(pathname, optimize=-1):
+    """
+    Read, compile and scan the source module with the passed path, in the same
+    way as `ModuleGraph` does when adding that module to the graph.
+
+    This function is self-contained, so that it can be run in a worker
+    process.
+
+    Returns
+    ----------
+    tuple
+        `(code, imports, global_attr_names)` tuple (see `_ModuleScanResult`)
+        or `None` if the module could not be read or compiled.
+    """
+    name = os.path.splitext(os.path.basename(pathname))[0]
+    loader = importlib.machinery.SourceFileLoader(name, pathname)
+    try:
+        src = loader.get_source(name)
+        return _scan_source(src, pathname, optimize)
+    except Exception:
+        return None
+
+
 class _Visitor(ast.NodeVisitor):
     def __init__(self, graph, module):
         self._graph = graph
@@ -900,7 +1205,8 @@ def createNode(self, cls, name, *args, **kw):
         return m
 
 
-    def __init__(self, path=None, excludes=(), replace_paths=(), implies=(), graph=None, debug=0):
+    def __init__(self, path=None, excludes=(), replace_paths=(), implies=(), graph=None, debug=0, scan_cache=None,
+                 scan_pool=None):
         super(ModuleGraph, self).__init__(graph=graph, debug=debug)
         if path is None:
             path = sys.path
@@ -919,6 +1225,27 @@ def __init__(self, path=None, excludes=(), replace_paths=(), implies=(), graph=N
         # Legacy namespace-package paths. Initialized by scan_legacy_namespace_packages.
         self._legacy_ns_packages = {}
 
+        # Optional cache of module scan results (code object, imports and
+        # global attribute names), keyed by source file path. Must provide
+        # `get(filename)` and `put(filename, code, imports, global_attr_names)`
+        # methods; see `PyInstaller.depend.scancache.ModuleScanCache`.
+        self._scan_cache = scan_cache
+
+        # Optional pool for scanning source modules in parallel. Must provide
+        # `submit(pathname)` method that schedules `scan_source_file()` for
+        # the module, and `pop(pathname)` method that returns the
+        # corresponding `concurrent.futures.Future` (or `None` if the module
+        # was not submitted); see `PyInstaller.depend.scanpool.ModuleScanPool`.
+        self._scan_pool = scan_pool
+        self._scan_submitted = set()
+        self._scan_guesses = {}
+        self._scan_guesses_path = None
+
+        # Index of the contents of searched directories, shared by all module
+        # lookups. Cleared when the search path `self.path` changes.
+        self._dir_index = _DirectoryIndex()
+        self._dir_index_path = None
+
     def scan_legacy_namespace_packages(self):
         """
         Resolve extra package `__path__` entries for legacy setuptools-based
@@ -1169,11 +1496,11 @@ def add_script(self, pathname, caller=None):
             contents = fp.read()
         contents = importlib.util.decode_source(contents)
 
-        co_ast = compile(contents, pathname, 'exec', ast.PyCF_ONLY_AST, True)
-        co = compile(co_ast, pathname, 'exec', 0, True)
+        scan_result = _ModuleScanResult(*_scan_source(contents, pathname))
+        co = scan_result.code
         m = self.createNode(Script, pathname)
         self._updateReference(caller, m, None)
-        n = self._scan_code(m, co, co_ast)
+        n = self._apply_scan_result(m, scan_result)
         self._process_imports(n)
         m.code = co
         if self.replace_paths:
@@ -1800,12 +2127,18 @@ def _safe_import_module(
             (module, co) = self._load_module(module_name, pathname, loader)
             if co is not None:
                 try:
-                    if isinstance(co, ast.AST):
-                        co_ast = co
-                        co = compile(co_ast, pathname, 'exec', 0, True)
+                    if isinstance(co, _ModuleScanResult):
+                        # Source module, scanned by `_scan_source()` (or
+                        # retrieved from the scan cache/pool).
+                        n = self._apply_scan_result(module, co)
+                        co = co.code
                     else:
-                        co_ast = None
-                    n = self._scan_code(module, co, co_ast)
+                        if isinstance(co, ast.AST):
+                            co_ast = co
+                            co = compile(co_ast, pathname, 'exec', 0, True)
+                        else:
+                            co_ast = None
+                        n = self._scan_code(module, co, co_ast)
                     self._process_imports(n)
 
                     if self.replace_paths:
@@ -1885,6 +2218,15 @@ def _load_module(self, fqname, pathname, loader):
         elif isinstance(loader, ExtensionFileLoader):
             cls = Extension
         else:
+            # If available, use cached scan result instead of reading and
+            # compiling the source.
+            scan_result = self._lookup_scan_result(pathname, loader)
+            if scan_result is not None:
+                m = self.createNode(SourceModule, fqname)
+                m.filename = pathname
+                self.msgout(2, "load_module (cached) ->", m)
+                return (m, scan_result)
+
             try:
                 src = loader.get_source(partname)
             except (UnicodeDecodeError, SyntaxError) as e:
@@ -1919,7 +2261,10 @@ def _load_module(self, fqname, pathname, loader):
 
             if src is not None:
                 try:
-                    co = compile(src, pathname, 'exec', ast.PyCF_ONLY_AST, True)
+                    scan_result = _scan_source(src, pathname)
+                    if self._scan_cache is not None:
+                        self._scan_cache.put(pathname, *scan_result)
+                    co = _ModuleScanResult(*scan_result)
                     cls = SourceModule
                 except SyntaxError:
                     co = None
@@ -1945,6 +2290,180 @@ def _load_module(self, fqname, pathname, loader):
         self.msgout(2, "load_module ->", m)
         return (m, co)
 
+    def _lookup_scan_result(self, pathname, loader):
+        """
+        Pre-computed scan result of the source module with the passed path if
+        available (either from the scan cache, or from the scan pool) _or_
+        `None` otherwise.
+        """
+        if not isinstance(loader, importlib.machinery.SourceFileLoader):
+            return None
+
+        if self._scan_cache is not None:
+            cached = self._scan_cache.get(pathname)
+            if cached is not None:
+                return _ModuleScanResult(*cached)
+
+        future = self._scan_pool.pop(pathname) if self._scan_pool is not None else None
+        if future is not None:
+            # If the worker has not picked up the scan yet, do not wait for
+            # it to work through the queue ahead of it; cancel it and scan the
+            # module ourselves. Only wait for scans that are already running
+            # or done.
+            if future.cancel():
+                return None
+            try:
+                result = future.result()
+            except Exception as exc:
+                self.msg(2, "load_module: scan in worker failed", pathname, exc)
+                result = None
+            # If the worker failed to scan the module, fall back to scanning
+            # it ourselves, so that errors are handled in the usual way.
+            if result is not None:
+                if self._scan_cache is not None:
+                    self._scan_cache.put(pathname, *result)
+                return _ModuleScanResult(*result)
+
+        return None
+
+    def _prefetch_imports(self, source_module):
+        """
+        Submit the source files of modules that are likely to be imported by
+        the passed source module to the scan pool, so that they are scanned in
+        parallel while this graph is being built.
+
+        This is purely speculative; module paths are guessed without running
+        hooks, and scan results are used only if the module is subsequently
+        found at the guessed path.
+        """
+        for have_star, import_info, kwargs in source_module._deferred_imports:
+            target_module_partname, _, target_attr_names, level = import_info
+            name = self._guess_absolute_name(source_module, target_module_partname, level)
+            if not name:
+                continue
+
+            # Include parent packages, and potential submodules from the
+            # "from" list.
+            names = []
+            parts = name.split('.')
+            for idx in range(1, len(parts) + 1):
+                names.append('.'.join(parts[:idx]))
+            if target_attr_names:
+                names += [name + '.' + attr_name for attr_name in target_attr_names]
+
+            for fullname in names:
+                pathname = self._guess_source_path(fullname)
+                if pathname is None or pathname in self._scan_submitted:
+                    continue
+                self._scan_submitted.add(pathname)
+                if self._scan_cache is not None and pathname in self._scan_cache:
+                    continue
+                self._scan_pool.submit(pathname)
+
+    def _guess_absolute_name(self, source_module, target_module_partname, level):
+        """
+        Absolute name of the module targeted by the passed import in the
+        passed source module _or_ `None` if it cannot be determined.
+        """
+        if not level:
+            return target_module_partname
+
+        if source_module.packagepath is not None:
+            base_name = source_module.identifier
+        else:
+            base_name = source_module.identifier.rpartition('.')[0]
+        for _ in range(level - 1):
+            base_name = base_name.rpartition('.')[0]
+        if not base_name:
+            return None
+
+        if target_module_partname:
+            return base_name + '.' + target_module_partname
+        return base_name
+
+    def _guess_source_path(self, fullname):
+        """
+        Guessed path to the source file of the module with the passed name
+        _or_ `None` if the module has already been imported into this graph or
+        if its source file cannot be found.
+        """
+        # Discard previous guesses if search path has been changed.
+        if self._scan_guesses_path is not self.path:
+            self._scan_guesses = {}
+            self._scan_guesses_path = self.path
+
+        if fullname in self._scan_guesses:
+            return self._scan_guesses[fullname]
+        if self.find_node(fullname) is not None:
+            return None
+
+        pathname = None
+        parent_name, _, partname = fullname.rpartition('.')
+        if parent_name:
+            parent = self.find_node(parent_name)
+            if parent is not None:
+                search_dirs = parent.packagepath or []
+            else:
+                parent_pathname = self._guess_source_path(parent_name)
+                if parent_pathname and os.path.basename(parent_pathname) == '__init__.py':
+                    search_dirs = [os.path.dirname(parent_pathname)]
+                else:
+                    search_dirs = []
+        else:
+            search_dirs = self.path
+
+        dir_index = self._get_directory_index()
+        for search_dir in search_dirs:
+            if not isinstance(search_dir, str):
+                continue
+            if dir_index is not None:
+                if dir_index.isdir(search_dir, partname) and \
+                        dir_index.isfile(os.path.join(search_dir, partname), '__init__.py'):
+                    pathname = os.path.join(search_dir, partname, '__init__.py')
+                    break
+                if dir_index.isfile(search_dir, partname + '.py'):
+                    pathname = os.path.join(search_dir, partname + '.py')
+                    break
+                continue
+            candidate = os.path.join(search_dir, partname, '__init__.py')
+            if os.path.isfile(candidate):
+                pathname = candidate
+                break
+            candidate = os.path.join(search_dir, partname + '.py')
+            if os.path.isfile(candidate):
+                pathname = candidate
+                break
+
+        self._scan_guesses[fullname] = pathname
+        return pathname
+
+    def _apply_scan_result(self, module, scan_result):
+        """
+        Populate the deferred imports and global attribute names of the passed
+        module from the passed (cached) scan result, as if the module had been
+        scanned by the `_scan_code()` method.
+
+        Returns
+        ----------
+        module : Node
+            Graph node of the module.
+        """
+        module._deferred_imports = []
+        for have_star, target_module_partname, target_attr_names, level, edge_attr in scan_result.imports:
+            if target_attr_names is not None:
+                target_attr_names = list(target_attr_names)
+            kwargs = {}
+            if edge_attr is not None:
+                kwargs['edge_attr'] = DependencyInfo(*edge_attr)
+            module._deferred_imports.append((
+                have_star,
+                (target_module_partname, module, target_attr_names, level),
+                kwargs,
+            ))
+        module._global_attr_names.update(scan_result.global_attr_names)
+
+        return module
+
     def _safe_import_hook(
         self, target_module_partname, source_module, target_attr_names,
         level=DEFAULT_IMPORT_LEVEL, edge_attr=None):
@@ -2498,36 +3017,14 @@ def _scan_bytecode(
               parsing will have already parsed import statements, which this
               parsing must avoid repeating.
         """
-        level = None
-        fromlist = None
-
-        # 'deque' is a list-like container with fast appends, pops on
-        # either end, and automatically discarding elements too much.
-        prev_insts = deque(maxlen=2)
-        for inst in util.iterate_instructions(module_code_object):
-            if not inst:
-                continue
-            # If this is an import statement originating from this module,
-            # parse this import.
-            #
-            # Note that the related "IMPORT_FROM" opcode need *NOT* be parsed.
-            # "IMPORT_NAME" suffices. For further details, see
-            #     http://probablyprogramming.com/2008/04/14/python-import_name
-            if inst.opname == 'IMPORT_NAME':
-                # If this method is ignoring import statements, skip to the
-                # next opcode.
-                if not is_scanning_imports:
-                    continue
-
-                assert prev_insts[-2].opname == 'LOAD_CONST'
-                assert prev_insts[-1].opname == 'LOAD_CONST'
-
-                # Python >=2.5: LOAD_CONST flags, LOAD_CONST names, IMPORT_NAME name
-                level = prev_insts[-2].argval
-                fromlist = prev_insts[-1].argval
+        # Only the instructions of interest are decoded; see
+        # `util.scan_code_object()`.
+        imports, global_attr_ops = util.scan_code_object(module_code_object)
 
+        # If this method is ignoring import statements, skip them.
+        if is_scanning_imports:
+            for target_module_partname, fromlist, level in imports:
                 assert fromlist is None or type(fromlist) is tuple
-                target_module_partname = inst.argval
 
                 #FIXME: The exact same logic appears in _collect_import(),
                 #which isn't particularly helpful. Instead, defer this logic
@@ -2556,7 +3053,8 @@ def _scan_bytecode(
                     {}
                 ))
 
-            elif inst.opname in ('STORE_NAME', 'STORE_GLOBAL'):
+        for is_store, name in global_attr_ops:
+            if is_store:
                 # If this is the declaration of a global attribute (e.g.,
                 # class, variable) in this module, store this declaration for
                 # subsequent lookup. See method docstring for further details.
@@ -2569,19 +3067,14 @@ def _scan_bytecode(
                 # in "from foo import bar", which is either a non-ignorable
                 # submodule of "foo" or an ignorable global attribute of
                 # "foo.__init__").
-                name = inst.argval
                 module.add_global_attr(name)
-
-            elif inst.opname in ('DELETE_NAME', 'DELETE_GLOBAL'):
+            else:
                 # If this is the undeclaration of a previously declared global
                 # attribute (e.g., class, variable) in this module, remove that
                 # declaration to prevent subsequent lookup. See method docstring
                 # for further details.
-                name = inst.argval
                 module.remove_global_attr_if_found(name)
 
-            prev_insts.append(inst)
-
 
     def _process_imports(self, source_module):
         """
@@ -2600,6 +3093,10 @@ def _process_imports(self, source_module):
         if not source_module._deferred_imports:
             return
 
+        # Let the scan pool (if any) scan the target modules in parallel.
+        if self._scan_pool is not None:
+            self._prefetch_imports(source_module)
+
         # For each target module imported by this source module...
         for have_star, import_info, kwargs in source_module._deferred_imports:
             # Graph node of the target module specified by the "from" portion
@@ -2698,6 +3195,25 @@ def _find_module(self, name, path, parent=None):
         return self._find_module_path(fullname, name, path)
 
 
+    def _get_directory_index(self):
+        """
+        Directory index (see `_DirectoryIndex`) to be used for module lookups
+        _or_ `None` if module lookups must query the file system directly.
+
+        The index is cleared whenever the search path `self.path` changes.
+        """
+        if 'PYTHONCASEOK' in os.environ:
+            # Module names are matched case-insensitively on case-insensitive
+            # platforms; not supported by the index.
+            return None
+        if self._dir_index_path != self.path:
+            if self._dir_index_path is not None:
+                self.msg(3, "directory index invalidated: search path changed")
+            self._dir_index.clear()
+            self._dir_index_path = list(self.path)
+        return self._dir_index
+
+
     def _find_module_path(self, fullname, module_name, search_dirs):
         """
         3-tuple describing the physical location of the module with the passed
@@ -2746,6 +3262,8 @@ def _find_module_path(self, fullname, module_name, search_dirs):
         # namespace package to which this module belongs if any.
         namespace_dirs = []
 
+        dir_index = self._get_directory_index()
+
         try:
             for search_dir in search_dirs:
                 # PEP 302-compliant importer making loaders for this directory.
@@ -2758,10 +3276,19 @@ def _find_module_path(self, fullname, module_name, search_dirs):
 
                 # Get the PEP 302-compliant loader object loading this module.
                 #
+                # If this importer is the default file-system finder, resolve
+                # the module against the directory index instead of querying
+                # the file system.
+                if dir_index is not None and _is_default_file_finder(importer):
+                    loader, loader_namespace_dirs = dir_index.find_loader(
+                        importer.path, module_name)
+                    namespace_dirs.extend(loader_namespace_dirs)
                 # If this importer defines the PEP 451-compliant find_spec()
                 # method, use that, and obtain loader from spec. This should
                 # be available on python >= 3.4.
-                if hasattr(importer, 'find_spec'):
+                elif hasattr(importer, 'find_spec'):
+                    if dir_index is not None:
+                        dir_index.fallbacks += 1
                     loader = None
                     spec = importer.find_spec(module_name)
                     if spec is not None:
@@ -0,0 +1,277 @@
+"""
+Fast extraction of import statements from Python source code.
+
+The scanner does not build an AST. Instead, it strips string literals and
+comments from the source using a regular expression, locates the logical lines
+that contain compound statement headers and import statements, and keeps track
+of the enclosing `if`, `try` and `def` blocks based on indentation. The result
+is the same list of imports as is collected by the AST visitor in the
+`modulegraph` module, including the `conditional`, `function` and `tryexcept`
+flags.
+
+The scanner handles only the syntax that it can handle with certainty, and
+returns `None` for anything else, in which case the caller should fall back to
+the AST-based scan.
+"""
+
+import re
+import unicodedata
+
+# String literals and comments. Strings are replaced with empty literals (the
+# captured opening quote character is emitted twice), comments are removed.
+_STRIP_RE = re.compile(
+    r"""(?:(?<!\w)[rRbBuUfF]{1,2})?(?:"""
+    r"""(''')[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''"""
+    r'''|(""")[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""'''
+    r"""|(')[^'\\\n]*(?:\\.[^'\\\n]*)*'"""
+    r'''|(")[^"\\\n]*(?:\\.[^"\\\n]*)*"'''
+    r""")|\#[^\n]*""",
+    re.DOTALL,
+)
+_STRIP_REPL = r'\1\2\3\4\1\2\3\4'
+
+# Lines that (might) start a compound statement, or contain an import statement.
+_CANDIDATE_RE = re.compile(
+    r'^[ \t]*(?:(?:if|elif|else|try|except|finally|for|while|with|def|class|async|match|case)\b|.*\bimport\b)',
+    re.MULTILINE,
+)
+
+_FIRST_WORD_RE = re.compile(r'\w+')
+_NEXT_WORD_RE = re.compile(r'[ \t]*(\w+)')
+_LAMBDA_RE = re.compile(r'\blambda\b')
+_FROM_IMPORT_RE = re.compile(r'from\b(.*?)\bimport\b(.*)', re.DOTALL)
+_AS_RE = re.compile(r'\s+as\s+')
+
+# Translation table that unifies all brackets, so that bracket depth can be computed by counting two characters.
+_BRACKETS = str.maketrans('[{]}', '(())')
+
+# Block kinds that affect the flags of the imports they contain.
+_KIND_IF = 'if'
+_KIND_TRY = 'try'
+_KIND_DEF = 'def'
+_KIND_LOOP = 'loop'  # for/while; tracked only to resolve `else` clauses.
+
+_HEADER_KINDS = {
+    'if': _KIND_IF,
+    'elif': _KIND_IF,
+    'try': _KIND_TRY,
+    'except': _KIND_TRY,
+    'finally': _KIND_TRY,
+    'def': _KIND_DEF,
+    'for': _KIND_LOOP,
+    'while': _KIND_LOOP,
+    'with': None,
+    'class': None,
+}
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def scan_source_imports(src):
+    """
+    Extract all import statements from the passed Python source code (str).
+
+    Returns a list of `(name, fromlist, level, in_if, in_def, in_tryexcept)`
+    tuples in the order of their appearance in the source, where `name` and
+    `fromlist` are the same as collected by the AST visitor (i.e., with
+    `__main__` filtered out of import names), or `None` if the source contains
+    constructs that the scanner cannot handle with certainty.
+
+    The source is assumed to be syntactically valid.
+    """
+    if 'import' not in src:
+        return []
+    try:
+        return _scan(src)
+    except _Unsupported:
+        return None
+
+
+def _scan(src):
+    if '\r' in src:
+        src = src.replace('\r\n', '\n').replace('\r', '\n')
+    if '\f' in src:
+        raise _Unsupported()
+
+    text = _STRIP_RE.sub(_STRIP_REPL, src)
+    if '\\' in text:
+        text = text.replace('\\\n', ' ')
+    brackets = text.translate(_BRACKETS)
+
+    imports = []
+    stack = []  # (indent, kind)
+    counts = {_KIND_IF: 0, _KIND_TRY: 0, _KIND_DEF: 0, _KIND_LOOP: 0, None: 0}
+
+    depth = 0  # Bracket depth at `pos`.
+    pos = 0
+    for match in _CANDIDATE_RE.finditer(text):
+        start = match.start()
+        if start < pos:
+            # Part of the logical line that was already processed.
+            continue
+        depth += brackets.count('(', pos, start) - brackets.count(')', pos, start)
+        pos = start
+        if depth:
+            # Continuation line within brackets.
+            continue
+
+        # Find the end of the logical line.
+        end = text.find('\n', start)
+        if end == -1:
+            end = len(text)
+        line_depth = brackets.count('(', start, end) - brackets.count(')', start, end)
+        while line_depth:
+            if end == len(text):
+                raise _Unsupported()
+            next_end = text.find('\n', end + 1)
+            if next_end == -1:
+                next_end = len(text)
+            line_depth += brackets.count('(', end, next_end) - brackets.count(')', end, next_end)
+            end = next_end
+        pos = end
+
+        line = text[start:end]
+        stripped = line.lstrip(' \t')
+        indent = _get_indent(line[:len(line) - len(stripped)])
+
+        # Close the blocks that this line is not part of.
+        last_closed = None
+        while stack and stack[-1][0] >= indent:
+            last_closed = stack.pop()
+            counts[last_closed[1]] -= 1
+
+        word = _FIRST_WORD_RE.match(stripped)
+        word = word.group() if word else ''
+
+        if word == 'else':
+            kind = last_closed[1] if last_closed is not None and last_closed[0] == indent else None
+            if kind == _KIND_LOOP:
+                kind = None
+            body = _split_header(stripped, 4)
+        elif word == 'async':
+            second = _NEXT_WORD_RE.match(stripped, 5)
+            if second is None:
+                raise _Unsupported()
+            kind = _KIND_DEF if second.group(1) == 'def' else None
+            body = _split_header(stripped, second.end())
+        elif word in ('match', 'case'):
+            # Soft keywords; this might as well be a simple statement.
+            body = _split_header(stripped, len(word), soft=True)
+            if body is None:
+                _scan_statements(stripped, imports, counts)
+                continue
+            kind = None
+        elif word in _HEADER_KINDS:
+            if word == 'except' and stripped[6:].lstrip(' \t').startswith('*'):
+                # The AST visitor does not treat `try`/`except*` blocks as try/except blocks, and we cannot tell them
+                # apart from regular ones without looking ahead.
+                raise _Unsupported()
+            kind = _HEADER_KINDS[word]
+            body = _split_header(stripped, len(word))
+        else:
+            _scan_statements(stripped, imports, counts)
+            continue
+
+        stack.append((indent, kind))
+        counts[kind] += 1
+        if body:
+            _scan_statements(body, imports, counts)
+
+    return imports
+
+
+def _get_indent(whitespace):
+    if '\t' not in whitespace:
+        return len(whitespace)
+    return len(whitespace.expandtabs(8))
+
+
+def _split_header(line, offset, soft=False):
+    """
+    Locate the colon that terminates the compound statement header in the passed logical line, starting at the given
+    offset. Returns the remainder of the line after the colon (the body of a one-line compound statement; an empty
+    string if the body is on the following lines).
+
+    For soft keywords, `None` is returned if the line does not appear to be a compound statement header.
+    """
+    depth = 0
+    colon = -1
+    header = []  # Characters of the header outside of brackets.
+    for idx in range(offset, len(line)):
+        char = line[idx]
+        if char in '([{':
+            depth += 1
+        elif char in ')]}':
+            depth -= 1
+        elif not depth:
+            if char == ':' and line[idx + 1:idx + 2] != '=':
+                colon = idx
+                break
+            header.append(char)
+
+    if colon == -1:
+        if soft:
+            return None
+        raise _Unsupported()
+
+    header = ''.join(header)
+    if soft:
+        # Rule out annotated assignments (`match: int = 0`, `match.x: int = 0`) and calls (`match(x)`).
+        lead = header.lstrip(' \t')
+        if not lead or lead[0] in '.=':
+            return None
+    if _LAMBDA_RE.search(header):
+        # A lambda's colon might have been taken for the end of the header.
+        raise _Unsupported()
+
+    return line[colon + 1:].strip(' \t\n')
+
+
+def _scan_statements(line, imports, counts):
+    """
+    Collect imports from the simple statements in the passed logical line.
+    """
+    if 'import' not in line:
+        return
+    flags = (counts[_KIND_IF] > 0, counts[_KIND_DEF] > 0, counts[_KIND_TRY] > 0)
+    for statement in line.split(';'):
+        statement = statement.strip(' \t\n')
+        if statement.startswith('import') and statement[6:7] in (' ', '\t'):
+            for alias in statement[7:].split(','):
+                name = _get_name(_AS_RE.split(alias.strip(' \t\n'))[0])
+                if name != '__main__':
+                    imports.append((name, None, 0) + flags)
+        elif statement.startswith('from') and statement[4:5] in (' ', '\t', '.'):
+            match = _FROM_IMPORT_RE.match(statement)
+            if match is None:
+                raise _Unsupported()
+            module = _get_name(match.group(1))
+            stripped_module = module.lstrip('.')
+            level = len(module) - len(stripped_module)
+            fromlist = []
+            for alias in match.group(2).strip(' \t\n()').split(','):
+                alias = alias.strip(' \t\n')
+                if not alias:
+                    continue  # Trailing comma.
+                name = _get_name(_AS_RE.split(alias)[0])
+                if name != '__main__':
+                    fromlist.append(name)
+            imports.append((stripped_module, fromlist, level) + flags)
+        elif 'import' in statement and re.search(r'\bimport\b', statement):
+            # An import statement that we failed to recognize.
+            raise _Unsupported()
+
+
+def _get_name(name):
+    """
+    Normalize the (possibly dotted) name from an import statement.
+    """
+    name = ''.join(name.split())
+    if not name.isascii():
+        name = unicodedata.normalize('NFKC', name)
+    chars = name.replace('.', '').replace('_', '')
+    if chars and not chars.isalnum() and name != '*':
+        raise _Unsupported()
+    return name
@@ -19,3 +19,88 @@ def iterate_instructions(code_object):
     for constant in code_object.co_consts:
         if inspect.iscode(constant):
             yield from iterate_instructions(constant)
+
+
+_OP_CACHE = dis.opmap.get('CACHE')  # Python >= 3.11
+_OP_EXTENDED_ARG = dis.opmap['EXTENDED_ARG']
+_OP_LOAD_CONST = dis.opmap['LOAD_CONST']
+_OP_IMPORT_NAME = dis.opmap['IMPORT_NAME']
+_OPS_STORE = (dis.opmap['STORE_NAME'], dis.opmap['STORE_GLOBAL'])
+_OPS_DELETE = (dis.opmap['DELETE_NAME'], dis.opmap['DELETE_GLOBAL'])
+_OPS_OF_INTEREST = (_OP_IMPORT_NAME, *_OPS_STORE, *_OPS_DELETE)
+
+
+def _get_instruction(ops, args, index):
+    """Return `(start_index, opcode, arg)` of the instruction whose opcode is
+    at `index`, taking preceding `EXTENDED_ARG` prefixes into account."""
+    arg = args[index]
+    shift = 8
+    start = index
+    while start > 0 and ops[start - 1] == _OP_EXTENDED_ARG:
+        start -= 1
+        arg |= args[start] << shift
+        shift += 8
+    return start, ops[index], arg
+
+
+def _get_previous_instruction(ops, args, index):
+    """Return `(start_index, opcode, arg)` of the instruction preceding the
+    one that starts at `index`."""
+    index -= 1
+    if _OP_CACHE is not None:
+        while ops[index] == _OP_CACHE:
+            index -= 1
+    return _get_instruction(ops, args, index)
+
+
+def scan_code_object(code_object):
+    """Scan the byte-code of the passed code object (and all code objects
+    nested in it) for imports and for global attribute stores/deletes.
+
+    This is equivalent to inspecting the `IMPORT_NAME`, `STORE_NAME`,
+    `STORE_GLOBAL`, `DELETE_NAME` and `DELETE_GLOBAL` instructions delivered
+    by `iterate_instructions()`, but does not decode the instructions that are
+    of no interest, which is considerably faster.
+
+    Returns a tuple `(imports, global_attr_ops)`, where `imports` is a list of
+    `(name, fromlist, level)` tuples, and `global_attr_ops` is a list of
+    `(is_store, name)` tuples, both in the order of appearance.
+    """
+    imports = []
+    global_attr_ops = []
+    _scan_code_object(code_object, imports, global_attr_ops)
+    return imports, global_attr_ops
+
+
+def _scan_code_object(code_object, imports, global_attr_ops):
+    co_code = code_object.co_code
+    ops = co_code[0::2]
+    args = co_code[1::2]
+
+    # Locate the instructions of interest, and process them in order.
+    indices = []
+    for op in _OPS_OF_INTEREST:
+        index = ops.find(op)
+        while index != -1:
+            indices.append(index)
+            index = ops.find(op, index + 1)
+    indices.sort()
+
+    names = code_object.co_names
+    consts = code_object.co_consts
+    for index in indices:
+        start, op, arg = _get_instruction(ops, args, index)
+        if op == _OP_IMPORT_NAME:
+            # LOAD_CONST level, LOAD_CONST fromlist, IMPORT_NAME name
+            start, fromlist_op, fromlist_arg = _get_previous_instruction(ops, args, start)
+            _, level_op, level_arg = _get_previous_instruction(ops, args, start)
+            assert fromlist_op == _OP_LOAD_CONST
+            assert level_op == _OP_LOAD_CONST
+            imports.append((names[arg], consts[fromlist_arg], consts[level_arg]))
+        else:
+            global_attr_ops.append((op in _OPS_STORE, names[arg]))
+
+    # Process nested code objects in the same order as `iterate_instructions()`.
+    for constant in consts:
+        if inspect.iscode(constant):
+            _scan_code_object(constant, imports, global_attr_ops)
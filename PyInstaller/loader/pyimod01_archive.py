@@ -18,6 +18,7 @@
 import struct
 import marshal
 import zlib
+import _thread
 
 # In Python3, the MAGIC_NUMBER value is available in the importlib module. However, in the bootstrap phase we cannot use
 # importlib directly, but rather its frozen variant.
@@ -31,23 +32,214 @@
 PYZ_ITEM_DATA = 2  # deprecated; PYZ does not contain any data entries anymore
 PYZ_ITEM_NSPKG = 3  # PEP-420 namespace package
 
+# Compression codecs of PYZ and CArchive entries. The codec ID is stored in the TOC entry; in CArchive, it is stored in
+# the field that used to be a boolean compression flag, so zlib keeps its former value.
+CODEC_STORED = 0  # no compression
+CODEC_ZLIB = 1
+CODEC_LZMA = 2  # legacy .lzma (LZMA-alone) format; not supported by the bootloader
+CODEC_ZLIB_DICT = 3  # zlib with the archive's shared compression dictionary; PYZ only
+
+# Flags in PYZ archive header
+PYZ_FLAG_MMAP = 0x01  # the archive should be read via memory-mapping
+PYZ_FLAG_COMPACT_TOC = 0x02  # the TOC is stored in compact binary format (see `CompactToc`)
+PYZ_FLAG_PREFETCH = 0x04  # the TOC is followed by the prefetch table (see `ZlibArchiveReader`)
+
 
 class ArchiveReadError(RuntimeError):
     pass
 
 
+def decompress(data, codec, zdict=None):
+    """
+    Decompress the data of an archive entry, which was compressed with the given codec. The `zdict` is the archive's
+    shared compression dictionary, required by the CODEC_ZLIB_DICT codec.
+    """
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    elif codec == CODEC_ZLIB_DICT:
+        decompressor = zlib.decompressobj(zdict=zdict)
+        return decompressor.decompress(data) + decompressor.flush()
+    elif codec == CODEC_STORED:
+        return bytes(data)  # The data might be a memoryview.
+    elif codec == CODEC_LZMA:
+        # Use the extension module directly; the pure-python `lzma` module might be stored in the PYZ archive itself.
+        import _lzma
+        return _lzma.LZMADecompressor(_lzma.FORMAT_ALONE).decompress(data)
+    raise ArchiveReadError(f"Unsupported compression codec: {codec}!")
+
+
+class CompactToc:
+    """
+    Read-only mapping of PYZ entry names to `(typecode, offset, length, codec)` tuples, backed by the TOC data in
+    compact binary format. The entries are decoded on demand, so the TOC does not need to be turned into python objects
+    (a tuple, a string and several integers per entry) when the archive is opened.
+
+    The TOC data consists of (all integers are big-endian):
+     - header: number of entries, number of hash table slots, and length of the string table (32-bit unsigned ints)
+     - entry records, sorted by name, with fixed stride: offset (32-bit) and length (16-bit) of the name in the string
+       table, typecode (8-bit), codec (8-bit), and offset and length of the entry data (32-bit)
+     - hash table: index of the entry record (32-bit), or `EMPTY_SLOT`; the number of slots is a power of two, and
+       collisions are resolved by linear probing. The hash of the name is the CRC32 of its UTF-8 encoding.
+     - string table: UTF-8 encoded names
+    """
+    HEADER = struct.Struct('!III')
+    RECORD = struct.Struct('!IHBBII')
+    SLOT = struct.Struct('!I')
+    EMPTY_SLOT = 0xFFFFFFFF
+
+    def __init__(self, data):
+        self._data = data
+        self._cache = {}
+        self._num_entries, self._num_slots, strings_length = self.HEADER.unpack_from(data, 0)
+        self._records_offset = self.HEADER.size
+        self._slots_offset = self._records_offset + self._num_entries * self.RECORD.size
+        self._strings_offset = self._slots_offset + self._num_slots * self.SLOT.size
+        if self._strings_offset + strings_length != len(data):
+            raise ArchiveReadError("PYZ TOC size mismatch!")
+
+    @classmethod
+    def read(cls, fp):
+        """
+        Read the TOC data from the current position of the file object.
+        """
+        header = fp.read(cls.HEADER.size)
+        num_entries, num_slots, strings_length = cls.HEADER.unpack(header)
+        return cls(header + fp.read(num_entries * cls.RECORD.size + num_slots * cls.SLOT.size + strings_length))
+
+    def _find(self, name):
+        """
+        Look up the entry record by name. Returns the unpacked record, or None if there is no such entry.
+        """
+        try:
+            encoded_name = name.encode('utf-8')
+        except (AttributeError, UnicodeEncodeError):
+            return None
+        data = self._data
+        unpack_slot = self.SLOT.unpack_from
+        unpack_record = self.RECORD.unpack_from
+        mask = self._num_slots - 1
+        slot = zlib.crc32(encoded_name) & mask
+        while True:
+            index, = unpack_slot(data, self._slots_offset + slot * self.SLOT.size)
+            if index == self.EMPTY_SLOT:
+                return None
+            record = unpack_record(data, self._records_offset + index * self.RECORD.size)
+            name_offset = self._strings_offset + record[0]
+            if data[name_offset:name_offset + record[1]] == encoded_name:
+                return record
+            slot = (slot + 1) & mask
+
+    def _decode_record(self, index):
+        """
+        Decode the entry record with given index. Returns `(name, entry)` tuple.
+        """
+        name_offset, name_length, typecode, codec, offset, length = \
+            self.RECORD.unpack_from(self._data, self._records_offset + index * self.RECORD.size)
+        name_offset += self._strings_offset
+        name = bytes(self._data[name_offset:name_offset + name_length]).decode('utf-8')
+        return name, (typecode, offset, length, codec)
+
+    def get(self, name, default=None):
+        # The entries that have been looked up are kept in a dictionary, as the importer usually looks up the same
+        # entry several times when importing a module.
+        entry = self._cache.get(name)
+        if entry is None:
+            record = self._find(name)
+            if record is None:
+                return default
+            _, _, typecode, codec, offset, length = record
+            entry = self._cache[name] = (typecode, offset, length, codec)
+        return entry
+
+    def __getitem__(self, name):
+        entry = self.get(name)
+        if entry is None:
+            raise KeyError(name)
+        return entry
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return self._num_entries
+
+    def __iter__(self):
+        for index in range(self._num_entries):
+            yield self._decode_record(index)[0]
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        for index in range(self._num_entries):
+            yield self._decode_record(index)
+
+    def values(self):
+        for index in range(self._num_entries):
+            yield self._decode_record(index)[1]
+
+
 class ZlibArchiveReader:
     """
     Reader for PyInstaller's PYZ (ZlibArchive) archive. The archive is used to store collected byte-compiled Python
     modules, as individually-compressed entries.
+
+    The TOC maps entry names to `(typecode, offset, length, codec)` tuples. If the archive has the PYZ_FLAG_COMPACT_TOC
+    flag set, the TOC is a `CompactToc`, from which the entries are decoded on demand; otherwise, it is a dictionary
+    (unmarshalled from the archive). Archives created by older versions of PyInstaller have no codec field, and their
+    entries are compressed with zlib. If the archive contains a shared
+    compression dictionary, it is available as `zdict`.
+
+    If `use_mmap` is True, the archive file is memory-mapped once, and the entries are read from the mapping, instead
+    of opening the file for each entry. If it is None (the default), the memory-mapping is used if the archive has the
+    PYZ_FLAG_MMAP flag set. If the file cannot be mapped (for example, because the `mmap` module is unavailable), the
+    entries are read from the file.
+
+    If the archive has the PYZ_FLAG_PREFETCH flag set, the TOC is followed by the prefetch table, which lists the
+    entries of modules that are imported during the start-up of the application (in the order of their imports, as
+    recorded by a "training" run). The table consists of the number of records (32-bit unsigned int), followed by the
+    records: offset and length (32-bit unsigned ints) and codec (8-bit) of the entry data. The entries are stored
+    contiguously, so `start_prefetch` can read them in a single read, and decompress them in a background thread;
+    `extract` then uses the prefetched data, if available, and `wait_prefetch` waits for the thread to finish. Once all
+    prefetched entries have been extracted, or an entry outside of the prefetched region is extracted after the thread
+    has finished (i.e., the start-up is over), the data of entries that were prefetched but not extracted is released.
+
+    If `cache_size` is non-zero, the decompressed data of entries that are extracted more than once (for example, when
+    modules are reloaded, or probed by plugin frameworks) is kept in a least-recently-used cache, whose total size is
+    limited to `cache_size` bytes. The entries are admitted into the cache on their second extraction, so that the data
+    of modules that are imported only once (which is the common case) does not occupy the memory. The number of cache
+    hits and misses is available as `cache_hits` and `cache_misses`; see also `cache_info`.
     """
     _PYZ_MAGIC_PATTERN = b'PYZ\0'
 
-    def __init__(self, filename, start_offset=None, check_pymagic=False):
+    PREFETCH_HEADER = struct.Struct('!I')
+    PREFETCH_RECORD = struct.Struct('!IIB')
+
+    def __init__(self, filename, start_offset=None, check_pymagic=False, use_mmap=None, cache_size=0):
         self._filename = filename
         self._start_offset = start_offset
+        self._mmap = None  # memoryview of the memory-mapped archive file
 
         self.toc = {}
+        self.zdict = None
+        self.flags = 0
+
+        self._prefetch_table = []  # (offset, length, codec) tuples
+        self._prefetched = None  # offset -> decompressed data; None if prefetching is not in progress
+        self._prefetch_skipped = set()  # offsets of entries that were extracted before they were prefetched
+        self._prefetch_region = (0, 0)  # start and end offset of the prefetched entries
+        self._prefetch_pending = 0  # number of extractions from the prefetched region until prefetching is ended
+        self._prefetch_lock = _thread.allocate_lock()  # held while the prefetch thread is running
+
+        # LRU cache of decompressed entries; dictionaries preserve insertion order, so the least recently used entry
+        # is the first one.
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = {}  # offset -> decompressed data
+        self._cache_seen = set()  # offsets of entries that have been extracted (and are eligible for the cache)
+        self._cache_size = 0
+        self._cache_max_size = cache_size
+        self._cache_lock = _thread.allocate_lock()
 
         # If no offset is given, try inferring it from filename
         if start_offset is None:
@@ -69,12 +261,40 @@ def __init__(self, filename, start_offset=None, check_pymagic=False):
             if check_pymagic and pymagic != PYTHON_MAGIC_NUMBER:
                 raise ArchiveReadError("Python magic pattern mismatch!")
 
-            # Read TOC offset
-            toc_offset, *_ = struct.unpack('!i', fp.read(4))
+            # Read TOC offset, length of the shared compression dictionary (which is stored immediately before the
+            # TOC), and flags. In archives created by older PyInstaller versions, the latter two fields are zero.
+            toc_offset, zdict_length, self.flags = struct.unpack('!iIB', fp.read(9))
+
+            # Load the dictionary and TOC
+            fp.seek(self._start_offset + toc_offset - zdict_length, os.SEEK_SET)
+            if zdict_length:
+                self.zdict = fp.read(zdict_length)
+            if self.flags & PYZ_FLAG_COMPACT_TOC:
+                self.toc = CompactToc.read(fp)
+            else:
+                self.toc = dict(marshal.load(fp))
+            if self.flags & PYZ_FLAG_PREFETCH:
+                num_records, = self.PREFETCH_HEADER.unpack(fp.read(self.PREFETCH_HEADER.size))
+                data = fp.read(num_records * self.PREFETCH_RECORD.size)
+                self._prefetch_table = list(self.PREFETCH_RECORD.iter_unpack(data))
+
+            if use_mmap is None:
+                use_mmap = bool(self.flags & PYZ_FLAG_MMAP)
+            if use_mmap:
+                self._mmap = self._map_file(fp)
 
-            # Load TOC
-            fp.seek(self._start_offset + toc_offset, os.SEEK_SET)
-            self.toc = dict(marshal.load(fp))
+    @staticmethod
+    def _map_file(fp):
+        """
+        Memory-map the whole archive file (the mapping remains valid after the file is closed). Returns memoryview of
+        the mapping, or None if the file cannot be mapped.
+        """
+        try:
+            # The `mmap` module might not be built-in; in that case, it is collected as extension module.
+            import mmap
+            return memoryview(mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ))
+        except Exception:
+            return None
 
     @staticmethod
     def _parse_offset_from_filename(filename):
@@ -107,13 +327,186 @@ def extract(self, name, raw=False):
         entry = self.toc.get(name)
         if entry is None:
             return None
-        typecode, entry_offset, entry_length = entry
+        typecode, entry_offset = entry[:2]
+
+        obj = None
+        if self._cache_max_size:
+            obj = self._cache_get(entry_offset)
+        if obj is None:
+            if self._prefetched is not None:
+                obj = self._pop_prefetched(entry_offset)
+            if obj is None:
+                _, codec, obj = self.get_entry_data(entry)
+                obj = decompress(obj, codec, self.zdict)
+            if self._cache_max_size:
+                self._cache_put(entry_offset, obj)
+
+        if typecode in (PYZ_ITEM_MODULE, PYZ_ITEM_PKG, PYZ_ITEM_NSPKG) and not raw:
+            obj = self.unmarshal_entry_data(name, obj)
+
+        return obj
+
+    def _cache_get(self, offset):
+        with self._cache_lock:
+            data = self._cache.pop(offset, None)
+            if data is None:
+                self.cache_misses += 1
+                return None
+            self._cache[offset] = data  # Move to the end (most recently used).
+            self.cache_hits += 1
+            return data
+
+    def _cache_put(self, offset, data):
+        with self._cache_lock:
+            if offset not in self._cache_seen:
+                self._cache_seen.add(offset)
+                return
+            if len(data) > self._cache_max_size:
+                return
+            previous_data = self._cache.pop(offset, None)
+            if previous_data is not None:
+                self._cache_size -= len(previous_data)
+            self._cache[offset] = data
+            self._cache_size += len(data)
+            # Evict the least recently used entries.
+            while self._cache_size > self._cache_max_size:
+                self._cache_size -= len(self._cache.pop(next(iter(self._cache))))
+
+    def cache_info(self):
+        """
+        Return the statistics of the cache of decompressed entries, as a dictionary with `hits`, `misses`, `entries`,
+        `size` and `max_size` items.
+        """
+        with self._cache_lock:
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'entries': len(self._cache),
+                'size': self._cache_size,
+                'max_size': self._cache_max_size,
+            }
+
+    def start_prefetch(self):
+        """
+        Start reading and decompressing the entries listed in the prefetch table in a background thread. No-op if the
+        archive has no prefetch table, or if prefetching has already been started.
+        """
+        if not self._prefetch_table:
+            return
+        prefetch_table = self._prefetch_table
+        self._prefetch_table = []  # Prefetching is done only once.
+
+        # The entries are stored contiguously, in the order of the table.
+        self._prefetch_region = (prefetch_table[0][0], prefetch_table[-1][0] + prefetch_table[-1][1])
+        self._prefetch_pending = len(prefetch_table)
+        self._prefetched = {}
+        self._prefetch_lock.acquire()
+        try:
+            _thread.start_new_thread(self._prefetch, (prefetch_table, self._prefetched))
+        except BaseException:
+            self._prefetch_lock.release()
+            self._prefetched = None
+
+    def wait_prefetch(self, timeout=-1):
+        """
+        Wait for the prefetch thread to finish, for at most `timeout` seconds (indefinitely if negative). Returns False
+        if the thread is still running after the timeout, and True otherwise.
+        """
+        if not self._prefetch_lock.acquire(True, timeout):
+            return False
+        self._prefetch_lock.release()
+        return True
+
+    def _prefetch(self, prefetch_table, prefetched):
+        region_start, region_end = self._prefetch_region
+        try:
+            if self._mmap is not None:
+                region = self._mmap[self._start_offset + region_start:self._start_offset + region_end]
+            else:
+                region = memoryview(self._read_entry_data(region_start, region_end - region_start))
+
+            # Decompression releases the GIL, so it overlaps with the execution of the modules in the main thread.
+            # Entries that have already been extracted by the main thread are skipped; the check is repeated after
+            # decompression, to narrow the window of the race, in which the data of an entry is stored after it has
+            # been extracted. Such data is released when prefetching is ended (see `_pop_prefetched`), at which
+            # point the thread also stops.
+            for offset, length, codec in prefetch_table:
+                if self._prefetched is not prefetched:
+                    break
+                if offset in self._prefetch_skipped:
+                    continue
+                data = decompress(region[offset - region_start:offset - region_start + length], codec, self.zdict)
+                if offset in self._prefetch_skipped:
+                    continue
+                prefetched[offset] = data
+        except BaseException:
+            # Prefetching is an optimization; in case of errors (including SystemExit raised by `_read_entry_data`),
+            # the entries are extracted on demand.
+            pass
+        finally:
+            self._prefetch_lock.release()
+
+    def _pop_prefetched(self, offset):
+        """
+        Retrieve (and remove) the prefetched data of the entry at the given offset. Returns None if the entry has not
+        been prefetched (yet).
+        """
+        prefetched = self._prefetched
+        if prefetched is None:  # Ended by another thread in the meantime.
+            return None
+        obj = prefetched.pop(offset, None)
+        if obj is None:
+            self._prefetch_skipped.add(offset)
 
-        # Read data blob
+        region_start, region_end = self._prefetch_region
+        if region_start <= offset < region_end:
+            self._prefetch_pending -= 1
+            end_prefetch = self._prefetch_pending <= 0
+        else:
+            # The entry was not imported during the training run. Once the prefetch thread has finished, this
+            # indicates that the start-up is over.
+            end_prefetch = not self._prefetch_lock.locked()
+
+        if end_prefetch:
+            # Release the data of entries that have not been extracted; this also stops the prefetch thread.
+            self._prefetched = None
+            self._prefetch_skipped = set()
+
+        return obj
+
+    def get_entry_data(self, entry):
+        """
+        Read the (compressed) data blob of the given TOC entry. Returns a tuple of typecode, codec, and data.
+        """
+        typecode, entry_offset, entry_length, *codec = entry
+        codec = codec[0] if codec else CODEC_ZLIB
+
+        if self._mmap is not None:
+            # Zero-copy slice of the mapping. On POSIX systems, the mapping remains valid even if the executable is
+            # moved (renamed) or deleted while the application is running.
+            entry_offset += self._start_offset
+            return typecode, codec, self._mmap[entry_offset:entry_offset + entry_length]
+
+        return typecode, codec, self._read_entry_data(entry_offset, entry_length)
+
+    @staticmethod
+    def unmarshal_entry_data(name, data):
+        """
+        Load the code object from the (decompressed) data of the entry with the given name.
+        """
+        try:
+            return marshal.loads(data)
+        except EOFError as e:
+            raise ImportError(f"Failed to unmarshal PYZ entry {name!r}!") from e
+
+    def _read_entry_data(self, entry_offset, entry_length):
+        """
+        Read the data of an entry from the archive file.
+        """
         try:
             with open(self._filename, "rb") as fp:
                 fp.seek(self._start_offset + entry_offset)
-                obj = fp.read(entry_length)
+                return fp.read(entry_length)
         except FileNotFoundError:
             # We open the archive file each time we need to read from it, to avoid locking the file by keeping it open.
             # This allows executable to be deleted or moved (renamed) while it is running, which is useful in certain
@@ -124,12 +517,3 @@ def extract(self, name, raw=False):
                 f"{self._filename} appears to have been moved or deleted since this application was launched. "
                 "Continouation from this state is impossible. Exiting now."
             )
-
-        try:
-            obj = zlib.decompress(obj)
-            if typecode in (PYZ_ITEM_MODULE, PYZ_ITEM_PKG, PYZ_ITEM_NSPKG) and not raw:
-                obj = marshal.loads(obj)
-        except EOFError as e:
-            raise ImportError(f"Failed to unmarshal PYZ entry {name!r}!") from e
-
-        return obj
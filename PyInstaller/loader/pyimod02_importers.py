@@ -22,6 +22,7 @@
 import io
 
 import _frozen_importlib
+import _frozen_importlib_external
 import _thread
 
 import pyimod01_archive
@@ -54,6 +55,19 @@ def _decode_source(source_bytes):
 # Global instance of PYZ archive reader. Initialized by install().
 pyz_archive = None
 
+# Default limit for the total size of decompressed PYZ entries that are kept in the reader's cache, in KiB; can be
+# overridden via the PYINSTALLER_PYZ_CACHE_SIZE environment variable. The value of 0 (or a negative value) disables the
+# cache.
+DEFAULT_PYZ_CACHE_SIZE = 4096
+
+
+def _get_pyz_cache_size():
+    try:
+        return max(0, int(os.environ.get('PYINSTALLER_PYZ_CACHE_SIZE', DEFAULT_PYZ_CACHE_SIZE))) * 1024
+    except ValueError:
+        return DEFAULT_PYZ_CACHE_SIZE * 1024
+
+
 # Some runtime hooks might need to traverse available frozen package/module hierarchy to simulate filesystem.
 # Such traversals can be efficiently implemented using a prefix tree (trie), whose computation we defer until first
 # access.
@@ -70,6 +84,14 @@ def get_pyz_toc_tree():
         return _pyz_tree
 
 
+# Finder instances, keyed by importer class and path; the path hook returns the existing instance for the path.
+_finder_instances = {}
+
+# Index of PYZ entry prefixes that correspond to known search paths: `sys._MEIPASS` and the paths of packages found in
+# the PYZ archive (which are constructed by `PyiFrozenImporter.find_spec`). For these paths, the finder does not need to
+# resolve the path on filesystem in order to compute its prefix.
+_pyz_prefix_index = {}
+
 # Fully resolve sys._MEIPASS, so we can compare fully-resolved paths to it.
 _RESOLVED_TOP_LEVEL_DIRECTORY = os.path.realpath(sys._MEIPASS)
 
@@ -117,13 +139,17 @@ def __repr__(self):
 
     @classmethod
     def path_hook(cls, path):
-        trace(f"PyInstaller: running path finder hook for path: {path!r}")
+        trace("PyInstaller: running path finder hook for path: %r", path)
+        finder = _finder_instances.get((cls, path))
+        if finder is not None:
+            trace("PyInstaller: hook succeeded (cached finder)")
+            return finder
         try:
-            finder = cls(path)
+            finder = _finder_instances[(cls, path)] = cls(path)
             trace("PyInstaller: hook succeeded")
             return finder
         except Exception as e:
-            trace(f"PyInstaller: hook failed: {e}")
+            trace("PyInstaller: hook failed: %s", e)
             raise
 
     @staticmethod
@@ -142,6 +168,19 @@ def __init__(self, path):
         self._path = path  # Store original path, as given.
         self._pyz_archive = pyz_archive
 
+        # Names of modules that are known to be missing from the PYZ archive (which never changes).
+        self._pyz_misses = set()
+
+        # Names (without suffixes, lower-cased) of entries in the directory, and directory's modification time; see
+        # `_may_exist_on_disk`.
+        self._dir_entries = None
+        self._dir_mtime = None
+
+        pyz_entry_prefix = _pyz_prefix_index.get(path)
+        if pyz_entry_prefix is not None:
+            self._pyz_entry_prefix = pyz_entry_prefix
+            return
+
         # Resolve path for comparison
         resolved_path = os.path.realpath(path)
 
@@ -228,6 +267,32 @@ def _find_fallback_spec(self, fullname, target):
 
         return self._fallback_finder.find_spec(fullname, target)
 
+    def _may_exist_on_disk(self, fullname):
+        """
+        Check whether the fallback finder might find the module on filesystem; i.e., whether the directory contains an
+        entry whose name, without suffixes, matches the last component of the module name (ignoring case). This is a
+        conservative approximation of the directory cache of python's FileFinder, which is much cheaper than querying
+        the FileFinder (which tries each of the module suffixes in turn); for other fallback finders, always returns
+        True.
+        """
+        if not isinstance(self._fallback_finder, _frozen_importlib_external.FileFinder):
+            return True
+
+        # Re-read the directory if it was modified, the same way as FileFinder does.
+        try:
+            mtime = os.stat(self._path).st_mtime
+        except OSError:
+            return True
+        if mtime != self._dir_mtime:
+            try:
+                names = os.listdir(self._path)
+            except OSError:
+                return True
+            self._dir_entries = {name.partition('.')[0].lower() for name in names}
+            self._dir_mtime = mtime
+
+        return fullname.rpartition('.')[2].lower() in self._dir_entries
+
     #-- Core PEP451 finder functionality, modeled after importlib.abc.PathEntryFinder
     # https://docs.python.org/3/library/importlib.html#importlib.abc.PathEntryFinder
     def invalidate_caches(self):
@@ -237,9 +302,11 @@ def invalidate_caches(self):
 
         https://docs.python.org/3/library/importlib.html#importlib.abc.MetaPathFinder.invalidate_caches
         """
-        # We do not use any caches, but if we have created a fallback finder, propagate the function call.
+        # Our cache of directory contents needs to be invalidated (the cache of PYZ misses remains valid, as the PYZ
+        # archive never changes). If we have created a fallback finder, propagate the function call.
         # NOTE: use getattr() with _fallback_finder attribute, in order to avoid unnecessary creation of the
         # fallback finder in case when it does not exist yet.
+        self._dir_mtime = None
         fallback_finder = getattr(self, '_fallback_finder', None)
         if fallback_finder is not None:
             if hasattr(fallback_finder, 'invalidate_caches'):
@@ -253,42 +320,54 @@ def find_spec(self, fullname, target=None):
 
         https://docs.python.org/3/library/importlib.html#importlib.abc.PathEntryFinder.find_spec
         """
-        trace(f"{self}: find_spec: called with fullname={fullname!r}, target={fullname!r}")
-
-        # Convert fullname to PYZ entry name.
-        pyz_entry_name = self._compute_pyz_entry_name(fullname)
+        # NOTE: the trace messages are formatted lazily, as this method is called for each search path entry on every
+        # import, including failed lookups of optional dependencies.
+        trace("%s: find_spec: called with fullname=%r, target=%r", self, fullname, target)
+
+        # Try looking up the entry in the PYZ archive, unless the module is already known to be missing from it.
+        entry_data = None
+        if fullname not in self._pyz_misses:
+            # Convert fullname to PYZ entry name.
+            pyz_entry_name = self._compute_pyz_entry_name(fullname)
+            entry_data = self._pyz_archive.toc.get(pyz_entry_name)
+            if entry_data is None:
+                self._pyz_misses.add(fullname)
 
-        # Try looking up the entry in the PYZ archive
-        entry_data = self._pyz_archive.toc.get(pyz_entry_name)
         if entry_data is None:
             # Entry not found - try using fallback finder (for example, python's own FileFinder) to resolve on-disk
             # resources, such as extension modules and modules that are collected only as source .py files.
-            trace(f"{self}: find_spec: {fullname!r} not found in PYZ...")
+            trace("%s: find_spec: %r not found in PYZ...", self, fullname)
 
-            if self.fallback_finder is not None:
-                trace(f"{self}: find_spec: attempting resolve using fallback finder {self.fallback_finder!r}.")
-                fallback_spec = self.fallback_finder.find_spec(fullname, target)
-                trace(f"{self}: find_spec: fallback finder returned spec: {fallback_spec!r}.")
-                return fallback_spec
-            else:
-                trace(f"{self}: find_spec: fallback finder is not available.")
+            fallback_finder = self.fallback_finder
+            if fallback_finder is None:
+                trace("%s: find_spec: fallback finder is not available.", self)
+                return None
 
-            return None
+            if not self._may_exist_on_disk(fullname):
+                trace(
+                    "%s: find_spec: %r not found in directory of fallback finder %r.", self, fullname, fallback_finder
+                )
+                return None
+
+            trace("%s: find_spec: attempting resolve using fallback finder %r.", self, fallback_finder)
+            fallback_spec = fallback_finder.find_spec(fullname, target)
+            trace("%s: find_spec: fallback finder returned spec: %r.", self, fallback_spec)
+            return fallback_spec
 
         # Entry found
         typecode = entry_data[0]
-        trace(f"{self}: find_spec: found {fullname!r} in PYZ as {pyz_entry_name!r}, typecode={typecode}")
+        trace("%s: find_spec: found %r in PYZ as %r, typecode=%d", self, fullname, pyz_entry_name, typecode)
 
         if typecode == pyimod01_archive.PYZ_ITEM_NSPKG:
             # PEP420 namespace package
             # We can use regular list for submodule_search_locations; the caller (i.e., python's PathFinder) takes care
             # of constructing _NamespacePath from it.
             spec = _frozen_importlib.ModuleSpec(fullname, None)
-            spec.submodule_search_locations = [
-                # NOTE: since we are using sys._MEIPASS as prefix, we need to construct path from resolved PYZ entry
-                # name (equivalently, we could combine `self._path` and last part of `fullname`).
-                os.path.join(sys._MEIPASS, pyz_entry_name.replace('.', os.path.sep)),
-            ]
+            # NOTE: since we are using sys._MEIPASS as prefix, we need to construct path from resolved PYZ entry name
+            # (equivalently, we could combine `self._path` and last part of `fullname`).
+            package_path = os.path.join(sys._MEIPASS, pyz_entry_name.replace('.', os.path.sep))
+            _pyz_prefix_index[package_path] = pyz_entry_name
+            spec.submodule_search_locations = [package_path]
             return spec
 
         # Resolve full filename, as if the module/package was located on filesystem.
@@ -311,7 +390,9 @@ def find_spec(self, fullname, target=None):
         # Set submodule_search_locations for packages. Seems to be required for importlib_resources from 3.2.0;
         # see issue #5395.
         if is_package:
-            spec.submodule_search_locations = [os.path.dirname(origin)]
+            package_path = os.path.dirname(origin)
+            _pyz_prefix_index[package_path] = pyz_entry_name
+            spec.submodule_search_locations = [package_path]
 
         return spec
 
@@ -370,6 +451,14 @@ def exec_module(self, module):
         https://docs.python.org/3/library/importlib.html#importlib.abc.Loader.exec_module
         """
         spec = module.__spec__
+
+        # Defer the execution of modules selected for lazy loading. Once the lazy module is loaded (or when it is being
+        # loaded), its `loader_state` is set, and the module is executed.
+        if _lazy_module_matcher is not None and spec.loader_state is None and _lazy_module_matcher(spec.name):
+            trace(f"{self}: exec_module: deferring execution of {spec.name!r}")
+            _PyiLazyModule.make_lazy(module)
+            return
+
         bytecode = self.get_code(spec.name)
         if bytecode is None:
             raise RuntimeError(f"Failed to retrieve bytecode for {spec.name!r}!")
@@ -599,6 +688,283 @@ def get_code(self, fullname):
         raise ImportError(f'{self} cannot handle module {fullname!r}')
 
 
+# Opt-in profiling of imports from the PYZ archive. Enabled by setting the PYINSTALLER_IMPORT_PROFILE environment
+# variable or the `pyi_import_profile` X option (for example, via `('X pyi_import_profile=imports.txt', None, 'OPTION')`
+# in the spec file) to the name of the report file. If the name ends with `.json`, the report is written in JSON format;
+# otherwise, it is written in the format of python's `-X importtime` output. If the name is `-` (or the X option is
+# given without value), the report is written to stderr. The environment variable is removed from `os.environ` once it
+# has been read, so that the child processes spawned by the application do not overwrite the report with their own.
+_IMPORT_PROFILE_ENV_VAR = 'PYINSTALLER_IMPORT_PROFILE'
+_IMPORT_PROFILE_XOPTION = 'pyi_import_profile'
+
+
+class _ImportProfiler:
+    """
+    Collector of per-module import timings. The records are kept in the order in which the imports completed (as in
+    `-X importtime` output); nested imports are tracked separately for each thread.
+    """
+    def __init__(self, filename):
+        from time import perf_counter  # built-in
+        self.filename = filename
+        self.clock = perf_counter
+        self.records = []
+        self._find_times = {}
+        self._stacks = {}
+
+    def add_find_time(self, name, duration):
+        self._find_times[name] = self._find_times.get(name, 0.0) + duration
+
+    def start(self, name):
+        stack = self._stacks.setdefault(_thread.get_ident(), [])
+        record = {
+            'name': name,
+            'depth': len(stack),
+            'find': self._find_times.pop(name, 0.0),
+            'read': 0.0,
+            'decompress': 0.0,
+            'unmarshal': 0.0,
+            'exec': 0.0,
+            'self': 0.0,
+            'cumulative': 0.0,
+            'bytes_read': 0,
+            'size': 0,
+        }
+        # The record, the start time, and the cumulative time of nested imports.
+        stack.append([record, self.clock(), 0.0])
+        return record
+
+    def current(self):
+        stack = self._stacks.get(_thread.get_ident())
+        return stack[-1][0] if stack else None
+
+    def finish(self):
+        end = self.clock()
+        stack = self._stacks[_thread.get_ident()]
+        record, start, nested = stack.pop()
+        # The time of `exec_module` includes the retrieval of code object and the nested imports; the time spent in
+        # `find_spec` is accounted for in the cumulative time, as in `-X importtime` output.
+        duration = end - start
+        record['exec'] = duration - record['read'] - record['decompress'] - record['unmarshal'] - nested
+        record['cumulative'] = record['find'] + duration
+        record['self'] = record['cumulative'] - nested
+        if stack:
+            stack[-1][2] += record['cumulative']
+        self.records.append(record)
+
+    def write_report(self):
+        filename = self.filename
+        try:
+            if filename == '-':
+                if sys.stderr is None:
+                    return
+                self._write_report(sys.stderr, False)
+            else:
+                with open(filename, 'w', encoding='utf-8') as fp:
+                    self._write_report(fp, filename.lower().endswith('.json'))
+        except Exception as e:
+            if sys.stderr is not None:
+                sys.stderr.write(f"PyInstaller: failed to write import profile to {filename!r}: {e}\n")
+
+    def _write_report(self, fp, as_json):
+        time_fields = ('find', 'read', 'decompress', 'unmarshal', 'exec', 'self', 'cumulative')
+
+        if not as_json:
+            fp.write("import time: self [us] | cumulative | imported package\n")
+            for record in self.records:
+                fp.write(
+                    "import time: %9d | %10d | %s%s\n" % (
+                        record['self'] * 1e6,
+                        record['cumulative'] * 1e6,
+                        '  ' * record['depth'],
+                        record['name'],
+                    )
+                )
+            return
+
+        # The `json` module is not guaranteed to be available in the frozen application, so write the JSON manually;
+        # the module names are plain python identifiers that do not require escaping.
+        fp.write('{"modules": [')
+        for idx, record in enumerate(self.records):
+            fields = [f'"name": "{record["name"]}"', f'"depth": {record["depth"]}']
+            fields += [f'"{field}_us": {int(record[field] * 1e6)}' for field in time_fields]
+            fields += [f'"bytes_read": {record["bytes_read"]}', f'"size": {record["size"]}']
+            fp.write(('\n  {' if idx == 0 else ',\n  {') + ', '.join(fields) + '}')
+        fp.write('\n]}\n')
+
+
+_import_profiler = None
+
+
+class _ProfilingPyiFrozenImporter(PyiFrozenImporter):
+    """
+    Variant of `PyiFrozenImporter` that records the import timings into the `_ImportProfiler`. Installed instead of
+    `PyiFrozenImporter` when import profiling is enabled, so that the regular importer does not incur any overhead.
+    """
+    def find_spec(self, fullname, target=None):
+        start = _import_profiler.clock()
+        spec = super().find_spec(fullname, target)
+        if spec is not None and spec.loader is self:
+            _import_profiler.add_find_time(fullname, _import_profiler.clock() - start)
+        return spec
+
+    def exec_module(self, module):
+        _import_profiler.start(module.__spec__.name)
+        try:
+            super().exec_module(module)
+        finally:
+            _import_profiler.finish()
+
+    def get_code(self, fullname):
+        record = _import_profiler.current()
+        if record is None or record['name'] != fullname:
+            # Not called from our `exec_module`.
+            return super().get_code(fullname)
+
+        pyz_entry_name = self._compute_pyz_entry_name(fullname)
+        entry_data = self._pyz_archive.toc.get(pyz_entry_name)
+        if entry_data is None:
+            raise ImportError(f'Module {fullname!r} not found in PYZ archive (entry {pyz_entry_name!r}).')
+
+        clock = _import_profiler.clock
+        time_start = clock()
+        typecode, codec, data = self._pyz_archive.get_entry_data(entry_data)
+        record['bytes_read'] += len(data)
+        time_read = clock()
+        data = pyimod01_archive.decompress(data, codec, self._pyz_archive.zdict)
+        record['size'] += len(data)
+        time_decompressed = clock()
+        code = self._pyz_archive.unmarshal_entry_data(pyz_entry_name, data)
+        time_unmarshalled = clock()
+
+        record['read'] += time_read - time_start
+        record['decompress'] += time_decompressed - time_read
+        record['unmarshal'] += time_unmarshalled - time_decompressed
+        return code
+
+
+# Lazy loading of modules from the PYZ archive (in the spirit of `importlib.util.LazyLoader` and PEP 690). Enabled by
+# the `pyi_lazy_imports` X option (for example, via the --lazy-import option), whose value is comma-separated list of
+# names of modules whose execution (including the extraction of their code from the PYZ archive) is deferred until
+# their attributes are first accessed. The names may contain `*` and `?` wildcards, and also cover the submodules.
+_LAZY_IMPORTS_XOPTION = 'pyi_lazy_imports'
+
+# Module attributes that the import machinery uses on modules in `sys.modules` (for example, when the module is imported
+# again, or when its submodule is imported); accessing them does not load the lazy module.
+_LAZY_MODULE_METADATA = frozenset({
+    '__spec__',
+    '__name__',
+    '__loader__',
+    '__package__',
+    '__path__',
+    '__file__',
+    '__class__',
+})
+
+_lazy_module_matcher = None
+
+
+class _PyiLazyModule(type(sys)):
+    """
+    Module whose execution was deferred by `PyiFrozenImporter.exec_module`; the module is executed on the first access
+    to (or deletion of) its attribute, and its class is reverted to the original module class.
+    """
+    @classmethod
+    def make_lazy(cls, module):
+        spec = module.__spec__
+        # Set `__path__` of packages, so that their submodules can be imported without loading the package.
+        if spec.submodule_search_locations is not None:
+            module.__path__ = spec.submodule_search_locations
+        spec.loader_state = {
+            '__dict__': module.__dict__.copy(),
+            '__class__': module.__class__,
+            'lock': _thread.RLock(),
+            'is_loading': False,
+        }
+        module.__class__ = cls
+
+    def _load(self):
+        spec = object.__getattribute__(self, '__spec__')
+        state = spec.loader_state
+        with state['lock']:
+            # Already loaded by another thread, or being loaded by this one (for example, the module's submodule is
+            # accessing its attributes during the module's execution).
+            if object.__getattribute__(self, '__class__') is not _PyiLazyModule or state['is_loading']:
+                return
+            state['is_loading'] = True
+
+            # Keep the attributes that were set while the module was lazy (for example, its imported submodules).
+            module_dict = object.__getattribute__(self, '__dict__')
+            attrs_before = state['__dict__']
+            attrs_updated = {
+                key: value
+                for key, value in module_dict.items() if key not in attrs_before or attrs_before[key] is not value
+            }
+
+            try:
+                spec.loader.exec_module(self)
+                module_dict.update(attrs_updated)
+            finally:
+                self.__class__ = state['__class__']
+
+    def __getattribute__(self, attr):
+        if attr in _LAZY_MODULE_METADATA:
+            return object.__getattribute__(self, attr)
+        _PyiLazyModule._load(self)
+        if object.__getattribute__(self, '__class__') is _PyiLazyModule:
+            # Being loaded by this thread.
+            return object.__getattribute__(self, attr)
+        return getattr(self, attr)
+
+    def __delattr__(self, attr):
+        _PyiLazyModule._load(self)
+        delattr(self, attr)
+
+
+def _setup_lazy_imports():
+    """
+    Enable lazy loading of modules selected via the X option.
+    """
+    global _lazy_module_matcher
+
+    value = getattr(sys, '_xoptions', {}).get(_LAZY_IMPORTS_XOPTION)
+    if not value or value is True:
+        return
+    patterns = [pattern.strip() for pattern in value.split(',') if pattern.strip()]
+    if not patterns:
+        return
+
+    import re  # collected into base_library.zip
+
+    regex = '|'.join(re.escape(pattern).replace(r'\*', '.*').replace(r'\?', '.') for pattern in patterns)
+    _lazy_module_matcher = re.compile(f'(?:{regex})(?:\\..*)?').fullmatch
+    trace(f"PyInstaller: lazy loading enabled for modules: {patterns!r}")
+
+
+def _setup_import_profiler():
+    """
+    Enable import profiling if requested via the environment variable or the X option. Returns the class of the
+    importer to install.
+    """
+    global _import_profiler
+
+    # Remove the environment variable, so that it is not inherited by child processes.
+    filename = os.environ.pop(_IMPORT_PROFILE_ENV_VAR, None)
+    if not filename:
+        filename = getattr(sys, '_xoptions', {}).get(_IMPORT_PROFILE_XOPTION)
+    if not filename:
+        return PyiFrozenImporter
+    if filename is True:
+        filename = '-'  # X option without value
+
+    import atexit  # built-in
+
+    _import_profiler = _ImportProfiler(filename)
+    atexit.register(_import_profiler.write_report)
+    trace(f"PyInstaller: import profiling enabled; report will be written to {filename!r}.")
+
+    return _ProfilingPyiFrozenImporter
+
+
 def install():
     """
     Install PyInstaller's frozen finders/loaders/importers into python's import machinery.
@@ -614,12 +980,26 @@ def install():
         raise RuntimeError("Bootloader did not set sys._pyinstaller_pyz!")
 
     try:
-        pyz_archive = pyimod01_archive.ZlibArchiveReader(sys._pyinstaller_pyz, check_pymagic=True)
+        pyz_archive = pyimod01_archive.ZlibArchiveReader(
+            sys._pyinstaller_pyz,
+            check_pymagic=True,
+            cache_size=_get_pyz_cache_size(),
+        )
     except Exception as e:
         raise RuntimeError("Failed to setup PYZ archive reader!") from e
 
     delattr(sys, '_pyinstaller_pyz')
 
+    _pyz_prefix_index[sys._MEIPASS] = ''
+
+    importer_class = _setup_import_profiler()
+    _setup_lazy_imports()
+
+    # Start prefetching the entries of modules that are imported during start-up, if the archive lists them. Skipped
+    # when profiling imports, as the profiling importer reads the entries itself, to time the individual stages.
+    if _import_profiler is None:
+        pyz_archive.start_prefetch()
+
     # On Windows, there is finder called `_frozen_importlib.WindowsRegistryFinder`, which looks for Python module
     # locations in Windows registry. The frozen application should not look for those, so remove this finder
     # from `sys.meta_path`.
@@ -632,11 +1012,11 @@ def install():
     for idx, entry in enumerate(sys.path_hooks):
         if getattr(entry, '__name__', None) == 'zipimporter':
             trace(f"PyInstaller: inserting our finder hook at index {idx + 1} in sys.path_hooks.")
-            sys.path_hooks.insert(idx + 1, PyiFrozenImporter.path_hook)
+            sys.path_hooks.insert(idx + 1, importer_class.path_hook)
             break
     else:
         trace("PyInstaller: zipimporter hook not found in sys.path_hooks! Prepending our finder hook to the list.")
-        sys.path_hooks.insert(0, PyiFrozenImporter.path_hook)
+        sys.path_hooks.insert(0, importer_class.path_hook)
 
     # Python might have already created a `FileFinder` for `sys._MEIPASS`. Remove the entry from path importer cache,
     # so that next loading attempt creates `PyiFrozenImporter` instead. This could probably be avoided altogether if
@@ -18,6 +18,7 @@
 
 import PyInstaller.log
 from PyInstaller.archive.readers import CArchiveReader, ZlibArchiveReader
+from PyInstaller.loader.pyimod01_archive import CODEC_ZLIB
 
 try:
     from argcomplete import autocomplete
@@ -198,18 +199,19 @@ def _show_archive_contents(self, archive_name, archive):
                 for name in archive.toc.keys():
                     print(f" {name}")
             else:
-                print(" position, length, uncompressed_length, is_compressed, typecode, name")
-                for name, (position, length, uncompressed_length, is_compressed, typecode) in archive.toc.items():
-                    print(f" {position}, {length}, {uncompressed_length}, {is_compressed}, {typecode!r}, {name!r}")
+                print(" position, length, uncompressed_length, codec, typecode, name")
+                for name, (position, length, uncompressed_length, codec, typecode) in archive.toc.items():
+                    print(f" {position}, {length}, {uncompressed_length}, {codec}, {typecode!r}, {name!r}")
         elif isinstance(archive, ZlibArchiveReader):
             print(f"Contents of {archive_name!r} (PYZ):")
             if self.brief_mode:
                 for name in archive.toc.keys():
                     print(f" {name}")
             else:
-                print(" typecode, position, length, name")
-                for name, (typecode, position, length) in archive.toc.items():
-                    print(f" {typecode}, {position}, {length}, {name!r}")
+                print(" typecode, position, length, codec, name")
+                for name, (typecode, position, length, *codec) in archive.toc.items():
+                    codec = codec[0] if codec else CODEC_ZLIB
+                    print(f" {typecode}, {position}, {length}, {codec}, {name!r}")
         else:
             print(f"Contents of {name} (unknown)")
             print(f"FIXME: implement content listing for archive type {type(archive)}!")
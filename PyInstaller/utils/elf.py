@@ -0,0 +1,274 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2024, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+"""
+Utils for reading ELF binaries (Linux and other POSIX-like platforms).
+
+Only the parts of the format that are required for binary dependency analysis are supported: validation of the file
+header, and the entries of the dynamic section that list the linked shared libraries (DT_NEEDED), library search paths
+(DT_RPATH and DT_RUNPATH), and the library's own name (DT_SONAME).
+"""
+
+import mmap
+import os
+import struct
+
+ELF_MAGIC = b'\x7fELF'
+
+# e_ident[EI_CLASS]
+ELFCLASS32 = 1
+ELFCLASS64 = 2
+
+# e_ident[EI_DATA]
+ELFDATA2LSB = 1
+ELFDATA2MSB = 2
+
+# e_type
+ET_REL = 1
+ET_EXEC = 2
+ET_DYN = 3
+ET_CORE = 4
+
+# p_type
+PT_LOAD = 1
+PT_DYNAMIC = 2
+PT_INTERP = 3
+
+# d_tag
+DT_NULL = 0
+DT_NEEDED = 1
+DT_STRTAB = 5
+DT_STRSZ = 10
+DT_SONAME = 14
+DT_RPATH = 15
+DT_RUNPATH = 29
+DT_FLAGS_1 = 0x6ffffffb
+
+# DT_FLAGS_1 flags
+DF_1_NODEFLIB = 0x00000800
+
+# Special value of e_phnum, indicating that the actual number is stored in sh_info field of the first section header.
+PN_XNUM = 0xffff
+
+# Struct formats (without byte-order prefix) and sizes of the file header (without e_ident), program header, section
+# header, and dynamic section entry, for 32-bit and 64-bit ELF files.
+_FORMATS = {
+    ELFCLASS32: ('HHIIIIIHHHHHH', 'IIIIIIII', 'IIIIIIIIII', 'II'),
+    ELFCLASS64: ('HHIQQQIHHHHHH', 'IIQQQQQQ', 'IIQQQQIIQQ', 'QQ'),
+}
+
+_EI_NIDENT = 16
+
+
+class InvalidBinaryError(Exception):
+    """
+    Exception raised by `ELFFile` when it is passed a file that is not a valid ELF binary.
+    """
+    pass
+
+
+class ELFFile:
+    """
+    Information about an ELF binary, obtained by reading its file header, program headers, and dynamic section.
+
+    The constructor raises `InvalidBinaryError` if the given file is not a valid ELF binary, and `OSError` if it cannot
+    be read.
+
+    Attributes:
+        elf_class:
+            `ELFCLASS32` or `ELFCLASS64`.
+        byte_order:
+            `ELFDATA2LSB` or `ELFDATA2MSB`.
+        machine:
+            Target architecture (`e_machine`).
+        type:
+            Object file type (`e_type`); for example, `ET_EXEC` or `ET_DYN`.
+        interpreter:
+            Path to the program interpreter (dynamic linker), or `None`.
+        is_dynamic:
+            Whether the binary has a dynamic section.
+        needed:
+            List of the names of linked shared libraries (DT_NEEDED), in order of their appearance.
+        rpath:
+            Library search path (DT_RPATH) string, or `None`.
+        runpath:
+            Library search path (DT_RUNPATH) string, or `None`.
+        soname:
+            Shared library name (DT_SONAME), or `None`.
+        flags_1:
+            Value of DT_FLAGS_1 entry (0 if not present).
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.interpreter = None
+        self.is_dynamic = False
+        self.needed = []
+        self.rpath = None
+        self.runpath = None
+        self.soname = None
+        self.flags_1 = 0
+
+        with open(filename, 'rb') as fp:
+            try:
+                data = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty file.
+                raise InvalidBinaryError("Not an ELF file!")
+            with data:
+                self._parse(data)
+
+    def _parse(self, data):
+        size = len(data)
+        if size < _EI_NIDENT or data[:4] != ELF_MAGIC:
+            raise InvalidBinaryError("Not an ELF file!")
+
+        self.elf_class = data[4]
+        self.byte_order = data[5]
+        if self.elf_class not in _FORMATS or self.byte_order not in (ELFDATA2LSB, ELFDATA2MSB) or data[6] != 1:
+            raise InvalidBinaryError("Invalid ELF identification!")
+
+        prefix = '<' if self.byte_order == ELFDATA2LSB else '>'
+        ehdr_fmt, phdr_fmt, shdr_fmt, dyn_fmt = (struct.Struct(prefix + fmt) for fmt in _FORMATS[self.elf_class])
+
+        if size < _EI_NIDENT + ehdr_fmt.size:
+            raise InvalidBinaryError("Truncated ELF header!")
+        ehdr = ehdr_fmt.unpack_from(data, _EI_NIDENT)
+        self.type, self.machine, version = ehdr[0:3]
+        phoff, shoff = ehdr[4:6]
+        phentsize, phnum, shentsize, shnum = ehdr[8:12]
+        if version != 1:
+            raise InvalidBinaryError("Invalid ELF version!")
+
+        # Validate section header table.
+        if shoff:
+            if shentsize != shdr_fmt.size:
+                raise InvalidBinaryError("Invalid ELF section header size!")
+            if shnum == 0 and shoff + shdr_fmt.size <= size:
+                # Actual number of sections is stored in sh_size field of the first section header.
+                shnum = shdr_fmt.unpack_from(data, shoff)[5]
+            if shoff + shnum * shentsize > size:
+                raise InvalidBinaryError("Truncated ELF section header table!")
+
+        # Validate and read program header table.
+        if not phoff:
+            return
+        if phentsize != phdr_fmt.size:
+            raise InvalidBinaryError("Invalid ELF program header size!")
+        if phnum == PN_XNUM:
+            if not shoff or shoff + shdr_fmt.size > size:
+                raise InvalidBinaryError("Invalid ELF program header count!")
+            phnum = shdr_fmt.unpack_from(data, shoff)[7]
+        if phoff + phnum * phentsize > size:
+            raise InvalidBinaryError("Truncated ELF program header table!")
+
+        loads = []
+        dynamic = None
+        for idx in range(phnum):
+            phdr = phdr_fmt.unpack_from(data, phoff + idx * phentsize)
+            if self.elf_class == ELFCLASS32:
+                p_type, p_offset, p_vaddr, _, p_filesz, _, _, _ = phdr
+            else:
+                p_type, _, p_offset, p_vaddr, _, p_filesz, _, _ = phdr
+            if p_type == PT_LOAD:
+                loads.append((p_vaddr, p_offset, p_filesz))
+            elif p_type == PT_DYNAMIC:
+                dynamic = (p_offset, p_filesz)
+            elif p_type == PT_INTERP:
+                self.interpreter = os.fsdecode(_read_string(data, p_offset, p_offset + p_filesz))
+
+        if dynamic is None:
+            return
+        self.is_dynamic = True
+
+        # Read dynamic section entries.
+        entries = []
+        strtab = None
+        strsz = None
+        offset, end = dynamic
+        end = min(end + offset, size)
+        while offset + dyn_fmt.size <= end:
+            tag, value = dyn_fmt.unpack_from(data, offset)
+            offset += dyn_fmt.size
+            if tag == DT_NULL:
+                break
+            elif tag == DT_STRTAB:
+                strtab = value
+            elif tag == DT_STRSZ:
+                strsz = value
+            elif tag == DT_FLAGS_1:
+                self.flags_1 = value
+            elif tag in (DT_NEEDED, DT_SONAME, DT_RPATH, DT_RUNPATH):
+                entries.append((tag, value))
+
+        if not entries:
+            return
+        if strtab is None:
+            raise InvalidBinaryError("Missing ELF dynamic string table!")
+
+        # DT_STRTAB holds the virtual address of the string table; translate it into file offset.
+        for p_vaddr, p_offset, p_filesz in loads:
+            if p_vaddr <= strtab < p_vaddr + p_filesz:
+                strtab_offset = strtab - p_vaddr + p_offset
+                strtab_end = p_offset + p_filesz
+                break
+        else:
+            raise InvalidBinaryError("Invalid ELF dynamic string table address!")
+        if strsz is not None:
+            strtab_end = min(strtab_end, strtab_offset + strsz)
+        strtab_end = min(strtab_end, size)
+
+        for tag, value in entries:
+            string = os.fsdecode(_read_string(data, strtab_offset + value, strtab_end))
+            if tag == DT_NEEDED:
+                self.needed.append(string)
+            elif tag == DT_SONAME:
+                self.soname = string
+            elif tag == DT_RPATH:
+                self.rpath = string
+            else:
+                self.runpath = string
+
+        # If both DT_RPATH and DT_RUNPATH are present, the dynamic linker ignores the former.
+        if self.runpath is not None:
+            self.rpath = None
+
+    def is_compatible(self, other):
+        """
+        Check whether this binary could be loaded together with the other binary (`ELFFile`), i.e., whether they have
+        the same class, byte order, and target architecture.
+        """
+        return (
+            self.elf_class == other.elf_class and self.byte_order == other.byte_order and self.machine == other.machine
+        )
+
+
+def _read_string(data, start, end):
+    """
+    Read NUL-terminated string from the given buffer, starting at given offset and ending at given offset or at the
+    first NUL character, whichever comes first.
+    """
+    if start >= end:
+        raise InvalidBinaryError("Invalid ELF string offset!")
+    stop = data.find(b'\0', start, end)
+    if stop == -1:
+        stop = end
+    return data[start:stop]
+
+
+def is_elf_binary(filename):
+    """
+    Check whether the given file is a valid ELF binary. Returns `False` for files that are not ELF binaries, and raises
+    `OSError` if the file cannot be read.
+    """
+    try:
+        ELFFile(filename)
+    except InvalidBinaryError:
+        return False
+    return True
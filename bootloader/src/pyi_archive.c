@@ -236,10 +236,20 @@ pyi_archive_extract(const struct ARCHIVE *archive, const struct TOC_ENTRY *toc_e
     }
 
     /* Extract */
-    if (toc_entry->compression_flag == 1) {
-        rc = _pyi_archive_extract_compressed(archive_fp, toc_entry, NULL, data);
-    } else {
-        rc = _pyi_archive_extract_uncompressed(archive_fp, toc_entry, data);
+    switch (toc_entry->codec) {
+        case ARCHIVE_CODEC_ZLIB: {
+            rc = _pyi_archive_extract_compressed(archive_fp, toc_entry, NULL, data);
+            break;
+        }
+        case ARCHIVE_CODEC_STORED: {
+            rc = _pyi_archive_extract_uncompressed(archive_fp, toc_entry, data);
+            break;
+        }
+        default: {
+            PYI_ERROR("Failed to extract %s: unsupported compression codec %d!\n", toc_entry->name, toc_entry->codec);
+            rc = -1;
+            break;
+        }
     }
     if (rc != 0) {
         free(data);
@@ -317,10 +327,20 @@ pyi_archive_extract2fs(const struct ARCHIVE *archive, const struct TOC_ENTRY *to
     }
 
     /* Extract */
-    if (toc_entry->compression_flag == 1) {
-        rc = _pyi_archive_extract_compressed(archive_fp, toc_entry, out_fp, NULL);
-    } else {
-        rc = _pyi_archive_extract2fs_uncompressed(archive_fp, toc_entry, out_fp);
+    switch (toc_entry->codec) {
+        case ARCHIVE_CODEC_ZLIB: {
+            rc = _pyi_archive_extract_compressed(archive_fp, toc_entry, out_fp, NULL);
+            break;
+        }
+        case ARCHIVE_CODEC_STORED: {
+            rc = _pyi_archive_extract2fs_uncompressed(archive_fp, toc_entry, out_fp);
+            break;
+        }
+        default: {
+            PYI_ERROR("Failed to extract %s: unsupported compression codec %d!\n", toc_entry->name, toc_entry->codec);
+            rc = -1;
+            break;
+        }
     }
 #ifndef WIN32
     if (toc_entry->typecode == ARCHIVE_ITEM_BINARY) {
@@ -385,6 +405,64 @@ _pyi_archive_is_extractable(char typecode)
     return false;
 }
 
+/*
+ * Read the TOC hash index from the archive, and validate it. The index
+ * is optional (older archives do not contain it), so if it is missing
+ * or malformed, it is ignored, and lookups fall back to linear scan
+ * of the TOC.
+ */
+static void
+_pyi_archive_read_toc_index(struct ARCHIVE *archive, FILE *archive_fp, const struct TOC_ENTRY *index_entry)
+{
+    uint32_t *toc_index = NULL;
+    uint32_t toc_length = (uint32_t)((const char *)archive->toc_end - (const char *)archive->toc);
+    uint32_t num_slots;
+    uint32_t i;
+
+    if (index_entry->codec != ARCHIVE_CODEC_STORED || index_entry->length < 2 * sizeof(uint32_t) || index_entry->length % sizeof(uint32_t) != 0) {
+        PYI_DEBUG("LOADER: ignoring unsupported TOC index.\n");
+        return;
+    }
+
+    toc_index = (uint32_t *)malloc(index_entry->length);
+    if (toc_index == NULL) {
+        return;
+    }
+    if (pyi_fseek(archive_fp, archive->pkg_offset + index_entry->offset, SEEK_SET) < 0 ||
+        fread(toc_index, index_entry->length, 1, archive_fp) < 1) {
+        PYI_DEBUG("LOADER: failed to read TOC index.\n");
+        goto invalid;
+    }
+
+    /* The first element is number of slots, which must be a power of
+     * two, and match the length of the index data. */
+    num_slots = pyi_be32toh(toc_index[0]);
+    if (num_slots == 0 || (num_slots & (num_slots - 1)) != 0 || num_slots != index_entry->length / sizeof(uint32_t) - 1) {
+        PYI_DEBUG("LOADER: invalid TOC index size!\n");
+        goto invalid;
+    }
+
+    /* Fix the endianness of slots, and ensure that they point to the
+     * (16-byte aligned) TOC entries within the TOC buffer. */
+    for (i = 1; i <= num_slots; i++) {
+        toc_index[i] = pyi_be32toh(toc_index[i]);
+        if (toc_index[i] != ARCHIVE_TOC_INDEX_EMPTY_SLOT && (toc_index[i] % 16 != 0 || toc_index[i] >= toc_length)) {
+            PYI_DEBUG("LOADER: invalid TOC index slot!\n");
+            goto invalid;
+        }
+    }
+
+    /* Keep only the slots; the element before them is not needed anymore. */
+    memmove(toc_index, toc_index + 1, num_slots * sizeof(uint32_t));
+    archive->toc_index = toc_index;
+    archive->toc_index_size = num_slots;
+    PYI_DEBUG("LOADER: using TOC index with %u slots.\n", num_slots);
+    return;
+
+invalid:
+    free(toc_index);
+}
+
 /*
  * Open the archive.
  */
@@ -396,6 +474,7 @@ pyi_archive_open(const char *filename)
     struct ARCHIVE_COOKIE archive_cookie;
     struct ARCHIVE *archive = NULL;
     struct TOC_ENTRY *toc_entry;
+    const struct TOC_ENTRY *toc_index_entry = NULL;
 
     PYI_DEBUG("LOADER: attempting to open archive %s\n", filename);
 
@@ -488,11 +567,21 @@ pyi_archive_open(const char *filename)
             archive->toc_splash = toc_entry;
         }
 
+        /* Check if this is TOC index entry */
+        if (toc_entry->typecode == ARCHIVE_ITEM_TOC_INDEX) {
+            toc_index_entry = toc_entry;
+        }
+
         /* Jump to next entry; with the current entry fixed up, we can
          * use non-const equivalent of pyi_archive_next_toc_entry() */
         toc_entry = (struct TOC_ENTRY *)((const char *)toc_entry + toc_entry->entry_length);
     }
 
+    /* Read the TOC hash index, if available */
+    if (toc_index_entry) {
+        _pyi_archive_read_toc_index(archive, archive_fp, toc_index_entry);
+    }
+
 cleanup:
     fclose(archive_fp);
 
@@ -519,37 +608,87 @@ pyi_archive_free(struct ARCHIVE **archive_ref)
     /* Free the TOC buffer */
     free(archive->toc);
 
+    /* Free the TOC hash index */
+    free(archive->toc_index);
+
     /* Free the structure itself */
     free(archive);
 }
 
 
 /*
- * Find a TOC entry by its name and return it.
+ * Compute the hash of the entry name for the TOC hash index: 32-bit
+ * FNV-1a hash with ASCII letters converted to lower case. Must be kept
+ * in sync with toc_index_hash() in PyInstaller/archive/writers.py.
+ */
+static uint32_t
+_pyi_archive_hash_name(const char *name)
+{
+    uint32_t hash = 0x811C9DC5;
+    const unsigned char *ptr;
+
+    for (ptr = (const unsigned char *)name; *ptr; ptr++) {
+        unsigned char c = *ptr;
+        if (c >= 'A' && c <= 'Z') {
+            c += 'a' - 'A';
+        }
+        hash = (hash ^ c) * 0x01000193;
+    }
+
+    return hash;
+}
+
+/*
+ * Check if the name of TOC entry matches the given name.
+ */
+static bool
+_pyi_archive_entry_name_matches(const struct TOC_ENTRY *toc_entry, const char *name)
+{
+#if defined(_WIN32) || defined(__APPLE__)
+    /* On Windows and macOS, use case-insensitive comparison to
+     * simulate case-insensitive filesystem for extractable entries. */
+    if (_pyi_archive_is_extractable(toc_entry->typecode)) {
+        return strcasecmp(toc_entry->name, name) == 0;
+    }
+#endif
+    return strcmp(toc_entry->name, name) == 0;
+}
+
+/*
+ * Find a TOC entry by its name and return it. If the archive contains
+ * the TOC hash index, it is used for the lookup; otherwise, the TOC is
+ * scanned.
  */
 const struct TOC_ENTRY *
 pyi_archive_find_entry_by_name(const struct ARCHIVE *archive, const char *name)
 {
     const struct TOC_ENTRY *toc_entry;
 
-    for (toc_entry = archive->toc; toc_entry < archive->toc_end; toc_entry = pyi_archive_next_toc_entry(archive, toc_entry)) {
-#if defined(_WIN32) || defined(__APPLE__)
-        /* On Windows and macOS, use case-insensitive comparison to
-         * simulate case-insensitive filesystem for extractable entries. */
-        if (_pyi_archive_is_extractable(toc_entry->typecode)) {
-            if (strcasecmp(toc_entry->name, name) == 0) {
-                return toc_entry;
+    if (archive->toc_index) {
+        uint32_t mask = archive->toc_index_size - 1;
+        uint32_t slot = _pyi_archive_hash_name(name) & mask;
+        uint32_t probes;
+
+        /* Entries with the same hash are stored in consecutive slots
+         * (wrapping around); the sequence ends with an empty slot. */
+        for (probes = 0; probes < archive->toc_index_size; probes++) {
+            uint32_t entry_offset = archive->toc_index[slot];
+            if (entry_offset == ARCHIVE_TOC_INDEX_EMPTY_SLOT) {
+                break;
             }
-        } else {
-            if (strcmp(toc_entry->name, name) == 0) {
+            toc_entry = (const struct TOC_ENTRY *)((const char *)archive->toc + entry_offset);
+            if (_pyi_archive_entry_name_matches(toc_entry, name)) {
                 return toc_entry;
             }
+            slot = (slot + 1) & mask;
         }
-#else
-        if (strcmp(toc_entry->name, name) == 0) {
+        return NULL;
+    }
+
+    for (toc_entry = archive->toc; toc_entry < archive->toc_end; toc_entry = pyi_archive_next_toc_entry(archive, toc_entry)) {
+        if (_pyi_archive_entry_name_matches(toc_entry, name)) {
             return toc_entry;
         }
-#endif
     }
 
     return NULL;
@@ -34,6 +34,16 @@
 #define ARCHIVE_ITEM_RUNTIME_OPTION   'o'  /* runtime option */
 #define ARCHIVE_ITEM_SPLASH           'l'  /* splash resources */
 #define ARCHIVE_ITEM_SYMLINK          'n'  /* symbolic link */
+#define ARCHIVE_ITEM_TOC_INDEX        'h'  /* hash index of the TOC */
+
+/* Compression codecs of CArchive items. Must be kept in sync with
+ * CODEC_* definitions in PyInstaller/loader/pyimod01_archive.py. */
+#define ARCHIVE_CODEC_STORED  0  /* no compression */
+#define ARCHIVE_CODEC_ZLIB    1  /* zlib */
+
+/* Value of empty slots in the TOC hash index. Must be kept in sync with
+ * _TOC_INDEX_EMPTY_SLOT in PyInstaller/archive/writers.py. */
+#define ARCHIVE_TOC_INDEX_EMPTY_SLOT  0xFFFFFFFF
 
 /* Entry in PKG/CArchive TOC */
 struct TOC_ENTRY
@@ -42,7 +52,7 @@ struct TOC_ENTRY
     uint32_t offset; /* position of entry's data blob, relative to the start of PKG archive */
     uint32_t length; /* length of compressed data blob */
     uint32_t uncompressed_length; /* length of uncompressed data blob */
-    unsigned char compression_flag; /* compression flag (1 = compressed, 0 = uncompressed) */
+    unsigned char codec; /* compression codec - see ARCHIVE_CODEC_* definitions */
     char typecode; /* type code - see ARCHIVE_ITEM_* definitions */
     char name[1];  /* entry name; padded to multiple of 16 */
 };
@@ -69,6 +79,13 @@ struct ARCHIVE
     struct TOC_ENTRY *toc; /* Buffer containing all TOC entries */
     const struct TOC_ENTRY *toc_end; /* The address at which the TOC buffer ends */
 
+    /* Optional hash index of the TOC, used to look up entries by name.
+     * Each of the toc_index_size slots (a power of two) contains the
+     * offset of a TOC entry relative to the start of TOC buffer, or
+     * ARCHIVE_TOC_INDEX_EMPTY_SLOT. NULL if archive has no index. */
+    uint32_t *toc_index;
+    uint32_t toc_index_size;
+
     /* Flag indicating that the archive contains extractable files,
      * and thus has onefile semantics */
     bool contains_extractable_entries;
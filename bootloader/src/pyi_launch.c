@@ -17,9 +17,8 @@
 
 #ifdef _WIN32
     #include <windows.h>
-#else
-    #include <stdlib.h>   /* malloc */
 #endif
+#include <stdlib.h>   /* malloc, free */
 #include <string.h>   /* memset */
 #include <stddef.h>   /* ptrdiff_t */
 
@@ -37,6 +36,60 @@
 #include "pyi_multipkg.h"
 
 
+/*
+ * Helpers for extraction of entries whose data is shared with other
+ * entries. The archive writer stores the data of entries with identical
+ * contents only once, and all such entries point to it. The data is
+ * extracted only for the first of such entries; for the subsequent
+ * ones, a hard link to the already-extracted file is created.
+ *
+ * The extracted entries are recorded in an array. As the data of
+ * entries is written in the order of entries, the entries that do not
+ * share data with preceding entries have increasing data offsets, and
+ * only those need to be recorded; the array is thus sorted by the data
+ * offset, and can be searched using binary search.
+ */
+static const struct TOC_ENTRY *
+_pyi_launch_find_extracted_entry(const struct TOC_ENTRY **extracted_entries, size_t num_extracted_entries, const struct TOC_ENTRY *toc_entry)
+{
+    size_t low = 0;
+    size_t high = num_extracted_entries;
+
+    while (low < high) {
+        size_t mid = low + (high - low) / 2;
+        const struct TOC_ENTRY *extracted_entry = extracted_entries[mid];
+        if (extracted_entry->offset < toc_entry->offset) {
+            low = mid + 1;
+        } else if (extracted_entry->offset > toc_entry->offset) {
+            high = mid;
+        } else {
+            /* Require same type (which determines the permissions of
+             * the extracted file) and same stored data. */
+            if (extracted_entry->typecode == toc_entry->typecode &&
+                extracted_entry->codec == toc_entry->codec &&
+                extracted_entry->length == toc_entry->length &&
+                extracted_entry->uncompressed_length == toc_entry->uncompressed_length) {
+                return extracted_entry;
+            }
+            return NULL;
+        }
+    }
+
+    return NULL;
+}
+
+static int
+_pyi_launch_link_extracted_entry(const struct PYI_CONTEXT *pyi_ctx, const struct TOC_ENTRY *extracted_entry, const char *output_filename)
+{
+    char extracted_filename[PYI_PATH_MAX];
+
+    if (snprintf(extracted_filename, PYI_PATH_MAX, "%s%c%s", pyi_ctx->application_home_dir, PYI_SEP, extracted_entry->name) >= PYI_PATH_MAX) {
+        return -1;
+    }
+
+    return pyi_path_mkhardlink(extracted_filename, output_filename);
+}
+
 /*
  * Extract all binaries (type 'b') and all data files (type 'x') to the filesystem
  * and checks for dependencies (type 'd'). If dependencies are found, extract them.
@@ -63,6 +116,17 @@ pyi_launch_extract_files_from_archive(struct PYI_CONTEXT *pyi_ctx)
 
     const char *entry_filename;
 
+    /* Entries that were extracted from this archive, sorted by data
+     * offset. Each TOC entry occupies at least 32 bytes. If allocation
+     * fails, the data of each entry is extracted separately. */
+    const struct TOC_ENTRY **extracted_entries;
+    const struct TOC_ENTRY *extracted_entry;
+    size_t num_extracted_entries = 0;
+
+    extracted_entries = (const struct TOC_ENTRY **)malloc(
+        (((const char *)archive->toc_end - (const char *)archive->toc) / 32 + 1) * sizeof(struct TOC_ENTRY *)
+    );
+
     /* Clear the archive pool array. */
     memset(multipkg_archive_pool, 0, sizeof(multipkg_archive_pool));
 
@@ -143,8 +207,23 @@ pyi_launch_extract_files_from_archive(struct PYI_CONTEXT *pyi_ctx)
                 multipkg_name,
                 output_filename
             );
-        } else {
+        } else if (toc_entry->typecode == ARCHIVE_ITEM_SYMLINK || extracted_entries == NULL) {
             retcode = pyi_archive_extract2fs(archive, toc_entry, output_filename);
+        } else {
+            /* If the data is shared with an already-extracted entry,
+             * create a hard link to its file; if that fails (e.g., the
+             * file system does not support hard links), extract the
+             * data again. */
+            extracted_entry = _pyi_launch_find_extracted_entry(extracted_entries, num_extracted_entries, toc_entry);
+            if (extracted_entry && _pyi_launch_link_extracted_entry(pyi_ctx, extracted_entry, output_filename) == 0) {
+                PYI_DEBUG("LOADER: linked %s to %s, which has identical contents.\n", toc_entry->name, extracted_entry->name);
+            } else {
+                retcode = pyi_archive_extract2fs(archive, toc_entry, output_filename);
+                if (retcode == 0 && toc_entry->length > 0 &&
+                    (num_extracted_entries == 0 || toc_entry->offset > extracted_entries[num_extracted_entries - 1]->offset)) {
+                    extracted_entries[num_extracted_entries++] = toc_entry;
+                }
+            }
         }
 
         /* If extraction failed, there is no need to continue. */
@@ -159,6 +238,8 @@ pyi_launch_extract_files_from_archive(struct PYI_CONTEXT *pyi_ctx)
         pyi_archive_free(&multipkg_archive_pool[index]);
     }
 
+    free(extracted_entries);
+
     return retcode;
 }
 
@@ -26,7 +26,7 @@
     #endif /* __GNUC__ */
 #else /* _WIN32 */
     #include <libgen.h>  /* basename(), dirnmae() */
-    #include <unistd.h>  /* unlink(), symlink() */
+    #include <unistd.h>  /* unlink(), symlink(), link() */
 #endif /* _WIN32 */
 
 #include <stdio.h>  /* FILE, fopen */
@@ -243,3 +243,28 @@ pyi_path_mksymlink(const char *link_target, const char *link_name)
     return symlink(link_target, link_name);
 #endif
 }
+
+/*
+ * Create hard link to an existing file.
+ */
+int
+pyi_path_mkhardlink(const char *existing_filename, const char *link_name)
+{
+#ifdef _WIN32
+    wchar_t wexisting_filename[PYI_PATH_MAX];
+    wchar_t wlink_name[PYI_PATH_MAX];
+
+    if (!pyi_win32_utf8_to_wcs(existing_filename, wexisting_filename, PYI_PATH_MAX)) {
+        return -1;
+    }
+    if (!pyi_win32_utf8_to_wcs(link_name, wlink_name, PYI_PATH_MAX)) {
+        return -1;
+    }
+    if (CreateHardLinkW(wlink_name, wexisting_filename, NULL) == 0) {
+        return -1;
+    }
+    return 0;
+#else
+    return link(existing_filename, link_name);
+#endif
+}
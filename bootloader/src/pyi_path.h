@@ -40,5 +40,6 @@ FILE *pyi_path_fopen(const char *filename, const char *mode);
 #endif
 
 int pyi_path_mksymlink(const char *link_target, const char *link_name);
+int pyi_path_mkhardlink(const char *existing_filename, const char *link_name);
 
 #endif /* PYI_PATH_H */
@@ -0,0 +1,16 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2024, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+"""
+Mock package for the `test_lazy_import` functional test. The execution of its `lazypkg` sub-package (and its
+submodules) is deferred; the modules record their execution into `events`.
+"""
+
+events = []
@@ -276,6 +276,56 @@ def MyEXE(*args, **kwargs):
     )
 
 
+def test_option_import_profile(pyi_builder, monkeypatch, tmp_path):
+    """
+    Test that the import profiling enabled via the X option produces the JSON report with the per-module timings.
+    """
+    import json
+
+    report_file = tmp_path / 'import-profile.json'
+
+    def MyEXE(*args, **kwargs):
+        args = list(args)
+        args.append([(f'X pyi_import_profile={report_file}', None, 'OPTION')])
+        return EXE(*args, **kwargs)
+
+    import PyInstaller.building.build_main
+    EXE = PyInstaller.building.build_main.EXE
+    monkeypatch.setattr('PyInstaller.building.build_main.EXE', MyEXE)
+
+    pyi_builder.test_source("""
+        import json.decoder
+        """)
+
+    with open(report_file, encoding='utf-8') as fp:
+        records = {record['name']: record for record in json.load(fp)['modules']}
+
+    assert records['json']['depth'] == 0
+    assert records['json.decoder']['depth'] == 1
+    assert records['json']['cumulative_us'] >= records['json.decoder']['cumulative_us']
+    assert records['json.decoder']['bytes_read'] > 0
+    assert records['json.decoder']['size'] > 0
+
+
+def test_import_profile_env_var(pyi_builder, monkeypatch, tmp_path):
+    """
+    Test that the import profiling can be enabled via the environment variable, which is not passed on to the child
+    processes of the application.
+    """
+    report_file = tmp_path / 'import-profile.txt'
+    monkeypatch.setenv('PYINSTALLER_IMPORT_PROFILE', str(report_file))
+
+    pyi_builder.test_source(
+        """
+        import os
+        import json.decoder
+        assert 'PYINSTALLER_IMPORT_PROFILE' not in os.environ
+        """
+    )
+
+    assert 'json.decoder' in report_file.read_text(encoding='utf-8')
+
+
 def test_option_w_unset(pyi_builder):
     """
     Test to ensure that option W is not set by default.
@@ -928,3 +928,67 @@ def test_split_location_pep420_namespace_package(pyi_builder, import_order, path
         pyi_args=pyi_args,
         app_args=app_args,
     )
+
+
+def test_lazy_import(pyi_builder):
+    # The execution of modules selected for lazy loading is deferred until their attributes are accessed.
+    pyi_builder.test_source(
+        """
+        from pyi_lazy_import import events
+
+        import pyi_lazy_import.lazypkg
+        import pyi_lazy_import.lazypkg  # Importing again does not load the module.
+        lazypkg = pyi_lazy_import.lazypkg
+        assert events == [], events
+        assert type(lazypkg).__name__ == '_PyiLazyModule'
+        assert lazypkg.__name__ == 'pyi_lazy_import.lazypkg'
+
+        # The submodule can be imported without loading the package.
+        import pyi_lazy_import.lazypkg.sub
+        assert events == [], events
+
+        assert lazypkg.sub.SUB_VALUE == 'sub'
+        assert events == ['pyi_lazy_import.lazypkg', 'pyi_lazy_import.lazypkg.sub'], events
+        assert lazypkg.VALUE == 42
+        assert type(lazypkg) is type(pyi_lazy_import)
+        """,
+        pyi_args=['--lazy-import', 'pyi_lazy_import.lazypkg'],
+    )
+
+
+def test_frozen_importer_lookup_caches(pyi_builder):
+    # The caches used by PyiFrozenImporter to speed up failed lookups must not prevent discovery of modules that are
+    # created on filesystem at run-time.
+    pyi_builder.test_source(
+        """
+        import importlib
+        import os
+        import sys
+
+        try:
+            import pyi_runtime_module
+        except ImportError:
+            pass
+        else:
+            raise AssertionError("pyi_runtime_module should not be importable yet!")
+
+        module_file = os.path.join(sys._MEIPASS, 'pyi_runtime_module.py')
+        with open(module_file, 'w', encoding='utf-8') as fp:
+            fp.write('VALUE = 42\\n')
+        try:
+            importlib.invalidate_caches()
+            import pyi_runtime_module
+            assert pyi_runtime_module.VALUE == 42
+        finally:
+            os.remove(module_file)
+
+        # Finder instances are cached per path.
+        finder = sys.path_importer_cache[sys._MEIPASS]
+        assert type(finder).path_hook(sys._MEIPASS) is finder
+
+        # Package paths are resolved from the index of known prefixes.
+        import json.decoder
+        package_finder = sys.path_importer_cache[json.__path__[0]]
+        assert package_finder._pyz_entry_prefix == 'json'
+        """
+    )
@@ -0,0 +1,541 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2024, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+
+import marshal
+import os
+import struct
+import sys
+
+import pytest
+
+from PyInstaller.archive.readers import PKG_ITEM_TOC_INDEX, ArchiveReadError, CArchiveReader
+from PyInstaller.building.utils import load_import_order
+from PyInstaller.archive.writers import CODECS, CArchiveWriter, ZlibArchiveWriter, toc_index_hash
+from PyInstaller.loader import pyimod01_archive
+
+
+def _create_pyz_entries(count=100):
+    toc = []
+    code_dict = {}
+    for idx in range(count):
+        name = f'pkg{idx // 10}.mod{idx}' if idx % 10 else f'pkg{idx // 10}'
+        src_path = f'/src/pkg{idx // 10}/' + (f'mod{idx}.py' if idx % 10 else '__init__.py')
+        source = f"VALUE = {idx}\n" + "def func(x):\n    return x * VALUE\n" * (idx % 7)
+        code_dict[name] = compile(source, src_path, 'exec')
+        toc.append((name, src_path, 'PYMODULE'))
+    toc.append(('nspkg', '-', 'PYMODULE'))
+    code_dict['nspkg'] = compile('', '-', 'exec')
+    return toc, code_dict
+
+
+@pytest.mark.parametrize('jobs', [2, None])
+def test_pyz_parallel_compression(tmp_path, jobs):
+    # Compressing entries in parallel must produce byte-identical archive.
+    toc, code_dict = _create_pyz_entries()
+
+    serial_file = tmp_path / 'serial.pyz'
+    ZlibArchiveWriter(str(serial_file), toc, code_dict=code_dict, jobs=1)
+    parallel_file = tmp_path / 'parallel.pyz'
+    ZlibArchiveWriter(str(parallel_file), toc, code_dict=code_dict, jobs=jobs)
+    assert parallel_file.read_bytes() == serial_file.read_bytes()
+
+    reader = pyimod01_archive.ZlibArchiveReader(str(parallel_file), check_pymagic=True)
+    assert list(reader.toc) == sorted(name for name, src_path, typecode in toc)
+    assert reader.toc['pkg1'][0] == pyimod01_archive.PYZ_ITEM_PKG
+    assert reader.toc['pkg1.mod11'][0] == pyimod01_archive.PYZ_ITEM_MODULE
+    assert reader.toc['nspkg'][0] == pyimod01_archive.PYZ_ITEM_NSPKG
+    assert reader.extract('pkg1.mod13') == code_dict['pkg1.mod13']
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_pyz_incremental_rebuild(tmp_path, jobs):
+    # Rebuilding the archive with some entries modified must re-use the unchanged entries, and produce the same
+    # archive as full rebuild.
+    toc, code_dict = _create_pyz_entries()
+    pyz_file = tmp_path / 'archive.pyz'
+    writer = ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict, jobs=jobs, previous_archive=str(pyz_file))
+    assert writer.reused_entries == 0
+    assert writer.compressed_entries == len(toc)
+
+    code_dict['pkg2.mod21'] = compile("VALUE = 'modified'\n", '/src/pkg2/mod21.py', 'exec')
+    toc.append(('newmod', '/src/newmod.py', 'PYMODULE'))
+    code_dict['newmod'] = compile("", '/src/newmod.py', 'exec')
+    del toc[5]
+
+    writer = ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict, jobs=jobs, previous_archive=str(pyz_file))
+    assert writer.compressed_entries == 2
+    assert writer.reused_entries == len(toc) - 2
+
+    full_file = tmp_path / 'full.pyz'
+    ZlibArchiveWriter(str(full_file), toc, code_dict=code_dict, jobs=jobs)
+    assert pyz_file.read_bytes() == full_file.read_bytes()
+
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    assert reader.extract('pkg2.mod21') == code_dict['pkg2.mod21']
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_pyz_compact_toc(tmp_path):
+    toc, code_dict = _create_pyz_entries()
+    toc.append(('pkgé', '/src/pkgé.py', 'PYMODULE'))
+    code_dict['pkgé'] = compile('', '/src/pkgé.py', 'exec')
+    pyz_file = tmp_path / 'archive.pyz'
+    ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict)
+
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    assert reader.flags & pyimod01_archive.PYZ_FLAG_COMPACT_TOC
+    assert isinstance(reader.toc, pyimod01_archive.CompactToc)
+    assert len(reader.toc) == len(toc)
+    assert 'pkg3.mod35' in reader.toc
+    assert 'pkg3.mod350' not in reader.toc
+    assert reader.toc.get('missing') is None
+    with pytest.raises(KeyError):
+        reader.toc['missing']
+    assert reader.extract('pkgé') == code_dict['pkgé']
+
+    # Archives with marshalled TOC are still supported.
+    entries = dict(reader.toc.items())
+    legacy_file = tmp_path / 'legacy.pyz'
+    with open(pyz_file, 'rb') as in_fp, open(legacy_file, 'wb') as out_fp:
+        data = in_fp.read()
+        toc_offset, _, _ = struct.unpack('!iIB', data[8:17])
+        out_fp.write(data[:8] + struct.pack('!iIB', toc_offset, 0, 0) + data[17:toc_offset])
+        out_fp.write(marshal.dumps(list(entries.items())))
+    legacy_reader = pyimod01_archive.ZlibArchiveReader(str(legacy_file))
+    assert legacy_reader.toc == entries
+    assert legacy_reader.extract('pkg3.mod35') == code_dict['pkg3.mod35']
+
+
+def test_pyz_incremental_rebuild_invalid_previous(tmp_path):
+    toc, code_dict = _create_pyz_entries(10)
+    previous_file = tmp_path / 'previous.pyz'
+    previous_file.write_bytes(b'garbage')
+    writer = ZlibArchiveWriter(str(tmp_path / 'archive.pyz'), toc, code_dict=code_dict, previous_archive=previous_file)
+    assert writer.reused_entries == 0
+
+
+@pytest.mark.parametrize('codec', ['stored', 'zlib', 'lzma', 'zlib-dict'])
+def test_pyz_codecs(tmp_path, codec):
+    toc, code_dict = _create_pyz_entries(20)
+    pyz_file = tmp_path / 'archive.pyz'
+    ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict, codec=codec)
+
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    assert {entry[3] for entry in reader.toc.values()} == {CODECS[codec]}
+    for name, _, _ in toc:
+        assert reader.extract(name) == code_dict[name]
+
+    # Entries compressed with a different codec must not be re-used.
+    other_codec = 'zlib' if codec != 'zlib' else 'stored'
+    writer = ZlibArchiveWriter(
+        str(pyz_file), toc, code_dict=code_dict, previous_archive=str(pyz_file), codec=other_codec
+    )
+    assert writer.reused_entries == 0
+    assert pyimod01_archive.ZlibArchiveReader(str(pyz_file)).extract('pkg1.mod12') == code_dict['pkg1.mod12']
+
+
+def test_pyz_zdict(tmp_path):
+    toc, code_dict = _create_pyz_entries()
+    zlib_file = tmp_path / 'zlib.pyz'
+    ZlibArchiveWriter(str(zlib_file), toc, code_dict=code_dict, codec='zlib')
+    zdict_file = tmp_path / 'zdict.pyz'
+    ZlibArchiveWriter(str(zdict_file), toc, code_dict=code_dict, codec='zlib-dict')
+
+    # The shared dictionary improves the compression of small entries.
+    zlib_reader = pyimod01_archive.ZlibArchiveReader(str(zlib_file))
+    zdict_reader = pyimod01_archive.ZlibArchiveReader(str(zdict_file))
+    assert zlib_reader.zdict is None
+    assert zdict_reader.zdict
+    assert sum(entry[2] for entry in zdict_reader.toc.values()) < sum(entry[2] for entry in zlib_reader.toc.values())
+    assert zdict_reader.extract('pkg3.mod35') == code_dict['pkg3.mod35']
+
+    # The dictionary is reproducible, so the entries of the previous archive can be re-used. If the dictionary changes,
+    # they cannot.
+    writer = ZlibArchiveWriter(
+        str(zdict_file), toc, code_dict=code_dict, previous_archive=str(zdict_file), codec='zlib-dict'
+    )
+    assert writer.reused_entries == len(toc)
+    assert pyimod01_archive.ZlibArchiveReader(str(zdict_file)).zdict == zdict_reader.zdict
+
+    del toc[:50]
+    writer = ZlibArchiveWriter(
+        str(zdict_file), toc, code_dict=code_dict, previous_archive=str(zdict_file), codec='zlib-dict'
+    )
+    assert writer.reused_entries == 0
+    assert pyimod01_archive.ZlibArchiveReader(str(zdict_file)).extract('pkg7.mod75') == code_dict['pkg7.mod75']
+
+
+def test_carchive_codecs(tmp_path):
+    data_file = tmp_path / 'data.txt'
+    data_file.write_bytes(b'data ' * 1000)
+    entries = [
+        ('stored.txt', str(data_file), 'stored', 'x'),
+        ('zlib.txt', str(data_file), 'zlib', 'x'),
+        ('compressed.txt', str(data_file), True, 'x'),
+        ('uncompressed.txt', str(data_file), False, 'x'),
+    ]
+    pkg_file = tmp_path / 'archive.pkg'
+    CArchiveWriter(str(pkg_file), entries, pylib_name='libpython.so')
+
+    reader = CArchiveReader(str(pkg_file))
+    assert [reader.toc[name][3] for name, *_ in entries] == [0, 1, 1, 0]
+    for name, *_ in entries:
+        assert reader.extract(name) == data_file.read_bytes()
+
+    # The bootloader cannot decompress lzma, and entries compressed with shared dictionary are supported only in PYZ.
+    for codec in ('lzma', 'zlib-dict'):
+        with pytest.raises(ValueError):
+            CArchiveWriter(str(pkg_file), [('data.txt', str(data_file), codec, 'x')], pylib_name='libpython.so')
+
+
+@pytest.mark.parametrize('codec', ['stored', 'zlib'])
+def test_pyz_mmap(tmp_path, monkeypatch, codec):
+    toc, code_dict = _create_pyz_entries(20)
+    pyz_file = tmp_path / 'archive.pyz'
+    ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict, codec=codec, use_mmap=True)
+
+    # The archive's flag enables memory-mapping, unless explicitly disabled.
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    assert reader.flags & pyimod01_archive.PYZ_FLAG_MMAP
+    assert reader._mmap is not None
+    assert pyimod01_archive.ZlibArchiveReader(str(pyz_file), use_mmap=False)._mmap is None
+    for name, _, _ in toc:
+        assert reader.extract(name) == code_dict[name]
+    assert isinstance(reader.extract('pkg1.mod12', raw=True), bytes)
+
+    # Fall back to reading the file if mmap is unavailable.
+    monkeypatch.setitem(sys.modules, 'mmap', None)
+    fallback_reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    assert fallback_reader._mmap is None
+    assert fallback_reader.extract('pkg1.mod12') == code_dict['pkg1.mod12']
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason="Memory-mapped files cannot be deleted on Windows.")
+def test_pyz_mmap_deleted_archive(tmp_path):
+    toc, code_dict = _create_pyz_entries(20)
+    pyz_file = tmp_path / 'archive.pyz'
+    ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict, use_mmap=True)
+
+    mmap_reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    file_reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file), use_mmap=False)
+    pyz_file.unlink()
+
+    assert mmap_reader.extract('pkg1.mod12') == code_dict['pkg1.mod12']
+    with pytest.raises(SystemExit):
+        file_reader.extract('pkg1.mod12')
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_pyz_prefetch(tmp_path, use_mmap):
+    toc, code_dict = _create_pyz_entries(50)
+    import_order = ['pkg3.mod35', 'pkg0', 'missing', 'pkg1.mod12', 'nspkg']
+    pyz_file = tmp_path / 'archive.pyz'
+    writer = ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict, import_order=import_order, use_mmap=use_mmap)
+    assert writer.prefetched_entries == 4
+
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    assert reader.flags & pyimod01_archive.PYZ_FLAG_PREFETCH
+    assert len(reader.toc) == len(toc)
+
+    # The entries from the import order are placed at the start of the archive, in the import order.
+    offsets = [reader.toc[name][1] for name in import_order if name != 'missing']
+    assert offsets == sorted(offsets)
+    assert offsets[0] == min(entry[1] for entry in reader.toc.values())
+
+    reader.start_prefetch()
+    assert reader.wait_prefetch(timeout=10)
+    assert sorted(reader._prefetched) == offsets
+
+    # Once all prefetched entries have been extracted, prefetching is ended.
+    for name, _, _ in toc:
+        assert reader.extract(name) == code_dict[name]
+    assert reader._prefetched is None
+    reader.start_prefetch()
+    assert reader._prefetched is None
+
+    # Extraction of an entry outside of the prefetched region after the prefetch thread has finished releases the
+    # data of entries that have not been extracted.
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    reader.start_prefetch()
+    assert reader.wait_prefetch(timeout=10)
+    assert reader.extract('pkg3.mod35') == code_dict['pkg3.mod35']
+    assert len(reader._prefetched) == len(offsets) - 1
+    assert reader.extract('pkg2') == code_dict['pkg2']
+    assert reader._prefetched is None
+    assert reader.extract('pkg0') == code_dict['pkg0']
+
+    # Archives without import order have no prefetch table.
+    ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict)
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    assert not reader.flags & pyimod01_archive.PYZ_FLAG_PREFETCH
+    reader.start_prefetch()
+    assert reader._prefetched is None
+
+
+def test_pyz_cache(tmp_path):
+    toc, code_dict = _create_pyz_entries(20)
+    pyz_file = tmp_path / 'archive.pyz'
+    ZlibArchiveWriter(str(pyz_file), toc, code_dict=code_dict)
+
+    raw_sizes = {name: len(marshal.dumps(code_dict[name])) for name, _, _ in toc}
+    cache_size = raw_sizes['pkg0.mod5'] + raw_sizes['pkg0.mod6']
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file), cache_size=cache_size)
+
+    # Entries are admitted into the cache on their second extraction.
+    assert reader.extract('pkg0.mod5') == code_dict['pkg0.mod5']
+    assert reader.extract('pkg0.mod5') == code_dict['pkg0.mod5']
+    assert reader.cache_info() == {
+        'hits': 0,
+        'misses': 2,
+        'entries': 1,
+        'size': raw_sizes['pkg0.mod5'],
+        'max_size': cache_size
+    }
+    assert reader.extract('pkg0.mod5') == code_dict['pkg0.mod5']
+    assert reader.extract('pkg0.mod5', raw=True) == marshal.dumps(code_dict['pkg0.mod5'])
+    assert (reader.cache_hits, reader.cache_misses) == (2, 2)
+
+    # The least recently used entry is evicted when the size limit is exceeded.
+    for name in ('pkg0.mod6', 'pkg0.mod6', 'pkg0.mod5', 'pkg1.mod12', 'pkg1.mod12'):
+        assert reader.extract(name) == code_dict[name]
+    info = reader.cache_info()
+    assert info['entries'] == 1 + (raw_sizes['pkg0.mod5'] + raw_sizes['pkg1.mod12'] <= cache_size)
+    assert info['size'] <= cache_size
+    assert reader.extract('pkg1.mod12') == code_dict['pkg1.mod12']
+    assert reader.cache_hits == 4
+
+    # The cache is disabled by default.
+    reader = pyimod01_archive.ZlibArchiveReader(str(pyz_file))
+    reader.extract('pkg0.mod5')
+    reader.extract('pkg0.mod5')
+    assert reader.cache_info()['entries'] == 0
+
+
+def test_load_import_order(tmp_path):
+    # Report in `-X importtime` format lists the modules in the order of completion of their imports.
+    report_file = tmp_path / 'imports.txt'
+    report_file.write_text(
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:        10 |         10 |     json.scanner\n"
+        "import time:        10 |         20 |   json.decoder\n"
+        "import time:        10 |         10 |   json.encoder\n"
+        "import time:        10 |         40 | json\n"
+        "import time:        10 |         10 | email\n"
+    )
+    expected = ['json', 'json.decoder', 'json.scanner', 'json.encoder', 'email']
+    assert load_import_order(str(report_file)) == expected
+
+    report_file = tmp_path / 'imports.json'
+    report_file.write_text(
+        '{"modules": [{"name": "b", "depth": 1}, {"name": "a", "depth": 0}, {"name": "c", "depth": 0}, '
+        '{"name": "b", "depth": 0}]}'
+    )
+    assert load_import_order(str(report_file)) == ['a', 'b', 'c']
+
+    report_file = tmp_path / 'imports.lst'
+    report_file.write_text("# Plain list\nfoo\nbar\n\nfoo\n")
+    assert load_import_order(str(report_file)) == ['foo', 'bar']
+
+
+@pytest.mark.parametrize('jobs', [2, None])
+def test_carchive_parallel_compression(tmp_path, jobs):
+    # Compressing entries in parallel must produce byte-identical archive. Large files are streamed through temporary
+    # files, and incompressible ones are stored without compression.
+    files = {
+        'small.txt': b'small data file ' * 100,
+        'large.txt': b''.join(f'line {idx}\n'.encode() for idx in range(300000)),
+        'random.bin': os.urandom(3 * 1024 * 1024),
+        'image.png': b'\0' * (2 * 1024 * 1024),
+        'stored.txt': b'stored data file ' * 100000,
+        'empty.txt': b'',
+    }
+    entries = []
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+        entries.append((name, str(tmp_path / name), name != 'stored.txt', 'x'))
+    entries.append(('link', 'small.txt', False, 'n'))
+
+    serial_file = tmp_path / 'serial.pkg'
+    CArchiveWriter(str(serial_file), entries, pylib_name='libpython.so', jobs=1)
+    parallel_file = tmp_path / 'parallel.pkg'
+    CArchiveWriter(str(parallel_file), entries, pylib_name='libpython.so', jobs=jobs)
+    assert parallel_file.read_bytes() == serial_file.read_bytes()
+
+    reader = CArchiveReader(str(parallel_file))
+    codecs = {name: entry[3] for name, entry in reader.toc.items()}
+    assert codecs == {
+        'small.txt': 1,
+        'large.txt': 1,
+        'random.bin': 0,
+        'image.png': 0,
+        'stored.txt': 0,
+        'empty.txt': 0,
+        'link': 0,
+    }
+    for name, data in files.items():
+        assert reader.extract(name) == data
+    assert reader.extract('link') == b'small.txt\0'
+
+
+def test_carchive_toc_index(tmp_path):
+    data_file = tmp_path / 'data.txt'
+    data_file.write_bytes(b'data')
+    names = [f'dir{idx % 7}/file{idx}.txt' for idx in range(100)] + ['Upper/Case.TXT', 'libé.so']
+    entries = [(name, str(data_file), False, 'x') for name in names]
+    entries += [('pyi-option', '', False, 'o'), ('pyi-option', '', False, 'o')]
+    pkg_file = tmp_path / 'archive.pkg'
+    CArchiveWriter(str(pkg_file), entries, pylib_name='libpython.so')
+
+    # The index is not visible to the reader.
+    reader = CArchiveReader(str(pkg_file))
+    assert list(reader.toc) == names
+    assert reader.options == ['pyi-option', 'pyi-option']
+    assert reader.extract('libé.so') == b'data'
+
+    # Locate the index entry and its data, and look up each entry the same way as the bootloader does.
+    with open(pkg_file, 'rb') as fp:
+        fp.seek(reader._start_offset + reader._toc_offset)
+        toc_data = fp.read(reader._toc_length)
+        entry_offsets = {}
+        cur_pos = 0
+        while cur_pos < len(toc_data):
+            header = toc_data[cur_pos:cur_pos + CArchiveReader._TOC_ENTRY_LENGTH]
+            entry_length, data_offset, data_length, _, _, typecode = \
+                struct.unpack(CArchiveReader._TOC_ENTRY_FORMAT, header)
+            name = toc_data[cur_pos + len(header):cur_pos + entry_length].rstrip(b'\0').decode('utf-8')
+            assert cur_pos % 16 == 0
+            if typecode == PKG_ITEM_TOC_INDEX.encode('ascii'):
+                fp.seek(reader._start_offset + data_offset)
+                index_data = fp.read(data_length)
+            else:
+                entry_offsets[cur_pos] = name
+            cur_pos += entry_length
+
+    num_slots, *slots = struct.unpack(f'!{len(index_data) // 4}I', index_data)
+    assert num_slots == len(slots) == 256
+
+    def _lookup(name):
+        slot = toc_index_hash(name) & (num_slots - 1)
+        while slots[slot] != 0xFFFFFFFF:
+            if entry_offsets[slots[slot]] == name:
+                return slots[slot]
+            slot = (slot + 1) & (num_slots - 1)
+        return None
+
+    for name in names + ['pyi-option']:
+        assert _lookup(name) is not None
+    assert entry_offsets[_lookup('pyi-option')] == 'pyi-option'
+    assert _lookup('missing') is None
+    assert toc_index_hash('Upper/Case.TXT') == toc_index_hash('upper/case.txt')
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_carchive_shared_data(tmp_path, jobs):
+    # The data of entries with identical contents is stored only once.
+    files = {
+        'LICENSE': b'license text ' * 100,
+        'large.bin': b''.join(f'line {idx}\n'.encode() for idx in range(300000)),
+        'other.txt': b'other data file ' * 100,
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+    entries = [
+        ('LICENSE', str(tmp_path / 'LICENSE'), True, 'x'),
+        ('large.bin', str(tmp_path / 'large.bin'), True, 'b'),
+        ('other.txt', str(tmp_path / 'other.txt'), True, 'x'),
+        ('vendored/LICENSE', str(tmp_path / 'LICENSE'), True, 'x'),
+        ('vendored/large.bin', str(tmp_path / 'large.bin'), True, 'b'),
+        ('stored/LICENSE', str(tmp_path / 'LICENSE'), False, 'x'),
+        ('empty1', str(tmp_path / 'empty'), True, 'x'),
+        ('empty2', str(tmp_path / 'empty'), True, 'x'),
+    ]
+    (tmp_path / 'empty').write_bytes(b'')
+    pkg_file = tmp_path / 'archive.pkg'
+    writer = CArchiveWriter(str(pkg_file), entries, pylib_name='libpython.so', jobs=jobs)
+    assert writer.shared_entries == 2
+
+    reader = CArchiveReader(str(pkg_file))
+    assert reader.toc['vendored/LICENSE'] == reader.toc['LICENSE']
+    assert reader.toc['vendored/large.bin'] == reader.toc['large.bin']
+    # Entries stored with different codec do not share data.
+    assert reader.toc['stored/LICENSE'][0] != reader.toc['LICENSE'][0]
+    for name, src_name, _, _ in entries:
+        with open(src_name, 'rb') as fp:
+            assert reader.extract(name) == fp.read()
+    assert pkg_file.stat().st_size < sum(len(data) for data in files.values())
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_carchive_extract_all(tmp_path, monkeypatch, workers):
+    src_dir = tmp_path / 'src'
+    src_dir.mkdir()
+    files = {
+        'small.txt': b'small data file ' * 100,
+        'sub/large.txt': b''.join(f'line {idx}\n'.encode() for idx in range(300000)),
+        'sub/random.bin': os.urandom(100000),
+        'empty.txt': b'',
+    }
+    entries = []
+    for name, data in files.items():
+        src_file = src_dir / name.replace('/', '_')
+        src_file.write_bytes(data)
+        entries.append((name, str(src_file), True, 'x'))
+    entries.append(('pyi-option', '', False, 'o'))
+    if sys.platform != 'win32':
+        entries.append(('sub/link.txt', '../small.txt', False, 'n'))
+    pkg_file = tmp_path / 'archive.pkg'
+    CArchiveWriter(str(pkg_file), entries, pylib_name='libpython.so')
+    reader = CArchiveReader(str(pkg_file))
+
+    assert dict(reader.iter_entries(workers=workers)) == {name: reader.extract(name) for name in reader.toc}
+
+    dest_dir = tmp_path / 'dest'
+    filenames = reader.extract_all(str(dest_dir), workers=workers)
+    assert filenames == [os.path.join(os.path.realpath(dest_dir), os.path.normpath(name)) for name in reader.toc]
+    for name, data in files.items():
+        assert (dest_dir / name).read_bytes() == data
+    if sys.platform != 'win32':
+        assert os.readlink(dest_dir / 'sub' / 'link.txt') == '../small.txt'
+        assert (dest_dir / 'sub' / 'link.txt').read_bytes() == files['small.txt']
+
+    # Entries that would be extracted outside of the destination directory are rejected.
+    evil_pkg_file = tmp_path / 'evil.pkg'
+    CArchiveWriter(str(evil_pkg_file), [('../evil.txt', entries[0][1], True, 'x')], pylib_name='libpython.so')
+    with pytest.raises(ArchiveReadError):
+        CArchiveReader(str(evil_pkg_file)).extract_all(str(tmp_path / 'dest2'), workers=workers)
+    assert not (tmp_path / 'evil.txt').exists()
+
+    # Symbolic links must not redirect the extraction outside of the destination directory, regardless of the order
+    # in which the entries are extracted; absolute targets and targets outside of the destination are rejected.
+    if sys.platform != 'win32':
+        outside_dir = tmp_path / 'outside'
+        outside_dir.mkdir()
+        for link_target in (str(outside_dir), '../outside'):
+            evil_entries = [('a', link_target, False, 'n'), ('a/b', entries[0][1], True, 'x')]
+            CArchiveWriter(str(evil_pkg_file), evil_entries, pylib_name='libpython.so')
+            with pytest.raises(ArchiveReadError):
+                CArchiveReader(str(evil_pkg_file)).extract_all(str(tmp_path / 'dest4'), workers=workers)
+            assert not (outside_dir / 'b').exists()
+            assert not (tmp_path / 'dest4' / 'a').is_symlink()
+
+        # Files are not written through symbolic links that already exist in the destination directory.
+        (tmp_path / 'dest5').mkdir()
+        (tmp_path / 'dest5' / 'a').symlink_to(outside_dir)
+        CArchiveWriter(str(evil_pkg_file), [('a/b', entries[0][1], True, 'x')], pylib_name='libpython.so')
+        with pytest.raises(ArchiveReadError):
+            CArchiveReader(str(evil_pkg_file)).extract_all(str(tmp_path / 'dest5'), workers=workers)
+        assert not (outside_dir / 'b').exists()
+
+    # Fall back to reading the file if it cannot be memory-mapped; decompress in small chunks.
+    monkeypatch.setattr(CArchiveReader, '_EXTRACT_CHUNK_SIZE', 1000)
+    monkeypatch.setitem(sys.modules, 'mmap', None)
+    reader.extract_all(str(tmp_path / 'dest3'), workers=workers)
+    assert (tmp_path / 'dest3' / 'sub' / 'large.txt').read_bytes() == files['sub/large.txt']
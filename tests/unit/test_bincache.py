@@ -0,0 +1,161 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2024, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+
+import errno
+import os
+
+import pytest
+
+from PyInstaller.building import bincache
+
+
+def _add_file(index, name, digest, size):
+    path = index.get_path(name, digest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as fp:
+        fp.write(b'\0' * size)
+    index.add(os.path.normcase(name), digest, size)
+    return path
+
+
+def test_bincache_index_journal(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+
+    index = bincache.BinaryCacheIndex(cache_dir)
+    _add_file(index, 'libfoo.so', 'aaaa', 10)
+    _add_file(index, os.path.join('sub', 'libbar.so'), 'bbbb', 20)
+    assert len(index) == 0  # Not committed yet.
+    index.commit()
+    assert len(index) == 2
+
+    # Another build sharing the cache directory sees the committed entries, and appends its own records.
+    index2 = bincache.BinaryCacheIndex(cache_dir)
+    assert ('libfoo.so', 'aaaa') in index2
+    index2.touch('libfoo.so', 'aaaa')
+    _add_file(index2, 'libfoo.so', 'cccc', 30)  # New version of the same binary.
+    index2.commit()
+
+    # Simulate a build that was interrupted while writing a record.
+    with open(os.path.join(cache_dir, 'index.journal'), 'a', encoding='utf-8') as fp:
+        fp.write('["add", "libbaz.so", "dd')
+
+    index.touch(os.path.normcase(os.path.join('sub', 'libbar.so')), 'bbbb')
+    index.commit()
+    assert len(index) == 3
+
+    index3 = bincache.BinaryCacheIndex(cache_dir)
+    assert len(index3) == 3
+    assert ('libfoo.so', 'cccc') in index3
+    assert ('libbaz.so', 'dd') not in index3
+
+
+def test_bincache_index_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(bincache, '_COMPACTION_THRESHOLD', 10)
+    cache_dir = str(tmp_path / 'cache')
+    journal_file = os.path.join(cache_dir, 'index.journal')
+
+    index = bincache.BinaryCacheIndex(cache_dir)
+    _add_file(index, 'libfoo.so', 'aaaa', 10)
+    index.commit()
+    for _ in range(10):
+        index.touch('libfoo.so', 'aaaa')
+        index.commit()
+
+    with open(journal_file, encoding='utf-8') as fp:
+        assert len(fp.readlines()) < 10
+    assert ('libfoo.so', 'aaaa') in bincache.BinaryCacheIndex(cache_dir)
+
+
+def test_bincache_index_eviction(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+
+    # Add entries that were last used a while ago.
+    index = bincache.BinaryCacheIndex(cache_dir, max_size=0)
+    paths = [_add_file(index, f'lib{idx}.so', f'{idx:04d}', 100) for idx in range(10)]
+    index._pending = [record[:4] + [idx] for idx, record in enumerate(index._pending)]
+    index.commit()
+
+    # Re-use the oldest entry, and add a new one; the least recently used entries are evicted until the total size is
+    # within 90% of the limit, while the recently used ones are kept.
+    index = bincache.BinaryCacheIndex(cache_dir, max_size=600)
+    index.touch('lib0.so', '0000')
+    new_path = _add_file(index, 'libnew.so', 'ffff', 100)
+    index.commit()
+
+    assert len(index) == 5
+    assert ('lib0.so', '0000') in index
+    assert ('libnew.so', 'ffff') in index
+    assert [os.path.isfile(path) for path in paths] == [True] + [False] * 6 + [True] * 3
+    assert not os.path.isdir(os.path.dirname(paths[1]))
+    assert os.path.isfile(new_path)
+
+    assert len(bincache.BinaryCacheIndex(cache_dir)) == 5
+
+
+def test_bincache_index_legacy(tmp_path):
+    # The index from older PyInstaller versions and files that it refers to are left alone, as they might still be in
+    # use by those versions.
+    cache_dir = tmp_path / 'cache'
+    (cache_dir / 'sub').mkdir(parents=True)
+    (cache_dir / 'sub' / 'libfoo.so').write_bytes(b'')
+    (cache_dir / 'index.dat').write_text(repr({os.path.normcase(os.path.join('sub', 'libfoo.so')): bytearray(b'x')}))
+
+    index = bincache.BinaryCacheIndex(str(cache_dir))
+    assert len(index) == 0
+    _add_file(index, 'libfoo.so', '0000', 10)
+    index.commit()
+    assert (cache_dir / 'index.dat').is_file()
+    assert (cache_dir / 'sub' / 'libfoo.so').is_file()
+
+
+class _FakeMsvcrt:
+    # Emulates `msvcrt.locking`, which fails with EDEADLOCK if the lock cannot be acquired within 10 seconds.
+    LK_UNLCK = 0
+    LK_LOCK = 1
+
+    def __init__(self, failures, error=errno.EDEADLOCK):
+        self.failures = failures
+        self.error = error
+        self.calls = []
+
+    def locking(self, fd, mode, nbytes):
+        self.calls.append(mode)
+        if mode == self.LK_LOCK and self.failures:
+            self.failures -= 1
+            raise OSError(self.error, os.strerror(self.error))
+
+
+def test_bincache_lock_windows(tmp_path, monkeypatch):
+    monkeypatch.setattr(bincache.compat, 'is_win', True)
+    lock_file = str(tmp_path / 'index.lock')
+
+    # Lock contention is retried.
+    fake_msvcrt = _FakeMsvcrt(failures=2)
+    monkeypatch.setattr(bincache, 'msvcrt', fake_msvcrt, raising=False)
+    with bincache._locked(lock_file):
+        pass
+    assert fake_msvcrt.calls == [_FakeMsvcrt.LK_LOCK] * 3 + [_FakeMsvcrt.LK_UNLCK]
+
+    # Other errors are not retried.
+    fake_msvcrt = _FakeMsvcrt(failures=2, error=errno.EBADF)
+    monkeypatch.setattr(bincache, 'msvcrt', fake_msvcrt)
+    with pytest.raises(OSError):
+        with bincache._locked(lock_file):
+            pass
+    assert fake_msvcrt.calls == [_FakeMsvcrt.LK_LOCK]
+
+    # The total wait for the lock is bounded.
+    fake_msvcrt = _FakeMsvcrt(failures=-1)
+    monkeypatch.setattr(bincache, 'msvcrt', fake_msvcrt)
+    monkeypatch.setattr(bincache, '_LOCK_TIMEOUT', 0)
+    with pytest.raises(TimeoutError):
+        with bincache._locked(lock_file):
+            pass
@@ -0,0 +1,111 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2005-2023, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+
+import os
+
+from PyInstaller import compat
+from PyInstaller.depend import bindepend, bindepcache
+
+
+def _create_files(path):
+    binary = path / 'binary.so'
+    binary.write_bytes(b'binary')
+    lib = path / 'libdep.so'
+    lib.write_bytes(b'library')
+    return str(binary), str(lib)
+
+
+def test_bindepend_cache_imports(tmp_path):
+    binary, lib = _create_files(tmp_path)
+    cache_file = str(tmp_path / 'cache' / 'bindepcache.dat')
+    imports = {('libdep.so', lib)}
+
+    cache = bindepcache.BinaryDependencyCache(cache_file)
+    assert cache.get_imports(binary, []) is None
+    cache.put_imports(binary, [], imports)
+    cache.put_typecode(binary, 'BINARY')
+    cache.save()
+    assert os.path.isfile(cache_file)
+
+    cache = bindepcache.BinaryDependencyCache(cache_file)
+    assert cache.get_imports(binary, []) == imports
+    assert cache.get_typecode(binary) == 'BINARY'
+    assert cache.hits == 2
+
+    # Different search paths
+    assert cache.get_imports(binary, [str(tmp_path)]) is None
+
+    # Modified dependency
+    with open(lib, 'ab') as fp:
+        fp.write(b'.')
+    assert cache.get_imports(binary, []) is None
+    assert cache.get_typecode(binary) == 'BINARY'
+
+    # Modified binary
+    cache.put_imports(binary, [], imports)
+    assert cache.get_imports(binary, []) == imports
+    with open(binary, 'ab') as fp:
+        fp.write(b'.')
+    assert cache.get_imports(binary, []) is None
+    assert cache.get_typecode(binary) is None
+
+
+def test_bindepend_cache_environment(tmp_path, monkeypatch):
+    binary, lib = _create_files(tmp_path)
+    cache_file = str(tmp_path / 'bindepcache.dat')
+    imports = {('libdep.so', lib)}
+
+    cache = bindepcache.BinaryDependencyCache(cache_file)
+    cache.put_imports(binary, [], imports)
+    cache.save()
+
+    # Changing the library search path environment variable invalidates the cached imports.
+    for name in bindepcache._LIBRARY_PATH_VARIABLES:
+        monkeypatch.setenv(name, str(tmp_path))
+    cache = bindepcache.BinaryDependencyCache(cache_file)
+    assert len(cache) == 1
+    assert cache.get_imports(binary, []) is None
+
+
+def test_bindepend_cache_unresolved(tmp_path):
+    # Results with unresolved dependencies must not be cached.
+    binary, lib = _create_files(tmp_path)
+    cache = bindepcache.BinaryDependencyCache(str(tmp_path / 'bindepcache.dat'))
+    cache.put_imports(binary, [], {('libdep.so', lib), ('libmissing.so', None)})
+    assert cache.get_imports(binary, []) is None
+
+
+def test_bindepend_cache_corrupted_file(tmp_path):
+    cache_file = tmp_path / 'bindepcache.dat'
+    cache_file.write_bytes(b'garbage')
+
+    cache = bindepcache.BinaryDependencyCache(str(cache_file))
+    assert len(cache) == 0
+
+
+def test_binary_dependency_analysis_cache(tmp_path, monkeypatch):
+    binary = compat.python_executable
+    cache_file = str(tmp_path / 'bindepcache.dat')
+    toc = [(os.path.basename(binary), binary, 'BINARY')]
+
+    cache = bindepcache.BinaryDependencyCache(cache_file)
+    expected = bindepend.binary_dependency_analysis(toc, symlink_suppression_patterns=set(), cache=cache)
+    cache.save()
+
+    # The analysis must be reproduced from the cache alone.
+    def _get_imports(*args, **kwargs):
+        raise AssertionError("get_imports called despite cached result!")
+
+    monkeypatch.setattr(bindepend, 'get_imports', _get_imports)
+    for jobs in (1, 2):
+        cache = bindepcache.BinaryDependencyCache(cache_file)
+        result = bindepend.binary_dependency_analysis(toc, symlink_suppression_patterns=set(), jobs=jobs, cache=cache)
+        assert result == expected
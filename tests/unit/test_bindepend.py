@@ -9,7 +9,18 @@
 # SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
 #-----------------------------------------------------------------------------
 
+import glob
+import os
+import shutil
+import struct
+import sysconfig
+
+import pytest
+
+from PyInstaller import compat
+from PyInstaller.depend import bindepend
 from PyInstaller.depend.bindepend import _library_matcher
+from PyInstaller.utils import elf as elfutils
 
 
 def test_library_matcher():
@@ -25,3 +36,127 @@ def test_library_matcher():
 
     m = _library_matcher("libpng")
     assert m("libpng16.so.16")
+
+
+def test_binary_dependency_analysis_parallel(tmp_path, monkeypatch):
+    """
+    Test that parallel binary dependency analysis produces the same output as serial analysis, even if the analysis of
+    individual binaries completes out of order.
+    """
+    import random
+    import threading
+    import time
+
+    # Synthetic dependency tree: each library depends on a few libraries with higher index; some dependencies are
+    # missing.
+    rng = random.Random(0)
+    libs = [str(tmp_path / f"libtest{idx}.so") for idx in range(40)]
+    imports = {}
+    for idx, lib in enumerate(libs):
+        deps = rng.sample(range(idx + 1, len(libs)), min(3, len(libs) - idx - 1))
+        imports[lib] = {(f"libtest{dep}.so", libs[dep] if dep % 7 else None) for dep in deps}
+
+    threads = set()
+
+    def _get_imports(filename, search_paths=None):
+        threads.add(threading.get_ident())
+        time.sleep(rng.random() * 0.01)
+        return imports[filename]
+
+    monkeypatch.setattr(bindepend, "get_imports", _get_imports)
+
+    binaries = [(f"libtest{idx}.so", libs[idx], 'BINARY') for idx in (0, 5, 10)]
+
+    serial = bindepend.binary_dependency_analysis(binaries, symlink_suppression_patterns=set(), jobs=1)
+    assert len(threads) == 1
+
+    threads.clear()
+    parallel = bindepend.binary_dependency_analysis(binaries, symlink_suppression_patterns=set(), jobs=4)
+    assert len(threads) > 1
+
+    assert parallel == serial
+    assert len(serial) > len(binaries)
+
+
+@pytest.mark.skipif(bindepend._BINARY_SIGNATURES is None, reason="Classification is not supported on this platform.")
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_classify_binary_vs_data_batch(tmp_path, monkeypatch, jobs):
+    """
+    Test that batched binary vs. data classification matches the per-file classification, and that only the files with
+    binary signature are subjected to deep validation.
+    """
+    from PyInstaller.depend import bindepcache
+
+    filenames = [compat.python_executable, str(tmp_path / 'missing.dat')]
+    for idx in range(300):
+        data_file = tmp_path / f'data{idx}.txt'
+        data_file.write_text(f'data file {idx}')
+        filenames.append(str(data_file))
+    fake_binary = tmp_path / 'fake.bin'
+    fake_binary.write_bytes(bindepend._BINARY_SIGNATURES[0] + b'garbage')
+    filenames.append(str(fake_binary))
+
+    expected = {filename: bindepend.classify_binary_vs_data(filename) for filename in filenames}
+    assert expected[compat.python_executable] == 'BINARY'
+    assert expected[str(fake_binary)] == 'DATA'
+
+    validated = []
+    validate_binary = bindepend._validate_binary
+
+    def _validate_binary(filename):
+        validated.append(filename)
+        return validate_binary(filename)
+
+    monkeypatch.setattr(bindepend, "_validate_binary", _validate_binary)
+
+    cache = bindepcache.BinaryDependencyCache(str(tmp_path / 'bindepcache.dat'))
+    assert bindepend.classify_binary_vs_data_batch(filenames, jobs=jobs, cache=cache) == expected
+    assert sorted(validated) == sorted([compat.python_executable, str(fake_binary)])
+
+    # Second pass is served from the cache.
+    validated.clear()
+    assert bindepend.classify_binary_vs_data_batch(filenames, jobs=jobs, cache=cache) == expected
+    assert validated == []
+    assert cache.hits == len(filenames) - 1
+
+
+@pytest.mark.linux
+def test_elf_file(tmp_path):
+    elf = elfutils.ELFFile(compat.python_executable)
+    assert elf.is_dynamic
+    assert elf.interpreter
+    assert elf.type in (elfutils.ET_EXEC, elfutils.ET_DYN)
+
+    # Truncated binary and non-binary files must be rejected.
+    truncated = tmp_path / 'truncated.so'
+    with open(compat.python_executable, 'rb') as fp:
+        truncated.write_bytes(fp.read(128))
+    assert not elfutils.is_elf_binary(str(truncated))
+
+    data_file = tmp_path / 'data.txt'
+    data_file.write_text('INPUT(libc.so.6)\n')
+    with pytest.raises(elfutils.InvalidBinaryError):
+        elfutils.ELFFile(str(data_file))
+    assert bindepend.classify_binary_vs_data(str(data_file)) == 'DATA'
+
+    # Extended program header count (PN_XNUM), with the section header that should hold the actual count extending past
+    # the end of file.
+    header = b'\x7fELF\x02\x01\x01' + b'\0' * 9
+    header += struct.pack('<HHIQQQIHHHHHH', elfutils.ET_DYN, 62, 1, 0, 64, 64, 0, 64, 56, elfutils.PN_XNUM, 64, 0, 0)
+    xnum_file = tmp_path / 'xnum.bin'
+    xnum_file.write_bytes(header + b'\0' * 8)
+    assert not elfutils.is_elf_binary(str(xnum_file))
+    assert bindepend.classify_binary_vs_data(str(xnum_file)) == 'DATA'
+
+
+@pytest.mark.linux
+@pytest.mark.skipif(not bindepend._use_elf_reader, reason="ELF reader is not used on this platform.")
+@pytest.mark.skipif(shutil.which('ldd') is None, reason="ldd is not available.")
+def test_get_imports_elf_matches_ldd():
+    """
+    Test that the dependencies obtained by reading the ELF binaries match those reported by `ldd`.
+    """
+    binaries = sorted(glob.glob(os.path.join(sysconfig.get_config_var('DESTSHARED') or '', '*.so')))
+    binaries.append(compat.python_executable)
+    for filename in binaries:
+        assert bindepend._get_imports_elf(filename, None) == bindepend._get_imports_ldd(filename, None), filename
@@ -10,11 +10,14 @@
 #-----------------------------------------------------------------------------
 
 import pytest
+import glob
 import os
 import pathlib
+import shutil
+import sysconfig
 from importlib.machinery import EXTENSION_SUFFIXES
 
-from PyInstaller.building import utils
+from PyInstaller.building import bincache, utils
 
 
 def test_format_binaries_and_datas_not_found_raises_error(tmpdir):
@@ -152,3 +155,30 @@ def test_should_include_system_binary():
         expected = case[3]
 
         assert utils._should_include_system_binary(tuple, excepts) == expected
+
+
+@pytest.mark.linux
+@pytest.mark.skipif(shutil.which('strip') is None, reason="strip is not available.")
+def test_process_collected_binaries(tmp_path, monkeypatch):
+    from PyInstaller.config import CONF
+
+    monkeypatch.setitem(CONF, 'cachedir', str(tmp_path / 'cache'))
+
+    src_files = sorted(glob.glob(os.path.join(sysconfig.get_config_var('DESTSHARED'), '*.so')))[:8]
+    binaries = [(src_name, os.path.join('lib', os.path.basename(src_name)), True) for src_name in src_files]
+
+    # Results are returned in the order of input entries.
+    results = utils.process_collected_binaries(binaries, use_strip=True, jobs=4)
+    assert [os.path.basename(name) for name in results] == [os.path.basename(name) for name in src_files]
+    assert all(os.path.isfile(name) for name in results)
+
+    # All processed binaries are recorded in the cache index.
+    cache_dir = os.path.dirname(os.path.dirname(os.path.dirname(results[0])))
+    cache_index = bincache.BinaryCacheIndex(cache_dir)
+    assert len(cache_index) == len(binaries)
+
+    # Re-processing uses the cached files.
+    mtimes = [os.stat(name).st_mtime_ns for name in results]
+    assert utils.process_collected_binaries(binaries, use_strip=True, jobs=4) == results
+    assert utils.process_collected_binary(src_files[0], binaries[0][1], use_strip=True) == results[0]
+    assert [os.stat(name).st_mtime_ns for name in results] == mtimes
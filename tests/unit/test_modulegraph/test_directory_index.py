@@ -0,0 +1,77 @@
+import importlib.machinery
+import os
+
+import pytest
+
+from PyInstaller.lib.modulegraph import modulegraph
+
+
+def _create_tree(path):
+    (path / 'pkg').mkdir()
+    (path / 'pkg' / '__init__.py').write_text('')
+    (path / 'pkg' / 'sub.py').write_text('')
+    (path / 'nspkg').mkdir()
+    (path / 'nspkg' / 'data.txt').write_text('')
+    (path / 'mod.py').write_text('')
+    (path / 'compiled.pyc').write_bytes(b'')
+    (path / 'both.py').write_text('')
+    (path / 'both').mkdir()  # Namespace directory shadowed by module.
+    (path / 'not_a_module.txt').write_text('')
+
+
+def _describe(path_data):
+    pathname, loader = path_data
+    if isinstance(loader, modulegraph.NAMESPACE_PACKAGE):
+        return pathname, 'namespace', loader.namespace_dirs
+    return pathname, type(loader).__name__, None
+
+
+@pytest.mark.parametrize('name', ['pkg', 'nspkg', 'mod', 'compiled', 'both', 'not_a_module', 'missing'])
+def test_directory_index_lookup(tmp_path, monkeypatch, name):
+    # Lookups resolved against the directory index must match those performed by the importers.
+    _create_tree(tmp_path)
+    search_dirs = [str(tmp_path)]
+
+    def _lookup():
+        mg = modulegraph.ModuleGraph(path=search_dirs)
+        try:
+            return _describe(mg._find_module_path(name, name, search_dirs)), mg._dir_index
+        except ImportError:
+            return None, mg._dir_index
+
+    result, dir_index = _lookup()
+    assert dir_index.lookups == 1
+    assert dir_index.fallbacks == 0
+
+    monkeypatch.setenv('PYTHONCASEOK', '1')
+    expected, dir_index = _lookup()
+    assert dir_index.lookups == 0
+
+    assert result == expected
+
+
+def test_directory_index_submodule(tmp_path):
+    _create_tree(tmp_path)
+    mg = modulegraph.ModuleGraph(path=[str(tmp_path)])
+    pathname, loader = mg._find_module_path('pkg.sub', 'sub', [str(tmp_path / 'pkg')])
+    assert pathname == str(tmp_path / 'pkg' / 'sub.py')
+    assert isinstance(loader, importlib.machinery.SourceFileLoader)
+
+
+def test_directory_index_invalidation(tmp_path):
+    _create_tree(tmp_path)
+    mg = modulegraph.ModuleGraph(path=[str(tmp_path)])
+    with pytest.raises(ImportError):
+        mg._find_module_path('new_mod', 'new_mod', mg.path)
+
+    # Directory listings are cached; a module created after the directory has been listed is not visible...
+    (tmp_path / 'new_mod.py').write_text('')
+    with pytest.raises(ImportError):
+        mg._find_module_path('new_mod', 'new_mod', mg.path)
+    assert mg._dir_index.listings == 1
+
+    # ... until the search path changes.
+    mg.path = mg.path + [str(tmp_path / 'nspkg')]
+    pathname, _ = mg._find_module_path('new_mod', 'new_mod', mg.path)
+    assert pathname == os.path.join(str(tmp_path), 'new_mod.py')
+    assert mg._dir_index.invalidations == 1
@@ -0,0 +1,159 @@
+import ast
+import textwrap
+
+import pytest
+
+from PyInstaller.lib.modulegraph import modulegraph, scanner
+
+
+def _scan_ast(src):
+    # Reference result: imports collected by the AST visitor.
+    co = compile(src, '<test>', 'exec', 0, True)
+    module = modulegraph.SourceModule('test')
+    module._deferred_imports = []
+    modulegraph._Visitor(None, module).visit(compile(src, '<test>', 'exec', ast.PyCF_ONLY_AST, True))
+    return modulegraph._make_scan_result(module, co)[1]
+
+
+_SOURCES = {
+    'simple': """
+        import os, sys as system
+        import xml.dom . minidom
+        from json import loads, dumps as d
+        from . import sibling
+        from ..parent import (a,
+                              b,)
+        from .pkg.sub import *
+        """,
+    'nested-blocks': """
+        if x:
+            import a
+        elif y:
+            import b
+        else:
+            import c
+        try:
+            import d
+        except ImportError:
+            import e
+        else:
+            import f
+        finally:
+            import g
+        for i in range(3):
+            import h
+        else:
+            import i
+        def func():
+            if x:
+                try:
+                    import j
+                except Exception: pass
+            class Inner:
+                import k
+        async def coro():
+            import l
+        class Outer:
+            import m
+        import n
+        """,
+    'one-liners': """
+        if x: import a; import b
+        try: import c
+        except: pass
+        def func(): import d
+        while x: import e
+        """,
+    'strings-and-comments': '''
+        """
+        import not_a_module
+        """
+        x = "import also_not_a_module"  # import nor_this
+        y = ("from nowhere import nothing"
+             'import nothing')
+        if x:  # a comment: with colon
+            import a
+        import b \\
+            , c
+        ''',
+    'brackets': """
+        data = {
+            'key': [1, 2, 3],
+        }
+        if (x and
+                y):
+            import a
+        lookup = dict(a=1,
+            b=2)
+        import b
+        """,
+    'soft-keywords': """
+        match = 1
+        match: int = 2
+        case = [1]
+        match x:
+            case 1:
+                import a
+            case _:
+                pass
+        import b
+        """,
+    'lambda-in-header': """
+        if (lambda: x)():
+            import a
+        import b
+        """,
+    'walrus-and-annotations': """
+        if (y := 1):
+            import a
+        value: int = 1
+        import b
+        """,
+    'main': """
+        import __main__
+        from __main__ import x
+        from os import path, __main__
+        """,
+    'dead-code': """
+        if 0:
+            import a
+        if __debug__:
+            import b
+        import c
+        """,
+    'tabs': "if x:\n\timport a\n\tif y:\n\t    import b\nimport c\n",
+}
+
+
+@pytest.mark.parametrize('name', sorted(_SOURCES))
+def test_scan_source(name):
+    src = textwrap.dedent(_SOURCES[name])
+    co, imports, global_attr_names = modulegraph._scan_source(src, '<test>')
+    assert imports == _scan_ast(src)
+
+
+def test_scanner_results():
+    src = textwrap.dedent(_SOURCES['nested-blocks'])
+    imports = scanner.scan_source_imports(src)
+    flags = {entry[0]: entry[3:] for entry in imports}
+    # (in_if, in_def, in_tryexcept)
+    assert flags['a'] == (True, False, False)
+    assert flags['c'] == (True, False, False)
+    assert flags['f'] == (False, False, True)
+    assert flags['g'] == (False, False, True)
+    assert flags['h'] == (False, False, False)
+    assert flags['i'] == (False, False, False)
+    assert flags['j'] == (True, True, True)
+    assert flags['k'] == (False, True, False)
+    assert flags['l'] == (False, True, False)
+    assert flags['n'] == (False, False, False)
+
+
+def test_scanner_unsupported():
+    # `except*` blocks are not treated as try/except blocks by the AST visitor; the scanner must bail out.
+    src = "try:\n    import a\nexcept* ValueError:\n    pass\n"
+    assert scanner.scan_source_imports(src) is None
+
+
+def test_scanner_no_imports():
+    assert scanner.scan_source_imports("x = 1\n") == []
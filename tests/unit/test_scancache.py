@@ -0,0 +1,184 @@
+#-----------------------------------------------------------------------------
+# Copyright (c) 2005-2023, PyInstaller Development Team.
+#
+# Distributed under the terms of the GNU General Public License (version 2
+# or later) with exception for distributing the bootloader.
+#
+# The full license is in the file COPYING.txt, distributed with this software.
+#
+# SPDX-License-Identifier: (GPL-2.0-or-later WITH Bootloader-exception)
+#-----------------------------------------------------------------------------
+
+import os
+import sys
+
+from PyInstaller.depend.scancache import ModuleScanCache
+from PyInstaller.lib.modulegraph import modulegraph
+
+
+def _create_sources(path):
+    pkg = path / 'mypkg'
+    pkg.mkdir()
+    (pkg / '__init__.py').write_text("from . import sub\nfrom .sub import *\nVALUE = 1\n", encoding='utf-8')
+    (pkg / 'sub.py').write_text(
+        "import os\n"
+        "try:\n"
+        "    import missing_module\n"
+        "except ImportError:\n"
+        "    pass\n"
+        "def func():\n"
+        "    import json\n"
+        "SUB_VALUE = 2\n",
+        encoding='utf-8',
+    )
+    (path / 'script.py').write_text("import mypkg\n", encoding='utf-8')
+
+
+def _build_graph(path, scan_cache):
+    mg = modulegraph.ModuleGraph(path=[str(path)] + sys.path, scan_cache=scan_cache)
+    mg.add_script(str(path / 'script.py'))
+    return mg
+
+
+def _graph_summary(mg):
+    summary = {}
+    for node in mg.iter_graph():
+        edges = sorted((str(target.identifier), mg.edgeData(node, target)) for target in mg.getReferences(node)
+                       if target is not None)
+        summary[str(node.identifier)] = (type(node).__name__, edges, sorted(node._global_attr_names))
+    return summary
+
+
+def test_scan_cache_reuse(tmp_path):
+    src_path = tmp_path / 'src'
+    src_path.mkdir()
+    _create_sources(src_path)
+    cache_file = str(tmp_path / 'cache' / 'scancache.dat')
+
+    # First build populates the cache.
+    cache = ModuleScanCache(cache_file)
+    mg1 = _build_graph(src_path, cache)
+    assert cache.hits == 0
+    cache.save()
+    assert os.path.isfile(cache_file)
+
+    # Second build must use cached results, and produce an identical graph.
+    cache = ModuleScanCache(cache_file)
+    assert len(cache) > 0
+    mg2 = _build_graph(src_path, cache)
+    assert cache.hits > 0
+    assert _graph_summary(mg1) == _graph_summary(mg2)
+
+    sub1 = mg1.find_node('mypkg.sub')
+    sub2 = mg2.find_node('mypkg.sub')
+    assert sub2.code is not None
+    assert sub1.code.co_consts == sub2.code.co_consts
+
+
+def test_scan_cache_invalidation(tmp_path):
+    src_path = tmp_path / 'src'
+    src_path.mkdir()
+    _create_sources(src_path)
+    cache_file = str(tmp_path / 'scancache.dat')
+
+    cache = ModuleScanCache(cache_file)
+    _build_graph(src_path, cache)
+    cache.save()
+
+    # Modify the submodule; it now imports a different module.
+    sub_file = src_path / 'mypkg' / 'sub.py'
+    sub_file.write_text("import csv\n", encoding='utf-8')
+
+    cache = ModuleScanCache(cache_file)
+    mg = _build_graph(src_path, cache)
+    assert mg.find_node('csv') is not None
+    assert mg.find_node('json') is None
+
+
+def test_scan_cache_touched_file(tmp_path):
+    # Changing only the modification time of the file should still result in a cache hit.
+    src_path = tmp_path / 'src'
+    src_path.mkdir()
+    _create_sources(src_path)
+    cache_file = str(tmp_path / 'scancache.dat')
+
+    cache = ModuleScanCache(cache_file)
+    _build_graph(src_path, cache)
+    cache.save()
+
+    sub_file = str(src_path / 'mypkg' / 'sub.py')
+    st = os.stat(sub_file)
+    os.utime(sub_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    cache = ModuleScanCache(cache_file)
+    assert cache.get(sub_file) is not None
+    assert cache.hits == 1
+
+
+def test_scan_cache_corrupted_file(tmp_path):
+    cache_file = tmp_path / 'scancache.dat'
+    cache_file.write_bytes(b'garbage')
+
+    cache = ModuleScanCache(str(cache_file))
+    assert len(cache) == 0
+
+
+def test_scan_source_file(tmp_path):
+    # Scan result obtained via `scan_source_file` must match the one obtained by scanning the module in the graph.
+    src_path = tmp_path / 'src'
+    src_path.mkdir()
+    _create_sources(src_path)
+
+    mg = modulegraph.ModuleGraph(path=[str(src_path)])
+    mg.add_script(str(src_path / 'script.py'))
+    # Re-scan the module to obtain its deferred imports.
+    node = mg.find_node('mypkg.sub')
+    mg._scan_code(node, node.code, None)
+    expected = modulegraph._make_scan_result(node, node.code)
+
+    code, imports, global_attr_names = modulegraph.scan_source_file(node.filename)
+    assert code.co_consts == expected[0].co_consts
+    # The bytecode scan does not record edge attributes, so compare only names, from-lists, and levels.
+    assert [entry[:4] for entry in imports] == [entry[:4] for entry in expected[1]]
+    assert imports[1][4] == (False, False, True, False)  # try/except import
+    assert imports[2][4] == (False, True, False, False)  # function-level import
+    assert global_attr_names == expected[2]
+
+
+def test_scan_pool(tmp_path):
+    from PyInstaller.depend.scanpool import ModuleScanPool
+
+    src_path = tmp_path / 'src'
+    src_path.mkdir()
+    _create_sources(src_path)
+
+    mg1 = _build_graph(src_path, None)
+
+    scan_pool = ModuleScanPool(2)
+    try:
+        mg2 = modulegraph.ModuleGraph(path=[str(src_path)] + sys.path, scan_pool=scan_pool)
+        mg2.add_script(str(src_path / 'script.py'))
+    finally:
+        scan_pool.close()
+
+    assert _graph_summary(mg1) == _graph_summary(mg2)
+
+
+def test_scan_pool_pending_scan_not_awaited(tmp_path):
+    import concurrent.futures
+    import importlib.machinery
+
+    src_file = tmp_path / 'mod.py'
+    src_file.write_text("import os\n", encoding='utf-8')
+
+    # A scan that no worker has picked up yet must be cancelled rather than waited for.
+    pending = concurrent.futures.Future()
+
+    class _FakeScanPool:
+        def pop(self, pathname):
+            return pending
+
+    mg = modulegraph.ModuleGraph(path=[str(tmp_path)] + sys.path, scan_pool=_FakeScanPool())
+    loader = importlib.machinery.SourceFileLoader('mod', str(src_file))
+    assert mg._lookup_scan_result(str(src_file), loader) is None
+    assert pending.cancelled()